@@ -1,21 +1,33 @@
 # auth.py
-from passlib.context import CryptContext
+import os
+import threading
+import time
+from collections import OrderedDict
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event, inspect, select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError, jwt
-from database import get_db
+from database import get_db, get_async_db
+from hashing import pwd_context, password_pool
 import models
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
+# Password hashing (in-process; for scripts and other sync callers)
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+# Password hashing for request handlers, on the bcrypt process pool.
+# Both raise hashing.HashingBusy when the pool's admission limit is reached.
+async def hash_password_async(password: str) -> str:
+    return await password_pool.hash(password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str):
+    return await password_pool.verify_and_update(plain_password, hashed_password)
+
 # JWT settings
 SECRET_KEY = "your-secret-key"  # move to .env in production
 ALGORITHM = "HS256"
@@ -31,22 +43,176 @@ def create_access_token(data: dict, expires_minutes: int = ACCESS_TOKEN_EXPIRE_M
 # OAuth2 scheme for extracting token
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
 
-# Dependency to get current user
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+
+# -------------------
+# Verified-token cache
+# -------------------
+# Maps a raw bearer token to a detached copy of the user it resolved to, so
+# repeat requests skip both the JWT decode and the users-table lookup.
+# Entries never outlive the token's own "exp" claim.
+#
+# Eviction is best-effort: _invalidate_cached_user only sees ORM flushes of
+# a User in this process. Core update()/delete() statements, raw SQL and
+# writes made by other workers do not evict anything, so a renamed, deleted
+# or otherwise changed user can keep authenticating with an already cached
+# token for up to TOKEN_CACHE_TTL_SECONDS in every worker that cached it.
+# Keep the TTL short, and set it to 0 (or TOKEN_CACHE_SIZE=0) to turn the
+# cache off wherever that window is not acceptable.
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_TTL_SECONDS = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "60"))
+
+
+class TokenCache:
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # token -> (expires_at, user)
+        self._tokens_by_username = {}  # username -> set of tokens
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, token: str):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, user = entry
+            if expires_at <= now:
+                self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return user
+
+    def put(self, token: str, user, token_exp: float):
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+        expires_at = min(token_exp, time.time() + self.ttl_seconds)
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (expires_at, user)
+            self._tokens_by_username.setdefault(user.username, set()).add(token)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_user(self, username: str):
+        with self._lock:
+            for token in list(self._tokens_by_username.get(username, ())):
+                self._remove(token)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_username.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    # Caller must hold self._lock
+    def _remove(self, token: str):
+        expires_at, user = self._entries.pop(token)
+        tokens = self._tokens_by_username.get(user.username)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_username[user.username]
+
+
+token_cache = TokenCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL_SECONDS)
+
+
+def _detached_user(user: models.User) -> models.User:
+    # A session-free copy: safe to share across requests and threads, and it
+    # never carries the password hash around in memory.
+    return models.User(
+        id=user.id,
+        username=user.username,
+        email=user.email,
+        full_name=user.full_name,
+    )
+
+
+# Drop cached identities as soon as a user row is changed or deleted through
+# the ORM in this process (see the limits above TOKEN_CACHE_SIZE)
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    usernames = {target.username}
+    # A rename leaves tokens issued under the old username in the cache
+    usernames.update(inspect(target).attrs.username.history.deleted or ())
+    for username in usernames:
+        if username is not None:
+            token_cache.invalidate_user(username)
+
+
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
-    
-    user = db.query(models.User).filter(models.User.username == username).first()
-    if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+
+def _cache_user(token: str, payload: dict, user: models.User) -> models.User:
+    user = _detached_user(user)
+    if payload.get("exp") is not None:
+        token_cache.put(token, user, float(payload["exp"]))
     return user
+
+
+# Dependency to get current user
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    cached_user = token_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
+    payload = _decode_token(token)
+    user = db.query(models.User).filter(models.User.username == payload["sub"]).first()
+    if user is None:
+        raise _credentials_exception()
+    return _cache_user(token, payload, user)
+
+
+# Same as get_current_user, for the async routers
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    cached_user = token_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
+    payload = _decode_token(token)
+    result = await db.execute(select(models.User).where(models.User.username == payload["sub"]))
+    user = result.scalars().first()
+    if user is None:
+        raise _credentials_exception()
+    return _cache_user(token, payload, user)
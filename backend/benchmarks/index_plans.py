@@ -0,0 +1,154 @@
+# benchmarks/index_plans.py
+#
+# Seeds a scratch database, then prints query plans and timings for the
+# per-world list and ownership queries before and after
+# migrations/0001_world_indexes.sql is applied.
+#
+#   python benchmarks/index_plans.py                      (in-memory SQLite)
+#   python benchmarks/index_plans.py --url postgresql://.../scratch --rows 200000
+#
+# The target database is wiped: never point --url at real data.
+import argparse
+import os
+import random
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+MIGRATION = os.path.join(BACKEND_DIR, "migrations", "0001_world_indexes.sql")
+INDEXES = [
+    ("ix_worlds_user_id_id", "worlds"),
+    ("ix_characters_world_id_id", "characters"),
+    ("ix_events_world_id_id", "events"),
+    ("ix_events_location_id", "events"),
+    ("ix_events_user_id", "events"),
+    ("ix_locations_world_id_id", "locations"),
+]
+
+# (label, SQL) pairs mirroring what the routers issue
+QUERIES = [
+    ("worlds page for a user",
+     "SELECT * FROM worlds WHERE user_id = :user_id AND id > 0 ORDER BY id LIMIT 101"),
+    ("characters page for a world",
+     "SELECT * FROM characters WHERE world_id = :world_id AND id > 0 ORDER BY id LIMIT 101"),
+    ("events page for a world",
+     "SELECT * FROM events WHERE world_id = :world_id AND id > 0 ORDER BY id LIMIT 101"),
+    ("locations page for a world",
+     "SELECT * FROM locations WHERE world_id = :world_id AND id > 0 ORDER BY id LIMIT 101"),
+    ("events at a location",
+     "SELECT * FROM events WHERE location_id = :location_id"),
+    ("character ownership join",
+     "SELECT characters.* FROM characters JOIN worlds ON worlds.id = characters.world_id "
+     "WHERE characters.world_id = :world_id AND worlds.user_id = :user_id"),
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Query plans before and after the world indexes migration")
+    parser.add_argument("--url", default="sqlite://", help="scratch database URL (wiped!)")
+    parser.add_argument("--rows", type=int, default=50000, help="rows per entity table")
+    parser.add_argument("--worlds", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=50, help="timed executions per query")
+    return parser.parse_args()
+
+
+def seed(engine, args):
+    from sqlalchemy import insert
+    import models
+
+    rng = random.Random(42)
+    users = max(args.worlds // 10, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"id": i, "username": f"user{i}", "email": f"user{i}@example.com"} for i in range(1, users + 1)
+        ])
+        conn.execute(insert(models.World), [
+            {"id": i, "name": f"World {i}", "user_id": rng.randint(1, users)} for i in range(1, args.worlds + 1)
+        ])
+        conn.execute(insert(models.Location), [
+            {"id": i, "name": f"Location {i}", "world_id": rng.randint(1, args.worlds)} for i in range(1, args.rows + 1)
+        ])
+        conn.execute(insert(models.Character), [
+            {"id": i, "name": f"Character {i}", "world_id": rng.randint(1, args.worlds)} for i in range(1, args.rows + 1)
+        ])
+        conn.execute(insert(models.Event), [
+            {
+                "id": i,
+                "title": f"Event {i}",
+                "world_id": rng.randint(1, args.worlds),
+                "location_id": rng.randint(1, args.rows),
+                "user_id": rng.randint(1, users),
+            }
+            for i in range(1, args.rows + 1)
+        ])
+
+
+def explain(conn, sql, params):
+    from sqlalchemy import text
+
+    if conn.dialect.name == "postgresql":
+        rows = conn.execute(text("EXPLAIN ANALYZE " + sql), params)
+        return [row[0] for row in rows]
+    rows = conn.execute(text("EXPLAIN QUERY PLAN " + sql), params)
+    return [row[-1] for row in rows]
+
+
+def run_queries(engine, args, phase):
+    from sqlalchemy import text
+
+    params = {"user_id": 1, "world_id": 1, "location_id": 1}
+    print(f"\n===== {phase} =====")
+    with engine.connect() as conn:
+        for label, sql in QUERIES:
+            for _ in range(3):  # warm caches
+                conn.execute(text(sql), params).fetchall()
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                conn.execute(text(sql), params).fetchall()
+            avg_ms = (time.perf_counter() - start) * 1000 / args.repeat
+            print(f"\n-- {label}: {avg_ms:.3f} ms avg over {args.repeat} runs")
+            for line in explain(conn, sql, params):
+                print(f"   {line}")
+
+
+def apply_migration(engine):
+    from sqlalchemy import text
+
+    with open(MIGRATION) as f:
+        sql = "\n".join(l for l in f.read().splitlines() if not l.strip().startswith("--"))
+    with engine.begin() as conn:
+        for statement in sql.split(";"):
+            if statement.strip():
+                conn.execute(text(statement))
+        conn.execute(text("ANALYZE"))
+
+
+def main():
+    args = parse_args()
+    os.environ.setdefault("URL_DATABASE", args.url)
+
+    from sqlalchemy import create_engine, text
+    import models
+
+    engine = create_engine(args.url)
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    # Start from the pre-migration schema
+    with engine.begin() as conn:
+        for name, table in INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+    print(f"Seeding {args.rows} rows per table across {args.worlds} worlds ({engine.dialect.name})...")
+    seed(engine, args)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    run_queries(engine, args, "before 0001_world_indexes")
+    apply_migration(engine)
+    run_queries(engine, args, "after 0001_world_indexes")
+
+
+if __name__ == "__main__":
+    main()
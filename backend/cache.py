@@ -0,0 +1,282 @@
+# cache.py
+#
+# Read cache for the per-world list endpoints. Two tiers: a bounded LRU in
+# this process, and an optional shared tier (redis, or an in-process stand-in
+# for tests) that every worker and node reads through.
+#
+# Entries live under a namespace "{kind}:{world_id}" with the field
+# "v{version}:{page key}", where version is the world's counter from
+# versioning.py. A write bumps the counter in its own transaction, so no
+# reader can be served a page cached before it, even from another worker
+# whose local tier never heard about the write. The change listener below
+# drops the namespace as well, which just frees the now-unreachable entries.
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from fastapi.concurrency import run_in_threadpool
+import versioning
+
+logger = logging.getLogger(__name__)
+
+# Kill switch: READ_CACHE_ENABLED=0 turns every lookup into a miss and every
+# store into a no-op, without touching the endpoints
+READ_CACHE_ENABLED = os.getenv("READ_CACHE_ENABLED", "1").lower() not in ("0", "false", "off")
+READ_CACHE_LOCAL_SIZE = int(os.getenv("READ_CACHE_LOCAL_SIZE", "2048"))
+# "none" (local tier only), "memory" (in-process stand-in) or "redis" (needs the redis package)
+READ_CACHE_BACKEND = os.getenv("READ_CACHE_BACKEND", "none").lower()
+READ_CACHE_TTL_SECONDS = int(os.getenv("READ_CACHE_TTL_SECONDS", "600"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+KINDS = ("character", "event", "location", "relationship", "route")
+
+
+# -------------------
+# Shared tiers
+# -------------------
+# Values cross this boundary as JSON strings, as they would over the wire.
+class MemoryBackend:
+    def __init__(self):
+        self._namespaces = {}  # namespace -> (expires_at, {field: value})
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, field: str):
+        with self._lock:
+            entry = self._namespaces.get(namespace)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._namespaces[namespace]
+                return None
+            return entry[1].get(field)
+
+    def set(self, namespace: str, field: str, value: str, ttl: int):
+        with self._lock:
+            entry = self._namespaces.get(namespace)
+            fields = entry[1] if entry and entry[0] > time.time() else {}
+            fields[field] = value
+            self._namespaces[namespace] = (time.time() + ttl, fields)
+
+    def drop(self, namespace: str):
+        with self._lock:
+            self._namespaces.pop(namespace, None)
+
+
+class RedisBackend:
+    def __init__(self, url: str):
+        import redis  # optional dependency, only for this backend
+
+        self._redis = redis.Redis.from_url(url)
+        self._prefix = "world-cache:"
+
+    def get(self, namespace: str, field: str):
+        value = self._redis.hget(self._prefix + namespace, field)
+        return value.decode() if value is not None else None
+
+    def set(self, namespace: str, field: str, value: str, ttl: int):
+        key = self._prefix + namespace
+        with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, field, value)
+            pipe.expire(key, ttl)
+            pipe.execute()
+
+    def drop(self, namespace: str):
+        self._redis.delete(self._prefix + namespace)
+
+
+def _make_backend():
+    if READ_CACHE_BACKEND == "redis":
+        return RedisBackend(REDIS_URL)
+    if READ_CACHE_BACKEND == "memory":
+        return MemoryBackend()
+    return None
+
+
+# -------------------
+# Cache
+# -------------------
+class WorldCache:
+    def __init__(self, enabled: bool, max_size: int, shared, ttl_seconds: int):
+        self.enabled = enabled
+        self.max_size = max_size
+        self.shared = shared
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # (namespace, field) -> value
+        self._fields = {}  # namespace -> set of fields held locally
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.uncached = 0
+        self.stores = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.shared_errors = 0
+
+    # Returns the cached page (a JSON-ready dict) or None. A page_key of None
+    # (an unpaginated request, see PageParams.key) is never looked up or stored.
+    def get(self, kind: str, world_id: int, version: int, page_key: str):
+        if not self.enabled:
+            return None
+        if page_key is None:
+            self._count_uncached()
+            return None
+        namespace, field = _key(kind, world_id, version, page_key)
+        value = self._get_local(namespace, field)
+        if value is not None:
+            return value
+        return self._from_shared(namespace, field, self._shared_get(namespace, field))
+
+    async def get_async(self, kind: str, world_id: int, version: int, page_key: str):
+        if not self.enabled:
+            return None
+        if page_key is None:
+            self._count_uncached()
+            return None
+        namespace, field = _key(kind, world_id, version, page_key)
+        value = self._get_local(namespace, field)
+        if value is not None:
+            return value
+        raw = await run_in_threadpool(self._shared_get, namespace, field) if self.shared else None
+        return self._from_shared(namespace, field, raw)
+
+    # Serializes a freshly loaded page with its response schema, stores it in
+    # both tiers and returns the serialized form for the endpoint to send
+    def put(self, kind: str, world_id: int, version: int, page_key: str, schema, page):
+        if not self.enabled or page_key is None:
+            return page
+        namespace, field = _key(kind, world_id, version, page_key)
+        value = schema.model_validate(page).model_dump(mode="json")
+        self._set_local(namespace, field, value)
+        self._shared_set(namespace, field, value)
+        return value
+
+    async def put_async(self, kind: str, world_id: int, version: int, page_key: str, schema, page):
+        if not self.enabled or page_key is None:
+            return page
+        namespace, field = _key(kind, world_id, version, page_key)
+        value = schema.model_validate(page).model_dump(mode="json")
+        self._set_local(namespace, field, value)
+        if self.shared:
+            await run_in_threadpool(self._shared_set, namespace, field, value)
+        return value
+
+    # Change listener: kind "world" (delete, import) covers every collection
+    def invalidate(self, world_id: int, kind: str):
+        kinds = KINDS if kind == "world" else (kind,)
+        for entity_kind in kinds:
+            namespace = _namespace(entity_kind, world_id)
+            with self._lock:
+                fields = self._fields.pop(namespace, ())
+                for field in fields:
+                    self._entries.pop((namespace, field), None)
+                self.invalidations += 1
+            if self.shared:
+                try:
+                    self.shared.drop(namespace)
+                except Exception as e:
+                    self._shared_failed("drop", e)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._fields.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.local_hits + self.shared_hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "shared_backend": type(self.shared).__name__ if self.shared else None,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "namespaces": len(self._fields),
+                "ttl_seconds": self.ttl_seconds,
+                "local_hits": self.local_hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "uncached": self.uncached,
+                "hit_rate": round((self.local_hits + self.shared_hits) / lookups, 4) if lookups else None,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "shared_errors": self.shared_errors,
+            }
+
+    # -------------------
+    # Tiers
+    # -------------------
+    def _count_uncached(self):
+        with self._lock:
+            self.uncached += 1
+
+    def _get_local(self, namespace: str, field: str):
+        with self._lock:
+            value = self._entries.get((namespace, field))
+            if value is not None:
+                self._entries.move_to_end((namespace, field))
+                self.local_hits += 1
+            return value
+
+    def _set_local(self, namespace: str, field: str, value):
+        with self._lock:
+            self._entries[(namespace, field)] = value
+            self._entries.move_to_end((namespace, field))
+            self._fields.setdefault(namespace, set()).add(field)
+            self.stores += 1
+            while len(self._entries) > self.max_size:
+                (old_namespace, old_field), _ = self._entries.popitem(last=False)
+                fields = self._fields.get(old_namespace)
+                if fields is not None:
+                    fields.discard(old_field)
+                    if not fields:
+                        del self._fields[old_namespace]
+                self.evictions += 1
+
+    def _from_shared(self, namespace: str, field: str, raw):
+        if raw is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        value = json.loads(raw)
+        self._set_local(namespace, field, value)
+        with self._lock:
+            self.shared_hits += 1
+        return value
+
+    # A broken shared tier degrades to local-only caching, never to errors
+    def _shared_get(self, namespace: str, field: str):
+        if not self.shared:
+            return None
+        try:
+            return self.shared.get(namespace, field)
+        except Exception as e:
+            self._shared_failed("get", e)
+            return None
+
+    def _shared_set(self, namespace: str, field: str, value):
+        if not self.shared:
+            return
+        try:
+            self.shared.set(namespace, field, json.dumps(value), self.ttl_seconds)
+        except Exception as e:
+            self._shared_failed("set", e)
+
+    def _shared_failed(self, operation: str, error: Exception):
+        with self._lock:
+            self.shared_errors += 1
+        logger.warning(f"World cache shared tier {operation} failed: {error}")
+
+
+def _namespace(kind: str, world_id: int) -> str:
+    return f"{kind}:{world_id}"
+
+
+def _key(kind: str, world_id: int, version: int, page_key: str):
+    return _namespace(kind, world_id), f"v{version}:{page_key}"
+
+
+world_cache = WorldCache(READ_CACHE_ENABLED, READ_CACHE_LOCAL_SIZE, _make_backend(), READ_CACHE_TTL_SECONDS)
+versioning.on_world_change(world_cache.invalidate)
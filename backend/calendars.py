@@ -0,0 +1,214 @@
+# calendars.py
+#
+# Event dates are stored as an integer day ordinal (indexed, so range,
+# ordering and "between" queries are plain integer comparisons) next to the
+# display form. Text is parsed once when an event is written and formatted
+# once when it is parsed; nothing is re-parsed on read.
+#
+# Worlds without a calendar use the Gregorian calendar with ISO dates, where
+# the ordinal is date.toordinal(). A world's own calendar is a list of months
+# (fixed lengths, so every year has the same number of days) and a list of
+# eras; the ordinal counts days from the first day of the first era.
+import re
+from bisect import bisect_right
+from collections import namedtuple
+from datetime import date
+from sqlalchemy import extract, select
+import models
+
+# ordinal is the first day the text covers and last_ordinal the last one:
+# "412 TA" spans the whole year, so as an upper bound it includes all of it
+ParsedDate = namedtuple("ParsedDate", ["date", "ordinal", "last_ordinal", "display"])
+
+
+class CalendarError(ValueError):
+    pass
+
+
+# -------------------
+# Gregorian (default)
+# -------------------
+class GregorianCalendar:
+    definition = None
+
+    def parse(self, text: str) -> ParsedDate:
+        try:
+            day = date.fromisoformat(text.strip())
+        except ValueError:
+            raise CalendarError("Expected an ISO date (YYYY-MM-DD)")
+        return ParsedDate(day, day.toordinal(), day.toordinal(), day.isoformat())
+
+    # SQL expression for the year of an event, and its label
+    def year_expression(self):
+        return extract("year", models.Event.date)
+
+    def year_label(self, year: int) -> str:
+        return str(year)
+
+
+# -------------------
+# Fictional calendars
+# -------------------
+_NUMERIC = re.compile(r"^(?P<year>\d+)-(?P<month>\d{1,2})-(?P<day>\d{1,2})(?:\s+(?P<era>.+))?$")
+_NAMED = re.compile(
+    r"^(?P<day>\d{1,2})(?:st|nd|rd|th)?\s+(?:of\s+)?(?P<month>[^\d,]+?),?\s+(?:year\s+)?(?P<year>\d+)(?:\s+(?P<era>.+))?$",
+    re.IGNORECASE,
+)
+_YEAR = re.compile(r"^(?:year\s+)?(?P<year>\d+)(?:\s+(?P<era>.+))?$", re.IGNORECASE)
+_ERA_PREFIX = re.compile(r"^(?:of\s+)?(?:the\s+)?", re.IGNORECASE)
+
+
+def _fold(name: str) -> str:
+    return _ERA_PREFIX.sub("", name.strip()).casefold()
+
+
+class FictionalCalendar:
+    def __init__(self, definition: dict):
+        self.definition = definition
+        self.months = [(month["name"], month["days"]) for month in definition["months"]]
+        self.days_per_year = sum(days for _, days in self.months)
+        self.month_starts = []
+        offset = 0
+        for _, days in self.months:
+            self.month_starts.append(offset)
+            offset += days
+        self.month_numbers = {_fold(name): number for number, (name, _) in enumerate(self.months, 1)}
+
+        # era -> absolute year index (0-based) of its first year
+        self.eras = definition["eras"]
+        self.era_starts = []
+        start = 0
+        for era in self.eras:
+            self.era_starts.append(start)
+            start += era["years"] or 0
+        self.era_lookup = {}
+        for position, era in enumerate(self.eras):
+            self.era_lookup[_fold(era["name"])] = position
+            self.era_lookup[era["abbreviation"].casefold()] = position
+
+    def parse(self, text: str) -> ParsedDate:
+        text = " ".join(text.split())
+        for pattern, precision in ((_NUMERIC, "day"), (_NAMED, "day"), (_YEAR, "year")):
+            match = pattern.match(text)
+            if match:
+                break
+        else:
+            raise CalendarError(
+                "Expected a date like '14 " + self.months[0][0] + " 412 " + self.eras[-1]["abbreviation"]
+                + "', '412-1-14 " + self.eras[-1]["abbreviation"] + "' or 'Year 412 of the " + self.eras[-1]["name"] + "'"
+            )
+
+        era = self._era(match["era"])
+        year = int(match["year"])
+        limit = self.eras[era]["years"]
+        if year < 1 or (limit is not None and year > limit):
+            raise CalendarError(f"Year {year} is outside the {self.eras[era]['name']}")
+        absolute_year = self.era_starts[era] + year - 1
+
+        if precision == "year":
+            first = absolute_year * self.days_per_year
+            display = f"{year} {self.eras[era]['abbreviation']}"
+            return ParsedDate(None, first, first + self.days_per_year - 1, display)
+
+        month = self._month(match["month"])
+        day = int(match["day"])
+        if not 1 <= day <= self.months[month - 1][1]:
+            raise CalendarError(f"{self.months[month - 1][0]} has {self.months[month - 1][1]} days")
+        ordinal = absolute_year * self.days_per_year + self.month_starts[month - 1] + day - 1
+        return ParsedDate(None, ordinal, ordinal, self.format(ordinal))
+
+    def format(self, ordinal: int) -> str:
+        absolute_year, day_of_year = divmod(ordinal, self.days_per_year)
+        month = bisect_right(self.month_starts, day_of_year) - 1
+        day = day_of_year - self.month_starts[month] + 1
+        return f"{day} {self.months[month][0]} {self.year_label(absolute_year)}"
+
+    def year_expression(self):
+        return models.Event.date_ordinal // self.days_per_year
+
+    def year_label(self, absolute_year: int) -> str:
+        era = bisect_right(self.era_starts, absolute_year) - 1
+        return f"{absolute_year - self.era_starts[era] + 1} {self.eras[era]['abbreviation']}"
+
+    def _era(self, text):
+        # Dates without an era are in the latest one
+        if not text:
+            return len(self.eras) - 1
+        era = self.era_lookup.get(_fold(text), self.era_lookup.get(text.strip().casefold()))
+        if era is None:
+            raise CalendarError(f"Unknown era '{text}'")
+        return era
+
+    def _month(self, text):
+        if text.isdigit():
+            number = int(text)
+            if not 1 <= number <= len(self.months):
+                raise CalendarError(f"Month must be between 1 and {len(self.months)}")
+            return number
+        number = self.month_numbers.get(_fold(text))
+        if number is None:
+            raise CalendarError(f"Unknown month '{text}'")
+        return number
+
+
+# Checks that go beyond the CalendarDefinition schema
+def validate_definition(definition: dict) -> dict:
+    month_names = [_fold(month["name"]) for month in definition["months"]]
+    if len(set(month_names)) != len(month_names):
+        raise CalendarError("Month names must be unique")
+    if any(name[:1].isdigit() for name in month_names):
+        raise CalendarError("Month names must not start with a digit")
+    era_keys = [{_fold(era["name"]), era["abbreviation"].casefold()} for era in definition["eras"]]
+    if sum(len(keys) for keys in era_keys) != len(set().union(*era_keys)):
+        raise CalendarError("Era names and abbreviations must be unique")
+    if any(era["years"] is None for era in definition["eras"][:-1]):
+        raise CalendarError("Only the last era may be open-ended")
+    return definition
+
+
+GREGORIAN = GregorianCalendar()
+
+
+def from_definition(definition):
+    return FictionalCalendar(definition) if definition else GREGORIAN
+
+
+def _definition_statement(world_id: int):
+    return select(models.Calendar.definition).where(models.Calendar.world_id == world_id)
+
+
+def definition_for_world(db, world_id: int):
+    return db.scalar(_definition_statement(world_id))
+
+
+def for_world(db, world_id: int):
+    return from_definition(definition_for_world(db, world_id))
+
+
+async def for_world_async(db, world_id: int):
+    return from_definition(await db.scalar(_definition_statement(world_id)))
+
+
+# The calendar of an event's world, for edits that know only the event id
+def _event_definition_statement(event_id: int):
+    return (
+        select(models.Calendar.definition)
+        .join(models.Event, models.Event.world_id == models.Calendar.world_id)
+        .where(models.Event.id == event_id)
+    )
+
+
+def for_event(db, event_id: int):
+    return from_definition(db.scalar(_event_definition_statement(event_id)))
+
+
+async def for_event_async(db, event_id: int):
+    return from_definition(await db.scalar(_event_definition_statement(event_id)))
+
+
+# Column values for an event's date text (None clears the date)
+def event_date_columns(calendar, text) -> dict:
+    if not text:
+        return {"date": None, "date_ordinal": None, "date_display": None}
+    parsed = calendar.parse(text)
+    return {"date": parsed.date, "date_ordinal": parsed.ordinal, "date_display": parsed.display}
@@ -0,0 +1,180 @@
+# character_graph.py
+#
+# Traversals over the character relationship edges of one world: k-hop
+# neighborhoods, shortest paths and connected components. Each world's
+# adjacency lists are built once from character_relationships and kept in a
+# VersionedWorldCache (world_indexes.py), so a traversal is a walk over
+# in-memory dicts instead of one query per hop, and clients never need the
+# whole edge list.
+import os
+from sqlalchemy import select
+import models
+from world_indexes import VersionedWorldCache
+
+GRAPH_MAX_DEPTH = int(os.getenv("GRAPH_MAX_DEPTH", "6"))
+GRAPH_MAX_NODES = int(os.getenv("GRAPH_MAX_NODES", "2000"))
+GRAPH_MAX_WORLDS = int(os.getenv("GRAPH_MAX_WORLDS", "128"))
+
+# Which way edges are followed: "out" (source -> target), "in" or "both"
+DIRECTIONS = ("out", "in", "both")
+_REVERSED = {"out": "in", "in": "out", "both": "both"}
+
+
+class CharacterGraph:
+    def __init__(self, world_id: int, characters, edges):
+        self.world_id = world_id
+        self.names = dict(characters)  # character id -> name
+        self.edges = {}  # edge id -> (source_id, target_id, type)
+        self.outgoing = {}  # character id -> [edge id]
+        self.incoming = {}
+        for edge_id, source_id, target_id, edge_type in edges:
+            self.edges[edge_id] = (source_id, target_id, edge_type)
+            self.outgoing.setdefault(source_id, []).append(edge_id)
+            self.incoming.setdefault(target_id, []).append(edge_id)
+        self._components = None
+
+    def __contains__(self, character_id: int):
+        return character_id in self.names
+
+    def edge(self, edge_id: int) -> dict:
+        source_id, target_id, edge_type = self.edges[edge_id]
+        return {"id": edge_id, "world_id": self.world_id, "source_id": source_id, "target_id": target_id, "type": edge_type}
+
+    # Yields (neighbor id, edge id)
+    def neighbors(self, character_id: int, direction: str = "both", types=None):
+        if direction in ("out", "both"):
+            for edge_id in self.outgoing.get(character_id, ()):
+                if not types or self.edges[edge_id][2] in types:
+                    yield self.edges[edge_id][1], edge_id
+        if direction in ("in", "both"):
+            for edge_id in self.incoming.get(character_id, ()):
+                if not types or self.edges[edge_id][2] in types:
+                    yield self.edges[edge_id][0], edge_id
+
+    # -------------------
+    # k-hop neighborhood
+    # -------------------
+    # Breadth-first up to depth hops; the edges returned are every matching
+    # edge between the nodes reached, so the result can be drawn as is
+    def neighborhood(self, start: int, depth: int, direction: str = "both", types=None, max_nodes: int = GRAPH_MAX_NODES):
+        distances = {start: 0}
+        frontier = [start]
+        truncated = False
+        for distance in range(1, depth + 1):
+            next_frontier = []
+            for node in frontier:
+                for neighbor, _ in self.neighbors(node, direction, types):
+                    if neighbor in distances:
+                        continue
+                    if len(distances) >= max_nodes:
+                        truncated = True
+                        break
+                    distances[neighbor] = distance
+                    next_frontier.append(neighbor)
+                if truncated:
+                    break
+            frontier = next_frontier
+            if truncated or not frontier:
+                break
+
+        nodes = [{"id": node, "name": self.names.get(node), "distance": d} for node, d in distances.items()]
+        edges = [
+            self.edge(edge_id)
+            for node in distances
+            for edge_id in self.outgoing.get(node, ())
+            if self.edges[edge_id][1] in distances and (not types or self.edges[edge_id][2] in types)
+        ]
+        edges.sort(key=lambda e: e["id"])
+        return nodes, edges, truncated
+
+    # -------------------
+    # Shortest path
+    # -------------------
+    # Bidirectional breadth-first search, always growing the smaller side.
+    # A whole layer is expanded before stopping, and the shortest of the
+    # meetings found in it wins. Returns (character ids, edge ids) or None.
+    def shortest_path(self, source: int, target: int, direction: str = "out", types=None):
+        if source == target:
+            return [source], []
+        # per side: node -> (previous node, edge id), and node -> hops
+        parents = ({source: None}, {target: None})
+        depths = ({source: 0}, {target: 0})
+        frontiers = [[source], [target]]
+        while frontiers[0] and frontiers[1]:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            other = 1 - side
+            step = direction if side == 0 else _REVERSED[direction]
+            best = None  # (total hops, meeting node)
+            next_frontier = []
+            for node in frontiers[side]:
+                for neighbor, edge_id in self.neighbors(node, step, types):
+                    if neighbor in parents[side]:
+                        continue
+                    parents[side][neighbor] = (node, edge_id)
+                    depths[side][neighbor] = depths[side][node] + 1
+                    next_frontier.append(neighbor)
+                    if neighbor in depths[other]:
+                        total = depths[side][neighbor] + depths[other][neighbor]
+                        if best is None or total < best[0]:
+                            best = (total, neighbor)
+            if best is not None:
+                return self._join(best[1], parents)
+            frontiers[side] = next_frontier
+        return None
+
+    def _join(self, meeting: int, parents):
+        head, head_edges = [meeting], []
+        node = meeting
+        while parents[0][node] is not None:
+            node, edge_id = parents[0][node]
+            head.append(node)
+            head_edges.append(edge_id)
+        head.reverse()
+        head_edges.reverse()
+        node = meeting
+        while parents[1][node] is not None:
+            node, edge_id = parents[1][node]
+            head.append(node)
+            head_edges.append(edge_id)
+        return head, head_edges
+
+    # -------------------
+    # Connected components
+    # -------------------
+    # Weakly connected (edge direction and type ignored), largest first.
+    # Computed once per graph; characters without edges are singletons.
+    def components(self):
+        if self._components is None:
+            parent = {node: node for node in self.names}
+
+            def find(node):
+                while parent[node] != node:
+                    parent[node] = parent[parent[node]]
+                    node = parent[node]
+                return node
+
+            for source_id, target_id, _ in self.edges.values():
+                root_a, root_b = find(source_id), find(target_id)
+                if root_a != root_b:
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+            groups = {}
+            for node in sorted(self.names):
+                groups.setdefault(find(node), []).append(node)
+            self._components = sorted(groups.values(), key=lambda members: (-len(members), members[0]))
+        return self._components
+
+
+def build_character_graph(db, world_id: int) -> CharacterGraph:
+    characters = db.execute(
+        select(models.Character.id, models.Character.name).where(models.Character.world_id == world_id)
+    ).all()
+    edge = models.CharacterRelationship
+    edges = db.execute(
+        select(edge.id, edge.source_id, edge.target_id, edge.type).where(edge.world_id == world_id)
+    ).all()
+    return CharacterGraph(world_id, characters, edges)
+
+
+character_graphs = VersionedWorldCache(
+    "character-graph", build_character_graph, ("character", "relationship"), GRAPH_MAX_WORLDS
+)
@@ -1,20 +1,77 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 import os
 from dotenv import load_dotenv
+from pool_metrics import instrumented_pool_class, sync_pool_metrics, async_pool_metrics
 
 # Load environment variables from .env file (e.g., your database URL)
 load_dotenv()
 SQLALCHEMY_DATABASE_URL = os.getenv("URL_DATABASE")
 
+# "sync" serves the API from threadpool routes on psycopg2, "async" mounts the
+# async def routers on an AsyncEngine instead (see main.py)
+DB_MODE = os.getenv("DB_MODE", "sync").lower()
+
+# Connection pool tuning, shared by the sync and async engines. Defaults match
+# SQLAlchemy's own QueuePool defaults.
+POOL_SETTINGS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "-1")),
+    "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true", "yes"),
+}
+
+# Async drivers for the dialects we run on; override with ASYNC_URL_DATABASE
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def _async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise RuntimeError(f"No async driver configured for '{parsed.get_backend_name()}', set ASYNC_URL_DATABASE")
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
 # Create a database engine using the URL
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    poolclass=instrumented_pool_class(QueuePool, sync_pool_metrics),
+    **POOL_SETTINGS,
+)
+sync_pool_metrics.attach(engine)
 # Create a session factory for interacting with the database
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create a base class for ORM models to inherit from
 Base = declarative_base()
 
+# The async engine is only built in async mode so the sync deployment does not
+# need an async driver installed
+async_engine = None
+AsyncSessionLocal = None
+if DB_MODE == "async":
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    ASYNC_SQLALCHEMY_DATABASE_URL = os.getenv("ASYNC_URL_DATABASE") or _async_database_url(SQLALCHEMY_DATABASE_URL)
+    async_engine = create_async_engine(
+        ASYNC_SQLALCHEMY_DATABASE_URL,
+        poolclass=instrumented_pool_class(AsyncAdaptedQueuePool, async_pool_metrics),
+        **POOL_SETTINGS,
+    )
+    async_pool_metrics.attach(async_engine.sync_engine)
+    # expire_on_commit=False: async routes return ORM rows after commit and
+    # must not trigger a lazy refresh outside the event loop's control
+    AsyncSessionLocal = sessionmaker(
+        bind=async_engine, class_=AsyncSession, autocommit=False, autoflush=False, expire_on_commit=False
+    )
+
 
 # Dependency to get a new database session for each request
 def get_db():
@@ -24,3 +81,10 @@ def get_db():
     finally:
         db.close()
 
+
+# Async counterpart of get_db, used by the routers/async_*.py modules
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database access requires DB_MODE=async")
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,156 @@
+# fulltext.py
+#
+# Ranked full-text search over characters, events and locations, on the
+# indexes created by migrations/0003_fulltext.py. All three tables are
+# searched in one statement; snippets are only built for the hits that make
+# the final page, since highlighting is the expensive part.
+import html
+import os
+import re
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+SEARCH_DEFAULT_LIMIT = int(os.getenv("SEARCH_DEFAULT_LIMIT", "20"))
+SEARCH_MAX_LIMIT = int(os.getenv("SEARCH_MAX_LIMIT", "100"))
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+# The databases wrap matches in these private-use characters instead; the
+# fragment is then HTML-escaped and only the sentinels become <mark> tags, so
+# stored text can never reach the client as markup
+_MATCH_START = "\ue000"
+_MATCH_STOP = "\ue001"
+
+# Must match migrations/0003_fulltext.py and 0013_fulltext_weights.py
+TS_CONFIG = "english"
+SQLITE_KIND_CODES = {"character": 1, "event": 2, "location": 3}
+SQLITE_KINDS = {code: kind for kind, code in SQLITE_KIND_CODES.items()}
+
+
+# Relative weight of a match in the name/title, the description and a
+# character's role: tsvector weights A, B and C on Postgres, the title, body
+# and role columns of search_index on SQLite
+SEARCH_WEIGHTS = (1.0, 0.4, 0.2)
+
+
+class SearchUnavailable(Exception):
+    pass
+
+
+# -------------------
+# Postgres: tsvector columns + GIN
+# -------------------
+# kind -> (table, title column)
+_PG_TABLES = {
+    "character": ("characters", "name"),
+    "event": ("events", "title"),
+    "location": ("locations", "name"),
+}
+
+
+# ts_rank_cd takes the weights as {D, C, B, A}; D is unused
+_PG_RANK_WEIGHTS = "{" + ", ".join(str(weight) for weight in (0.1, *reversed(SEARCH_WEIGHTS))) + "}"
+
+
+def _pg_statement(single_world: bool):
+    world_filter = "AND t.world_id = :world_id" if single_world else ""
+    branches = [
+        f"""SELECT '{kind}' AS kind, t.id, t.world_id, t.{title} AS title, t.description AS body,
+                   ts_rank_cd('{_PG_RANK_WEIGHTS}', t.search_vector, tsq) AS rank
+            FROM {table} t
+            JOIN worlds w ON w.id = t.world_id
+            CROSS JOIN websearch_to_tsquery('{TS_CONFIG}', :q) tsq
+            WHERE w.user_id = :user_id {world_filter} AND t.search_vector @@ tsq"""
+        for kind, (table, title) in _PG_TABLES.items()
+    ]
+    options = f"StartSel={_MATCH_START}, StopSel={_MATCH_STOP}"
+    return text(f"""
+        SELECT hits.kind, hits.id, hits.world_id, hits.title, hits.rank,
+               ts_headline('{TS_CONFIG}', coalesce(hits.title, ''), tsq, 'HighlightAll=true, {options}') AS highlighted_title,
+               ts_headline('{TS_CONFIG}', coalesce(hits.body, ''), tsq, 'MaxFragments=2, MaxWords=20, MinWords=5, {options}') AS snippet
+        FROM (
+            {" UNION ALL ".join(branches)}
+            ORDER BY rank DESC, kind, id
+            LIMIT :limit
+        ) hits
+        CROSS JOIN websearch_to_tsquery('{TS_CONFIG}', :q) tsq
+        ORDER BY hits.rank DESC, hits.kind, hits.id
+    """)
+
+
+# -------------------
+# SQLite: one FTS5 table kept current by triggers
+# -------------------
+# bm25() is lower-is-better, so it is negated to rank like Postgres.
+# Column weights: world_id (unindexed), then title, body and role.
+_BM25 = "bm25(search_index, 0.0, " + ", ".join(str(weight * 10) for weight in SEARCH_WEIGHTS) + ")"
+
+
+def _sqlite_statement(single_world: bool):
+    world_filter = "AND search_index.world_id = :world_id" if single_world else ""
+    return text(f"""
+        SELECT search_index.rowid AS rowid, search_index.world_id AS world_id,
+               search_index.title AS title,
+               -{_BM25} AS rank,
+               highlight(search_index, 1, '{_MATCH_START}', '{_MATCH_STOP}') AS highlighted_title,
+               snippet(search_index, 2, '{_MATCH_START}', '{_MATCH_STOP}', '…', 16) AS snippet
+        FROM search_index
+        WHERE search_index MATCH :q
+          AND search_index.world_id IN (SELECT id FROM worlds WHERE user_id = :user_id)
+          {world_filter}
+        ORDER BY {_BM25}, search_index.rowid
+        LIMIT :limit
+    """)
+
+
+# Quote every word so user input can never be parsed as FTS5 query syntax;
+# adjacent terms are ANDed, as with websearch_to_tsquery
+def _fts5_query(q: str) -> str:
+    return " ".join(f'"{word}"' for word in re.findall(r"\w+", q))
+
+
+def _markup(fragment):
+    if fragment is None:
+        return None
+    escaped = html.escape(fragment, quote=True)
+    return escaped.replace(_MATCH_START, HIGHLIGHT_START).replace(_MATCH_STOP, HIGHLIGHT_STOP)
+
+
+_STATEMENTS = {
+    "postgresql": {single: _pg_statement(single) for single in (True, False)},
+    "sqlite": {single: _sqlite_statement(single) for single in (True, False)},
+}
+
+
+def search(db: Session, user_id: int, q: str, world_id: int = None, limit: int = SEARCH_DEFAULT_LIMIT) -> list:
+    dialect = db.get_bind().dialect.name
+    statements = _STATEMENTS.get(dialect)
+    if statements is None:
+        raise SearchUnavailable(f"Full-text search is not supported on {dialect}")
+
+    params = {"q": q, "user_id": user_id, "limit": limit}
+    if world_id is not None:
+        params["world_id"] = world_id
+    if dialect == "sqlite":
+        params["q"] = _fts5_query(q)
+        if not params["q"]:
+            return []
+
+    rows = db.execute(statements[world_id is not None], params).mappings().all()
+    if dialect == "sqlite":
+        return [
+            {
+                "kind": SQLITE_KINDS[row["rowid"] % 4],
+                "id": row["rowid"] // 4,
+                "world_id": row["world_id"],
+                "title": row["title"],
+                "highlighted_title": _markup(row["highlighted_title"]),
+                "snippet": _markup(row["snippet"]),
+                "rank": row["rank"],
+            }
+            for row in rows
+        ]
+    return [
+        {**row, "highlighted_title": _markup(row["highlighted_title"]), "snippet": _markup(row["snippet"])}
+        for row in rows
+    ]
@@ -0,0 +1,129 @@
+# hashing.py
+#
+# bcrypt runs in a dedicated process pool so password work never occupies
+# the anyio threadpool or the event loop. Keep this module import-light:
+# worker processes are spawned and import it on startup.
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from passlib.context import CryptContext
+
+# Work factor for new hashes; existing hashes at any other cost are upgraded
+# on the next successful login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# 0 workers hashes on a thread in this process instead (tests, tiny deployments)
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Hash jobs allowed in flight (queued + running) before new ones are refused
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", "64"))
+
+
+def make_context(rounds: int) -> CryptContext:
+    # Pinning min and max to the target cost makes needs_update() flag any
+    # hash made at a different cost
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+pwd_context = make_context(BCRYPT_ROUNDS)
+
+
+# -------------------
+# Worker-side functions (must be top level so they can be pickled)
+# -------------------
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed_password: str):
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+class HashingBusy(Exception):
+    pass
+
+
+class HashingPool:
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.peak_pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash, password)
+
+    # Returns (valid, new_hash); new_hash is set when the stored hash should be replaced
+    async def verify_and_update(self, password: str, hashed_password: str):
+        valid, new_hash = await self._submit(_verify_and_update, password, hashed_password)
+        if new_hash is not None:
+            with self._lock:
+                self.rehashed += 1
+        return valid, new_hash
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "bcrypt_rounds": BCRYPT_ROUNDS,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                # jobs beyond one per worker are waiting in the pool's queue
+                "queue_depth": max(self.pending - max(self.workers, 1), 0),
+                "peak_pending": self.peak_pending,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+            }
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HashingBusy()
+            self.pending += 1
+            self.submitted += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+
+        if self.workers > 0:
+            future = asyncio.wrap_future(self._get_executor().submit(fn, *args))
+        else:
+            future = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+        future.add_done_callback(self._job_done)
+        return future
+
+    def _job_done(self, future):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: forking a process that already runs threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+
+password_pool = HashingPool(HASH_WORKERS, HASH_MAX_PENDING)
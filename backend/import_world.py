@@ -0,0 +1,79 @@
+# import_world.py
+#
+# Command-line counterpart of POST /worlds/{world_id}/import, for archives
+# too large to push through HTTP comfortably:
+#
+#   python import_world.py world.ndjson --world-id 12
+#   python import_world.py backup.tar.gz --owner alice      (creates a new world)
+#
+# Accepts plain NDJSON, gzip-compressed NDJSON, and tar / tar.gz archives
+# whose *.ndjson members are read one after another. Everything is streamed;
+# nothing is unpacked to disk.
+import argparse
+import gzip
+import sys
+import tarfile
+from database import SessionLocal
+import models
+from world_import import WorldImporter, ArchiveError, IMPORT_BATCH_SIZE
+
+
+def iter_archive_lines(path: str):
+    if tarfile.is_tarfile(path):
+        # "r|*" reads the tarball as a forward-only stream, any compression
+        with tarfile.open(path, mode="r|*") as archive:
+            for member in archive:
+                if member.isfile() and member.name.endswith(".ndjson"):
+                    yield from archive.extractfile(member)
+        return
+    with open(path, "rb") as raw:
+        gzipped = raw.read(2) == b"\x1f\x8b"
+    opener = gzip.open if gzipped else open
+    with opener(path, "rb") as f:
+        yield from f
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a world archive (NDJSON, .gz or tarball)")
+    parser.add_argument("archive")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--world-id", type=int, help="import into this existing world")
+    target.add_argument("--owner", help="create a new world for this username from the archive header")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.world_id is not None:
+            world = db.get(models.World, args.world_id)
+            if world is None:
+                sys.exit(f"World {args.world_id} not found")
+            owner_id = world.user_id
+        else:
+            owner = db.query(models.User).filter(models.User.username == args.owner).first()
+            if owner is None:
+                sys.exit(f"User '{args.owner}' not found")
+            owner_id = owner.id
+
+        importer = WorldImporter(db, owner_id, args.world_id, batch_size=args.batch_size)
+        try:
+            for line in iter_archive_lines(args.archive):
+                importer.feed(line)
+            report = importer.finish()
+        except ArchiveError as e:
+            importer.abort()
+            sys.exit(f"Could not import archive: {e}")
+    finally:
+        db.close()
+
+    print(f"Imported into world {report['world_id']}: {report['imported']}")
+    if report["skipped"]:
+        print(f"Skipped {report['skipped']} invalid records, e.g.:")
+        for error in report["errors"][:10]:
+            print(f"  line {error['line']}: {error['errors']}")
+    if report["unresolved_locations"]:
+        print(f"{report['unresolved_locations']} events referenced locations missing from the archive")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+# location_tree.py
+#
+# Location containment (continent > kingdom > city > tavern) kept as a
+# closure table: location_closure holds one row per (ancestor, descendant)
+# pair with the number of levels between them, each location included as
+# its own ancestor at depth 0. Subtrees, breadcrumbs and subtree counts are
+# then single indexed queries at any depth; the cost moves to writes, which
+# touch one row per ancestor (insert) or per ancestor x descendant (move).
+#
+# Every write is one statement built here and run by the sync or async
+# wrapper, so the sync and async routers maintain the table the same way.
+from sqlalchemy import Integer, bindparam, delete, func, insert, literal, or_, select, true, union_all, update
+from sqlalchemy.orm import aliased
+import models
+
+Closure = models.LocationClosure
+Location = models.Location
+
+
+class TreeError(ValueError):
+    pass
+
+
+# -------------------
+# Write statements
+# -------------------
+# Run with [{"node_id", "parent_id"}, ...]; parent_id may be None (a root).
+# The node's ancestors are its parent's ancestors one level further away.
+# INSERT ... SELECT goes through the Core table: with a parameter list the
+# ORM entity would turn it into an ORM bulk insert.
+def _add_statement():
+    node_id = bindparam("node_id", type_=Integer)
+    parent_id = bindparam("parent_id", type_=Integer)
+    return insert(Closure.__table__).from_select(
+        ["ancestor_id", "descendant_id", "depth"],
+        union_all(
+            select(Closure.ancestor_id, node_id, Closure.depth + 1).where(Closure.descendant_id == parent_id),
+            select(node_id, node_id, literal(0, Integer)),
+        ),
+    )
+
+
+_ADD = _add_statement()
+
+
+def _subtree(node_id: int):
+    inner = aliased(Closure)
+    return select(inner.descendant_id).where(inner.ancestor_id == node_id)
+
+
+# Moving a subtree: unlink it from every ancestor outside it, then link it
+# under each of the new parent's ancestors (including the parent itself)
+def _move_statements(node_id: int, parent_id):
+    statements = [
+        delete(Closure)
+        .where(Closure.descendant_id.in_(_subtree(node_id)), Closure.ancestor_id.not_in(_subtree(node_id)))
+        .execution_options(synchronize_session=False)
+    ]
+    if parent_id is not None:
+        above, below = aliased(Closure), aliased(Closure)
+        statements.append(insert(Closure.__table__).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            # Every new ancestor x every subtree node, on purpose
+            select(above.ancestor_id, below.descendant_id, above.depth + below.depth + 1)
+            .select_from(above).join(below, true())
+            .where(above.descendant_id == parent_id, below.ancestor_id == node_id),
+        ))
+    return statements
+
+
+# Removing a location: its children move up to its parent, so every path
+# that ran through it gets one level shorter
+def _remove_statements(node_id: int, parent_id):
+    above, below = aliased(Closure), aliased(Closure)
+    return [
+        update(Closure)
+        .where(
+            Closure.ancestor_id.in_(select(above.ancestor_id).where(above.descendant_id == node_id, above.depth > 0)),
+            Closure.descendant_id.in_(select(below.descendant_id).where(below.ancestor_id == node_id, below.depth > 0)),
+        )
+        .values(depth=Closure.depth - 1)
+        .execution_options(synchronize_session=False),
+        delete(Closure)
+        .where(or_(Closure.ancestor_id == node_id, Closure.descendant_id == node_id))
+        .execution_options(synchronize_session=False),
+        update(Location)
+        .where(Location.parent_id == node_id)
+        .values(parent_id=parent_id)
+        .execution_options(synchronize_session=False),
+    ]
+
+
+# A location cannot move under itself or anything below it
+def _cycle_statement(node_id: int, parent_id: int):
+    return select(func.count()).select_from(Closure).where(
+        Closure.ancestor_id == node_id, Closure.descendant_id == parent_id
+    )
+
+
+def _parent_statement(world_id: int, parent_id: int):
+    return select(func.count()).select_from(Location).where(Location.id == parent_id, Location.world_id == world_id)
+
+
+# -------------------
+# Sync
+# -------------------
+def add(db, rows: list):
+    if rows:
+        db.execute(_ADD, rows)
+
+
+def check_parent(db, world_id: int, parent_id, node_id: int = None):
+    if parent_id is None:
+        return
+    if not db.scalar(_parent_statement(world_id, parent_id)):
+        raise TreeError("Parent location not found in this world")
+    if node_id is not None and db.scalar(_cycle_statement(node_id, parent_id)):
+        raise TreeError("A location cannot be moved inside itself")
+
+
+def move(db, node_id: int, parent_id):
+    for statement in _move_statements(node_id, parent_id):
+        db.execute(statement)
+
+
+def remove(db, node_id: int, parent_id):
+    for statement in _remove_statements(node_id, parent_id):
+        db.execute(statement)
+
+
+# -------------------
+# Async
+# -------------------
+async def add_async(db, rows: list):
+    if rows:
+        await db.execute(_ADD, rows)
+
+
+async def check_parent_async(db, world_id: int, parent_id, node_id: int = None):
+    if parent_id is None:
+        return
+    if not await db.scalar(_parent_statement(world_id, parent_id)):
+        raise TreeError("Parent location not found in this world")
+    if node_id is not None and await db.scalar(_cycle_statement(node_id, parent_id)):
+        raise TreeError("A location cannot be moved inside itself")
+
+
+async def move_async(db, node_id: int, parent_id):
+    for statement in _move_statements(node_id, parent_id):
+        await db.execute(statement)
+
+
+async def remove_async(db, node_id: int, parent_id):
+    for statement in _remove_statements(node_id, parent_id):
+        await db.execute(statement)
+
+
+# For a batch of new locations linked only among themselves (archive
+# imports): {id: parent id} with parents missing from the batch dropped and
+# any cycle cut, so every location ends up under a root
+def clean_parents(parents: dict) -> dict:
+    parents = {node_id: parent_id if parent_id in parents else None for node_id, parent_id in parents.items()}
+    for node_id in parents:
+        seen, ancestor = set(), node_id
+        while ancestor is not None:
+            if ancestor in seen:
+                parents[ancestor] = None
+                break
+            seen.add(ancestor)
+            ancestor = parents[ancestor]
+    return parents
+
+
+def closure_rows(parents: dict) -> list:
+    rows = []
+    for node_id in parents:
+        ancestor, depth = node_id, 0
+        while ancestor is not None:
+            rows.append({"ancestor_id": ancestor, "descendant_id": node_id, "depth": depth})
+            ancestor, depth = parents[ancestor], depth + 1
+    return rows
+
+
+# -------------------
+# Reads (one statement each)
+# -------------------
+def subtree_statement(node_id: int, max_depth: int = None):
+    statement = (
+        select(Location, Closure.depth)
+        .join(Closure, Closure.descendant_id == Location.id)
+        .where(Closure.ancestor_id == node_id, Closure.depth > 0)
+    )
+    if max_depth is not None:
+        statement = statement.where(Closure.depth <= max_depth)
+    return statement
+
+
+# Root first, ending with the location itself
+def ancestors_statement(node_id: int):
+    return (
+        select(Location, Closure.depth)
+        .join(Closure, Closure.ancestor_id == Location.id)
+        .where(Closure.descendant_id == node_id)
+        .order_by(Closure.depth.desc())
+    )
+
+
+# Locations below the node and events anywhere in its subtree (itself included)
+def counts_statement(node_id: int):
+    return (
+        select(
+            func.count(func.distinct(Closure.descendant_id)) - 1,
+            func.count(models.Event.id),
+            func.max(Closure.depth),
+        )
+        .select_from(Closure)
+        .outerjoin(models.Event, models.Event.location_id == Closure.descendant_id)
+        .where(Closure.ancestor_id == node_id)
+    )
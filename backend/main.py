@@ -1,12 +1,15 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-import models
-from database import engine
-from routers import users, worlds, characters, events, locations
+from database import DB_MODE
+from hashing import password_pool
+from routers import users, worlds, characters, events, locations, internal, bulk, archive, search, typeahead, timeline, calendars, relationships, location_tree, spatial, routes
+from routers import async_worlds, async_characters, async_events, async_locations
 
-models.Base.metadata.create_all(bind=engine)
+# Schema changes are applied by migrate.py as a separate deploy step; workers
+# never inspect or create tables at startup
 
 app = FastAPI()
+app.add_event_handler("shutdown", password_pool.shutdown)
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,10 +20,29 @@ app.add_middleware(
 )
 
 app.include_router(users.router)
-app.include_router(worlds.router)
-app.include_router(characters.router)
-app.include_router(events.router)
-app.include_router(locations.router)
+# DB_MODE=async swaps the world element routers for their async def twins
+if DB_MODE == "async":
+    app.include_router(async_worlds.router)
+    app.include_router(async_characters.router)
+    app.include_router(async_events.router)
+    app.include_router(async_locations.router)
+else:
+    app.include_router(worlds.router)
+    app.include_router(characters.router)
+    app.include_router(events.router)
+    app.include_router(locations.router)
+# Routers below have no async twin and are mounted in both modes
+app.include_router(bulk.router)
+app.include_router(archive.router)
+app.include_router(search.router)
+app.include_router(typeahead.router)
+app.include_router(timeline.router)
+app.include_router(calendars.router)
+app.include_router(relationships.router)
+app.include_router(location_tree.router)
+app.include_router(spatial.router)
+app.include_router(routes.router)
+app.include_router(internal.router)
 
 @app.get("/")
 def root():
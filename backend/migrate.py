@@ -0,0 +1,110 @@
+# migrate.py
+#
+# Versioned schema migrations. Run once per deploy, before starting uvicorn:
+#
+#   python migrate.py            apply pending migrations
+#   python migrate.py status     list applied / pending migrations
+#
+# Migrations live in migrations/ as NNNN_name.sql or NNNN_name.py (defining
+# upgrade(connection)) and are applied in filename order, each in its own
+# transaction together with its row in schema_migrations.
+import importlib.util
+import os
+import re
+import sys
+from datetime import datetime
+from sqlalchemy import MetaData, Table, Column, String, DateTime, select, text
+from database import engine
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+MIGRATION_FILE = re.compile(r"^(\d{4})_(\w+)\.(sql|py)$")
+
+# Arbitrary constant shared by every runner so concurrent deploys serialize
+ADVISORY_LOCK_ID = 71_530_001
+
+metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations", metadata,
+    Column("version", String, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def discover():
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = MIGRATION_FILE.match(filename)
+        if match:
+            version, name, kind = match.groups()
+            migrations.append((version, name, kind, os.path.join(MIGRATIONS_DIR, filename)))
+    versions = [m[0] for m in migrations]
+    duplicates = {v for v in versions if versions.count(v) > 1}
+    if duplicates:
+        raise RuntimeError(f"Duplicate migration versions: {', '.join(sorted(duplicates))}")
+    return migrations
+
+
+def applied_versions(connection):
+    metadata.create_all(bind=connection, checkfirst=True)
+    return set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+
+def _run_sql(connection, path):
+    with open(path) as f:
+        # Drop comment lines first so a ';' inside a comment can't split a statement
+        sql = "\n".join(line for line in f.read().splitlines() if not line.strip().startswith("--"))
+    for statement in sql.split(";"):
+        if statement.strip():
+            connection.execute(text(statement))
+
+
+def _run_python(connection, path, version):
+    spec = importlib.util.spec_from_file_location(f"migration_{version}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.upgrade(connection)
+
+
+def upgrade():
+    with engine.connect() as lock_connection:
+        if engine.dialect.name == "postgresql":
+            lock_connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+            lock_connection.commit()
+        try:
+            with engine.begin() as connection:
+                done = applied_versions(connection)
+            pending = [m for m in discover() if m[0] not in done]
+            if not pending:
+                print("Database schema is up to date")
+            for version, name, kind, path in pending:
+                print(f"Applying {version}_{name}.{kind} ...")
+                with engine.begin() as connection:
+                    if kind == "sql":
+                        _run_sql(connection, path)
+                    else:
+                        _run_python(connection, path, version)
+                    connection.execute(schema_migrations.insert().values(
+                        version=version, name=name, applied_at=datetime.utcnow()
+                    ))
+        finally:
+            if engine.dialect.name == "postgresql":
+                lock_connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": ADVISORY_LOCK_ID})
+                lock_connection.commit()
+
+
+def status():
+    with engine.begin() as connection:
+        done = applied_versions(connection)
+    for version, name, kind, path in discover():
+        print(f"{'applied' if version in done else 'pending'}  {version}_{name}.{kind}")
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "upgrade"
+    if command == "upgrade":
+        upgrade()
+    elif command == "status":
+        status()
+    else:
+        sys.exit(f"Unknown command '{command}' (expected 'upgrade' or 'status')")
@@ -0,0 +1,52 @@
+# 0000_baseline.py
+# The schema as it stood when tables were still created by
+# Base.metadata.create_all() in main.py. Frozen here on purpose: later
+# migrations alter these tables, so this must not follow models.py.
+# Existing tables are left alone (checkfirst), so databases created by the old
+# create_all() adopt the migration history without changes.
+from sqlalchemy import MetaData, Table, Column, Integer, String, Text, ForeignKey, Date
+
+
+def upgrade(connection):
+    metadata = MetaData()
+    Table(
+        "users", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("username", String, unique=True, index=True),
+        Column("email", String, unique=True, index=True),
+        Column("full_name", String),
+        Column("hashed_password", String),
+    )
+    Table(
+        "worlds", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("name", String, index=True),
+        Column("description", String),
+        Column("user_id", Integer, ForeignKey("users.id")),
+    )
+    Table(
+        "characters", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("name", String),
+        Column("description", String),
+        Column("role", String),
+        Column("world_id", Integer, ForeignKey("worlds.id")),
+    )
+    Table(
+        "locations", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("name", String),
+        Column("description", String),
+        Column("world_id", Integer, ForeignKey("worlds.id")),
+    )
+    Table(
+        "events", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("title", String, nullable=False),
+        Column("date", Date, nullable=True),
+        Column("description", Text, nullable=True),
+        Column("location_id", Integer, ForeignKey("locations.id"), nullable=True),
+        Column("user_id", Integer, ForeignKey("users.id"), nullable=True),
+        Column("world_id", Integer, ForeignKey("worlds.id"), nullable=True),
+    )
+    metadata.create_all(bind=connection, checkfirst=True)
@@ -0,0 +1,11 @@
+-- Indexes for per-world keyset scans and ownership lookups.
+-- Foreign keys are not indexed automatically in Postgres; without these every
+-- per-world list and join(World) ownership check is a sequential scan.
+-- The composite (world_id, id) indexes also cover plain world_id lookups, so
+-- no separate single-column world_id index is created.
+CREATE INDEX IF NOT EXISTS ix_worlds_user_id_id ON worlds (user_id, id);
+CREATE INDEX IF NOT EXISTS ix_characters_world_id_id ON characters (world_id, id);
+CREATE INDEX IF NOT EXISTS ix_events_world_id_id ON events (world_id, id);
+CREATE INDEX IF NOT EXISTS ix_events_location_id ON events (location_id);
+CREATE INDEX IF NOT EXISTS ix_events_user_id ON events (user_id);
+CREATE INDEX IF NOT EXISTS ix_locations_world_id_id ON locations (world_id, id);
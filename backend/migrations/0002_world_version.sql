@@ -0,0 +1,2 @@
+-- Per-world version counter behind ETags and cache invalidation (versioning.py)
+ALTER TABLE worlds ADD COLUMN version INTEGER NOT NULL DEFAULT 0;
@@ -0,0 +1,78 @@
+# 0003_fulltext.py
+# Full-text search indexes for GET /worlds/{world_id}/search (see fulltext.py).
+#
+# Postgres: a stored generated tsvector column per table plus a GIN index;
+# the database keeps it current on every insert/update.
+# SQLite: one FTS5 table over all three tables, kept current by triggers.
+# rowid is entity_id * 4 + a per-table code, so trigger deletes are rowid
+# lookups rather than scans.
+from sqlalchemy import text
+
+# Must match fulltext.TS_CONFIG
+TS_CONFIG = "english"
+
+# table -> (weight A column, weight B column, weight C column or None)
+SEARCH_COLUMNS = {
+    "characters": ("name", "description", "role"),
+    "events": ("title", "description", None),
+    "locations": ("name", "description", None),
+}
+
+# Must match fulltext.SQLITE_KIND_CODES
+SQLITE_KIND_CODES = {"characters": 1, "events": 2, "locations": 3}
+
+
+def _tsvector(a: str, b: str, c):
+    parts = [
+        f"setweight(to_tsvector('{TS_CONFIG}', coalesce({a}, '')), 'A')",
+        f"setweight(to_tsvector('{TS_CONFIG}', coalesce({b}, '')), 'B')",
+    ]
+    if c:
+        parts.append(f"setweight(to_tsvector('{TS_CONFIG}', coalesce({c}, '')), 'C')")
+    return " || ".join(parts)
+
+
+def _upgrade_postgresql(connection):
+    for table, (a, b, c) in SEARCH_COLUMNS.items():
+        connection.execute(text(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS ({_tsvector(a, b, c)}) STORED"
+        ))
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} USING GIN (search_vector)"
+        ))
+
+
+def _sqlite_values(table: str, row: str):
+    a, b, c = SEARCH_COLUMNS[table]
+    body = f"coalesce({row}.{b}, '')"
+    if c:
+        body = f"{body} || ' ' || coalesce({row}.{c}, '')"
+    return f"{row}.id * 4 + {SQLITE_KIND_CODES[table]}, {row}.world_id, {row}.{a}, {body}"
+
+
+def _upgrade_sqlite(connection):
+    connection.execute(text(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+        "world_id UNINDEXED, title, body, tokenize = 'porter unicode61')"
+    ))
+    for table, code in SQLITE_KIND_CODES.items():
+        insert = f"INSERT INTO search_index (rowid, world_id, title, body) VALUES ({_sqlite_values(table, 'new')});"
+        delete = f"DELETE FROM search_index WHERE rowid = old.id * 4 + {code};"
+        connection.execute(text(f"CREATE TRIGGER IF NOT EXISTS {table}_search_ai AFTER INSERT ON {table} BEGIN {insert} END"))
+        connection.execute(text(f"CREATE TRIGGER IF NOT EXISTS {table}_search_au AFTER UPDATE ON {table} BEGIN {delete} {insert} END"))
+        connection.execute(text(f"CREATE TRIGGER IF NOT EXISTS {table}_search_ad AFTER DELETE ON {table} BEGIN {delete} END"))
+        connection.execute(text(
+            f"INSERT INTO search_index (rowid, world_id, title, body) "
+            f"SELECT {_sqlite_values(table, table)} FROM {table}"
+        ))
+
+
+def upgrade(connection):
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        _upgrade_postgresql(connection)
+    elif dialect == "sqlite":
+        _upgrade_sqlite(connection)
+    else:
+        print(f"  no full-text search support for {dialect}; /search will be unavailable")
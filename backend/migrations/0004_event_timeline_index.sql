@@ -0,0 +1,3 @@
+-- Timeline scans (timeline.py): date-range filter and (date, id) keyset order
+-- within one world, straight off the index
+CREATE INDEX IF NOT EXISTS ix_events_world_id_date_id ON events (world_id, date, id);
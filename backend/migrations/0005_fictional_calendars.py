@@ -0,0 +1,50 @@
+# 0005_fictional_calendars.py
+# Per-world calendars, and event dates as an indexed day ordinal next to
+# their display text (see calendars.py). Existing dates are all Gregorian:
+# their ordinal is date.toordinal() and their display form the ISO date.
+# The timeline now scans (world_id, date_ordinal, id), so the (world_id,
+# date, id) index from 0004 is dropped.
+from datetime import date
+from sqlalchemy import MetaData, Table, Column, Integer, ForeignKey, JSON, text
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def _backfill(connection):
+    last_id = 0
+    while True:
+        rows = connection.execute(text(
+            "SELECT id, date FROM events WHERE date IS NOT NULL AND id > :last_id ORDER BY id LIMIT :limit"
+        ), {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE}).all()
+        if not rows:
+            return
+        updates = []
+        for event_id, value in rows:
+            # SQLite hands DATE columns back as text
+            day = value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+            updates.append({"id": event_id, "ordinal": day.toordinal(), "display": day.isoformat()})
+        connection.execute(text(
+            "UPDATE events SET date_ordinal = :ordinal, date_display = :display WHERE id = :id"
+        ), updates)
+        last_id = rows[-1][0]
+
+
+def upgrade(connection):
+    metadata = MetaData()
+    # Only here so the foreign key resolves; the table already exists
+    Table("worlds", metadata, Column("id", Integer, primary_key=True))
+    Table(
+        "calendars", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("world_id", Integer, ForeignKey("worlds.id"), unique=True, nullable=False),
+        Column("definition", JSON, nullable=False),
+    )
+    metadata.create_all(bind=connection, checkfirst=True)
+
+    connection.execute(text("ALTER TABLE events ADD COLUMN date_ordinal BIGINT"))
+    connection.execute(text("ALTER TABLE events ADD COLUMN date_display VARCHAR"))
+    _backfill(connection)
+    connection.execute(text("DROP INDEX IF EXISTS ix_events_world_id_date_id"))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_events_world_id_date_ordinal_id ON events (world_id, date_ordinal, id)"
+    ))
@@ -0,0 +1,6 @@
+-- Events at a location (GET /locations/{location_id}/events) are listed in
+-- id order with keyset pagination, so the location_id index from 0001 is
+-- widened to (location_id, id); it still covers plain location_id lookups
+-- such as the foreign key check when a location is deleted.
+CREATE INDEX IF NOT EXISTS ix_events_location_id_id ON events (location_id, id);
+DROP INDEX IF EXISTS ix_events_location_id;
@@ -0,0 +1,24 @@
+# 0007_character_relationships.py
+# Typed, directed edges between characters of one world (see character_graph.py).
+# Indexed from both endpoints: (source_id, target_id, type) doubles as the
+# uniqueness constraint, and (target_id, source_id) serves incoming edges.
+from sqlalchemy import MetaData, Table, Column, Index, Integer, String, ForeignKey
+
+
+def upgrade(connection):
+    metadata = MetaData()
+    # Only here so the foreign keys resolve; the tables already exist
+    Table("worlds", metadata, Column("id", Integer, primary_key=True))
+    Table("characters", metadata, Column("id", Integer, primary_key=True))
+    Table(
+        "character_relationships", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("world_id", Integer, ForeignKey("worlds.id"), nullable=False),
+        Column("source_id", Integer, ForeignKey("characters.id"), nullable=False),
+        Column("target_id", Integer, ForeignKey("characters.id"), nullable=False),
+        Column("type", String(64), nullable=False),
+        Index("ix_character_relationships_world_id_id", "world_id", "id"),
+        Index("ix_character_relationships_source_id_target_id_type", "source_id", "target_id", "type", unique=True),
+        Index("ix_character_relationships_target_id_source_id", "target_id", "source_id"),
+    )
+    metadata.create_all(bind=connection, checkfirst=True)
@@ -0,0 +1,28 @@
+# 0008_location_tree.py
+# Nested locations (see location_tree.py): locations.parent_id plus a
+# closure table holding every (ancestor, descendant, depth) pair, so subtree,
+# breadcrumb and subtree-count reads are single indexed queries. Existing
+# locations become roots: their only closure row is themselves at depth 0.
+from sqlalchemy import MetaData, Table, Column, Index, Integer, ForeignKey, text
+
+
+def upgrade(connection):
+    connection.execute(text(
+        "ALTER TABLE locations ADD COLUMN parent_id INTEGER REFERENCES locations (id) ON DELETE SET NULL"
+    ))
+    connection.execute(text("CREATE INDEX IF NOT EXISTS ix_locations_parent_id ON locations (parent_id)"))
+
+    metadata = MetaData()
+    # Only here so the foreign keys resolve; the table already exists
+    Table("locations", metadata, Column("id", Integer, primary_key=True))
+    Table(
+        "location_closure", metadata,
+        Column("ancestor_id", Integer, ForeignKey("locations.id", ondelete="CASCADE"), primary_key=True),
+        Column("descendant_id", Integer, ForeignKey("locations.id", ondelete="CASCADE"), primary_key=True),
+        Column("depth", Integer, nullable=False),
+        Index("ix_location_closure_descendant_id_depth", "descendant_id", "depth"),
+    )
+    metadata.create_all(bind=connection, checkfirst=True)
+    connection.execute(text(
+        "INSERT INTO location_closure (ancestor_id, descendant_id, depth) SELECT id, id, 0 FROM locations"
+    ))
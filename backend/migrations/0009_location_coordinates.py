@@ -0,0 +1,15 @@
+# 0009_location_coordinates.py
+# Map coordinates for locations (see spatial.py). Postgres gets a GiST index
+# on point(x, y) for bounding-box (<@) and nearest-neighbour (<->) queries;
+# SQLite has no spatial index and is served from an in-process quadtree.
+from sqlalchemy import text
+
+
+def upgrade(connection):
+    connection.execute(text("ALTER TABLE locations ADD COLUMN x FLOAT"))
+    connection.execute(text("ALTER TABLE locations ADD COLUMN y FLOAT"))
+    if connection.dialect.name == "postgresql":
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_locations_point ON locations USING GIST (point(x, y)) "
+            "WHERE x IS NOT NULL AND y IS NOT NULL"
+        ))
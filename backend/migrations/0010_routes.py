@@ -0,0 +1,26 @@
+# 0010_routes.py
+# Weighted travel routes between locations of one world (see travel.py).
+# Each endpoint is indexed so a location's routes can be found (and removed
+# with it) without scanning the world.
+from sqlalchemy import MetaData, Table, Column, Index, Integer, Float, Boolean, String, ForeignKey
+
+
+def upgrade(connection):
+    metadata = MetaData()
+    # Only here so the foreign keys resolve; the tables already exist
+    Table("worlds", metadata, Column("id", Integer, primary_key=True))
+    Table("locations", metadata, Column("id", Integer, primary_key=True))
+    Table(
+        "routes", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("world_id", Integer, ForeignKey("worlds.id"), nullable=False),
+        Column("source_id", Integer, ForeignKey("locations.id"), nullable=False),
+        Column("target_id", Integer, ForeignKey("locations.id"), nullable=False),
+        Column("travel_time", Float, nullable=False),
+        Column("bidirectional", Boolean, nullable=False, server_default="1"),
+        Column("mode", String(32), nullable=True),
+        Index("ix_routes_world_id_id", "world_id", "id"),
+        Index("ix_routes_source_id", "source_id"),
+        Index("ix_routes_target_id", "target_id"),
+    )
+    metadata.create_all(bind=connection, checkfirst=True)
@@ -0,0 +1,11 @@
+-- The world owner's id on characters and locations (events already carry
+-- user_id), so detail/update/delete ownership checks filter the entity row
+-- itself instead of joining worlds. Existing rows, events included, are
+-- filled from their world; ownership.py keeps them in step from now on.
+ALTER TABLE characters ADD COLUMN user_id INTEGER REFERENCES users (id);
+ALTER TABLE locations ADD COLUMN user_id INTEGER REFERENCES users (id);
+UPDATE characters SET user_id = (SELECT worlds.user_id FROM worlds WHERE worlds.id = characters.world_id);
+UPDATE locations SET user_id = (SELECT worlds.user_id FROM worlds WHERE worlds.id = locations.world_id);
+UPDATE events SET user_id = (SELECT worlds.user_id FROM worlds WHERE worlds.id = events.world_id) WHERE world_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS ix_characters_user_id ON characters (user_id);
+CREATE INDEX IF NOT EXISTS ix_locations_user_id ON locations (user_id);
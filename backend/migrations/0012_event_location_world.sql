@@ -0,0 +1,6 @@
+-- Event creation used to accept any location_id, including a location in
+-- another user's world, which GET /events/{id}?embed=location would then
+-- return. The routers now check it; this clears links made before that.
+UPDATE events SET location_id = NULL
+WHERE location_id IS NOT NULL
+  AND NOT EXISTS (SELECT 1 FROM locations WHERE locations.id = events.location_id AND locations.world_id = events.world_id);
@@ -0,0 +1,50 @@
+# 0013_fulltext_weights.py
+# Index the same columns with the same weights on both backends (see
+# fulltext.SEARCH_WEIGHTS). The Postgres tsvectors from 0003 already weight
+# name/title A, description B and a character's role C. The SQLite FTS5 table
+# folded role into its body column, so a role match ranked like a description
+# match. search_index is rebuilt with role in a column of its own.
+# Postgres is unchanged.
+from sqlalchemy import text
+
+# Must match fulltext.SQLITE_KIND_CODES
+SQLITE_KIND_CODES = {"characters": 1, "events": 2, "locations": 3}
+
+# table -> (title column, body column, role column or None)
+SEARCH_COLUMNS = {
+    "characters": ("name", "description", "role"),
+    "events": ("title", "description", None),
+    "locations": ("name", "description", None),
+}
+
+
+def _sqlite_values(table: str, row: str):
+    title, body, role = SEARCH_COLUMNS[table]
+    role = f"{row}.{role}" if role else "NULL"
+    return f"{row}.id * 4 + {SQLITE_KIND_CODES[table]}, {row}.world_id, {row}.{title}, {row}.{body}, {role}"
+
+
+def _upgrade_sqlite(connection):
+    for table in SQLITE_KIND_CODES:
+        for suffix in ("ai", "au", "ad"):
+            connection.execute(text(f"DROP TRIGGER IF EXISTS {table}_search_{suffix}"))
+    connection.execute(text("DROP TABLE IF EXISTS search_index"))
+    connection.execute(text(
+        "CREATE VIRTUAL TABLE search_index USING fts5("
+        "world_id UNINDEXED, title, body, role, tokenize = 'porter unicode61')"
+    ))
+    for table, code in SQLITE_KIND_CODES.items():
+        insert = f"INSERT INTO search_index (rowid, world_id, title, body, role) VALUES ({_sqlite_values(table, 'new')});"
+        delete = f"DELETE FROM search_index WHERE rowid = old.id * 4 + {code};"
+        connection.execute(text(f"CREATE TRIGGER {table}_search_ai AFTER INSERT ON {table} BEGIN {insert} END"))
+        connection.execute(text(f"CREATE TRIGGER {table}_search_au AFTER UPDATE ON {table} BEGIN {delete} {insert} END"))
+        connection.execute(text(f"CREATE TRIGGER {table}_search_ad AFTER DELETE ON {table} BEGIN {delete} END"))
+        connection.execute(text(
+            f"INSERT INTO search_index (rowid, world_id, title, body, role) "
+            f"SELECT {_sqlite_values(table, table)} FROM {table}"
+        ))
+
+
+def upgrade(connection):
+    if connection.dialect.name == "sqlite":
+        _upgrade_sqlite(connection)
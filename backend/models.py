@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Date
+from sqlalchemy import Column, Integer, BigInteger, Boolean, Float, String, Text, ForeignKey, Date, Index, JSON
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -23,12 +23,31 @@ class World(Base):
     name = Column(String, index=True)
     description = Column(String)
     user_id = Column(Integer, ForeignKey("users.id"))
+    # Bumped by every write to the world's characters, events and locations (see versioning.py)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Ownership filter + keyset order for GET /worlds/
+    __table_args__ = (Index("ix_worlds_user_id_id", "user_id", "id"),)
 
     # Relationships
     owner = relationship("User", back_populates="worlds")
     characters = relationship("Character", back_populates="world", cascade="all, delete-orphan")
     events = relationship("Event", back_populates="world", cascade="all, delete-orphan")
     locations = relationship("Location", back_populates="world", cascade="all, delete-orphan")
+    calendar = relationship("Calendar", back_populates="world", uselist=False, cascade="all, delete-orphan")
+    character_relationships = relationship("CharacterRelationship", back_populates="world", cascade="all, delete-orphan")
+    routes = relationship("Route", back_populates="world", cascade="all, delete-orphan")
+
+
+class Calendar(Base):
+    __tablename__ = "calendars"
+
+    id = Column(Integer, primary_key=True, index=True)
+    world_id = Column(Integer, ForeignKey("worlds.id"), unique=True, nullable=False)
+    # {"months": [{"name", "days"}], "eras": [{"name", "abbreviation", "years"}]} (see calendars.py)
+    definition = Column(JSON, nullable=False)
+
+    world = relationship("World", back_populates="calendar")
 
 
 class Character(Base):
@@ -39,8 +58,49 @@ class Character(Base):
     description = Column(String)
     role = Column(String)
     world_id = Column(Integer, ForeignKey("worlds.id"))
+    # The world owner's id, copied down so ownership checks need no join to
+    # worlds; written on create and by world transfers (ownership.py)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+
+    # Per-world lists scan (world_id, id) in keyset order; also serves plain world_id lookups
+    __table_args__ = (Index("ix_characters_world_id_id", "world_id", "id"),)
+
+    # Full-text search columns/indexes are dialect-specific and live only in
+    # migrations/0003_fulltext.py (see fulltext.py)
 
     world = relationship("World", back_populates="characters")
+    # Edges go with either endpoint
+    outgoing_relationships = relationship(
+        "CharacterRelationship", foreign_keys="CharacterRelationship.source_id",
+        back_populates="source", cascade="all, delete-orphan"
+    )
+    incoming_relationships = relationship(
+        "CharacterRelationship", foreign_keys="CharacterRelationship.target_id",
+        back_populates="target", cascade="all, delete-orphan"
+    )
+
+
+class CharacterRelationship(Base):
+    __tablename__ = "character_relationships"
+
+    id = Column(Integer, primary_key=True, index=True)
+    world_id = Column(Integer, ForeignKey("worlds.id"), nullable=False)
+    # Directed: "source is <type> of target", e.g. mentor, sibling, rival
+    source_id = Column(Integer, ForeignKey("characters.id"), nullable=False)
+    target_id = Column(Integer, ForeignKey("characters.id"), nullable=False)
+    type = Column(String(64), nullable=False)
+
+    __table_args__ = (
+        Index("ix_character_relationships_world_id_id", "world_id", "id"),
+        # One edge per (source, target, type); also the outgoing-edge lookup
+        Index("ix_character_relationships_source_id_target_id_type", "source_id", "target_id", "type", unique=True),
+        # Incoming-edge lookup
+        Index("ix_character_relationships_target_id_source_id", "target_id", "source_id"),
+    )
+
+    world = relationship("World", back_populates="character_relationships")
+    source = relationship("Character", foreign_keys=[source_id], back_populates="outgoing_relationships")
+    target = relationship("Character", foreign_keys=[target_id], back_populates="incoming_relationships")
 
 
 class Event(Base):
@@ -49,12 +109,26 @@ class Event(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)  # Use 'title' not 'name'
     date = Column(Date, nullable=True)  # You have this column too
+    # Day number in the world's calendar and its formatted text (calendars.py);
+    # date itself is only filled for Gregorian worlds
+    date_ordinal = Column(BigInteger, nullable=True)
+    date_display = Column(String, nullable=True)
     description = Column(Text, nullable=True)
     location_id = Column(Integer, ForeignKey("locations.id"), nullable=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    # The world owner, as on characters and locations
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     world_id = Column(Integer, ForeignKey("worlds.id"), nullable=True)
 
+    __table_args__ = (
+        Index("ix_events_world_id_id", "world_id", "id"),
+        # Timeline range scans in (date_ordinal, id) order (timeline.py)
+        Index("ix_events_world_id_date_ordinal_id", "world_id", "date_ordinal", "id"),
+        # Events at a location, keyset-paginated by id
+        Index("ix_events_location_id_id", "location_id", "id"),
+    )
+
     world = relationship("World", back_populates="events")
+    location = relationship("Location", back_populates="events")
     
 
 class Location(Base):
@@ -64,5 +138,78 @@ class Location(Base):
     name = Column(String)
     description = Column(String)
     world_id = Column(Integer, ForeignKey("worlds.id"))
+    # The world owner, as on characters
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    # Containing location (continent > kingdom > city > tavern); the full
+    # ancestry lives in location_closure (see location_tree.py)
+    parent_id = Column(Integer, ForeignKey("locations.id", ondelete="SET NULL"), nullable=True, index=True)
+    # Position on the world map (both or neither). The Postgres GiST index on
+    # point(x, y) is created by migrations/0009_location_coordinates.py only
+    # (see spatial.py)
+    x = Column(Float, nullable=True)
+    y = Column(Float, nullable=True)
+
+    __table_args__ = (Index("ix_locations_world_id_id", "world_id", "id"),)
 
     world = relationship("World", back_populates="locations")
+    # Deleting a location keeps its events and clears their location_id
+    events = relationship("Event", back_populates="location")
+    # Its own closure rows (as descendant) go with it; SQLite does not
+    # enforce the ON DELETE CASCADE foreign keys
+    ancestry = relationship("LocationClosure", foreign_keys="LocationClosure.descendant_id", cascade="all, delete-orphan")
+    # Routes go with either end
+    outgoing_routes = relationship("Route", foreign_keys="Route.source_id", back_populates="source", cascade="all, delete-orphan")
+    incoming_routes = relationship("Route", foreign_keys="Route.target_id", back_populates="target", cascade="all, delete-orphan")
+
+    # The API's {"x", "y"} (schemas.Coordinates), None when off the map
+    @property
+    def coordinates(self):
+        if self.x is None or self.y is None:
+            return None
+        return {"x": self.x, "y": self.y}
+
+    @coordinates.setter
+    def coordinates(self, value):
+        if value is None:
+            self.x = self.y = None
+        elif isinstance(value, dict):
+            self.x, self.y = value["x"], value["y"]
+        else:
+            self.x, self.y = value.x, value.y
+
+
+class LocationClosure(Base):
+    __tablename__ = "location_closure"
+
+    # One row per (ancestor, descendant) pair, including each location with
+    # itself at depth 0. The primary key serves subtree scans in descendant id
+    # order; the second index serves ancestor breadcrumbs.
+    ancestor_id = Column(Integer, ForeignKey("locations.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("locations.id", ondelete="CASCADE"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+
+    __table_args__ = (Index("ix_location_closure_descendant_id_depth", "descendant_id", "depth"),)
+
+
+class Route(Base):
+    __tablename__ = "routes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    world_id = Column(Integer, ForeignKey("worlds.id"), nullable=False)
+    source_id = Column(Integer, ForeignKey("locations.id"), nullable=False)
+    target_id = Column(Integer, ForeignKey("locations.id"), nullable=False)
+    # In whatever unit the world measures travel in (hours, days, ...)
+    travel_time = Column(Float, nullable=False)
+    # Most roads run both ways; a one-way route only goes source -> target
+    bidirectional = Column(Boolean, nullable=False, default=True, server_default="1")
+    mode = Column(String(32), nullable=True)  # road, sea, portal, ...
+
+    __table_args__ = (
+        Index("ix_routes_world_id_id", "world_id", "id"),
+        Index("ix_routes_source_id", "source_id"),
+        Index("ix_routes_target_id", "target_id"),
+    )
+
+    world = relationship("World", back_populates="routes")
+    source = relationship("Location", foreign_keys=[source_id], back_populates="outgoing_routes")
+    target = relationship("Location", foreign_keys=[target_id], back_populates="incoming_routes")
@@ -0,0 +1,76 @@
+# ownership.py
+#
+# Characters, locations and events carry their world owner's id (user_id),
+# so detail, update and delete requests are authorized on the entity row
+# alone. Those copies are written when the rows are created (routers, bulk
+# endpoints, world_import.py) and rewritten here when a world changes hands.
+# Edits are a single UPDATE ... RETURNING with the ownership check as its
+# WHERE clause (owned_update_statement).
+from sqlalchemy import select, update
+import models
+import versioning
+
+OWNED_MODELS = (models.Character, models.Location, models.Event)
+
+
+# -------------------
+# Owner-checked edits
+# -------------------
+# The returned row is the response, so an edit is one round trip: no SELECT
+# to load the row first and no refresh after. Keys without a column (update
+# schemas carry a few) are dropped; with nothing left to write it is the
+# same ownership-checked lookup as a plain SELECT. conditions are extra
+# WHERE clauses, e.g. that a new location_id is in the entity's world.
+def owned_update_statement(model, entity_id: int, user_id: int, values: dict, *conditions):
+    columns = model.__table__.c
+    values = {key: value for key, value in values.items() if key in columns}
+    owned = (model.id == entity_id, model.user_id == user_id, *conditions)
+    if not values:
+        return select(model).where(*owned)
+    return (
+        update(model)
+        .where(*owned)
+        .values(values)
+        .returning(model)
+        .execution_options(synchronize_session=False)
+    )
+
+
+# -------------------
+# World transfer
+# -------------------
+def _recipient_statement(username_or_email: str):
+    return select(models.User.id).where(
+        (models.User.username == username_or_email) | (models.User.email == username_or_email)
+    )
+
+
+def _transfer_statements(world_id: int, user_id: int):
+    statements = [update(models.World).where(models.World.id == world_id).values(user_id=user_id)]
+    statements.extend(
+        update(model).where(model.world_id == world_id).values(user_id=user_id)
+        for model in OWNED_MODELS
+    )
+    return [statement.execution_options(synchronize_session=False) for statement in statements]
+
+
+def find_recipient(db, username_or_email: str):
+    return db.scalar(_recipient_statement(username_or_email))
+
+
+async def find_recipient_async(db, username_or_email: str):
+    return await db.scalar(_recipient_statement(username_or_email))
+
+
+# The world and every owned row move in one transaction (the caller
+# commits); the version bump retires ETags and cached pages issued before
+def transfer_world(db, world_id: int, user_id: int):
+    for statement in _transfer_statements(world_id, user_id):
+        db.execute(statement)
+    versioning.bump_world_version(db, world_id, "world")
+
+
+async def transfer_world_async(db, world_id: int, user_id: int):
+    for statement in _transfer_statements(world_id, user_id):
+        await db.execute(statement)
+    await versioning.bump_world_version_async(db, world_id, "world")
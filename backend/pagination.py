@@ -0,0 +1,54 @@
+# pagination.py
+import os
+from typing import Optional
+from fastapi import Query
+
+# Keyset pagination on the primary key: pages are "id > after ORDER BY id
+# LIMIT n", so every page costs the same index range scan however deep the
+# client has paged.
+DEFAULT_PAGE_SIZE = int(os.getenv("PAGE_SIZE_DEFAULT", "100"))
+MAX_PAGE_SIZE = int(os.getenv("PAGE_SIZE_MAX", "1000"))
+# Rows of each collection a world snapshot returns before it is truncated
+SNAPSHOT_MAX_ITEMS = int(os.getenv("SNAPSHOT_MAX_ITEMS", "1000"))
+
+
+class PageParams:
+    def __init__(self, limit: int, after: Optional[int], unpaginated: bool):
+        self.limit = limit
+        self.after = after
+        self.unpaginated = unpaginated
+
+    # Requests with equal keys select the same rows (used as a cache key).
+    # Unpaginated requests get None and are never cached: one of them can
+    # hold a whole world, and the cache's local tier only counts entries.
+    def key(self, prefix: str = "") -> Optional[str]:
+        if self.unpaginated:
+            return None
+        return f"{prefix}{self.limit}:{self.after or 0}"
+
+
+# Dependency shared by every paginated list endpoint
+def page_params(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = Query(None, ge=0, description="next_cursor from the previous page"),
+    unpaginated: bool = Query(False, description="Return every row in one response"),
+) -> PageParams:
+    return PageParams(limit, after, unpaginated)
+
+
+# Applies the keyset window to a Query or a select(); fetches one extra row
+# so to_page can tell whether another page exists without a COUNT
+def keyset(query, id_column, params: PageParams):
+    if params.unpaginated:
+        return query.order_by(id_column)
+    if params.after is not None:
+        query = query.filter(id_column > params.after)
+    return query.order_by(id_column).limit(params.limit + 1)
+
+
+def to_page(rows, params: PageParams) -> dict:
+    rows = list(rows)
+    if params.unpaginated or len(rows) <= params.limit:
+        return {"items": rows, "next_cursor": None}
+    items = rows[:params.limit]
+    return {"items": items, "next_cursor": items[-1].id}
@@ -0,0 +1,101 @@
+# pool_metrics.py
+import bisect
+import threading
+import time
+from sqlalchemy import event, exc
+
+# Upper bounds (ms) of the checkout wait-time histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PoolMetrics:
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_sum_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)  # last bucket is +Inf
+
+    def observe_wait(self, seconds: float):
+        wait_ms = seconds * 1000
+        with self._lock:
+            self.wait_count += 1
+            self.wait_sum_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+            self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+
+    def _count(self, attr: str):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    # Hook the engine's pool events; engine may be sync or AsyncEngine.sync_engine
+    def attach(self, engine):
+        self.pool = engine.pool
+        event.listen(engine, "checkout", lambda *args: self._count("checkouts"))
+        event.listen(engine, "checkin", lambda *args: self._count("checkins"))
+        event.listen(engine, "connect", lambda *args: self._count("connects"))
+        event.listen(engine, "invalidate", lambda *args: self._count("invalidations"))
+
+    def snapshot(self) -> dict:
+        pool = self.pool
+        with self._lock:
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(list(WAIT_BUCKETS_MS) + ["+Inf"], self.wait_buckets):
+                cumulative += count
+                buckets[f"le_{bound}ms" if bound != "+Inf" else "le_+Inf"] = cumulative
+            return {
+                "pool_class": type(pool).__name__ if pool is not None else None,
+                # Live gauges straight from the pool; not every pool class has them
+                "size": _gauge(pool, "size"),
+                "checked_out": _gauge(pool, "checkedout"),
+                "idle": _gauge(pool, "checkedin"),
+                # QueuePool counts overflow from -pool_size; only positive values are real
+                "overflow": max(_gauge(pool, "overflow") or 0, 0) if pool is not None else None,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "checkout_wait": {
+                    "count": self.wait_count,
+                    "sum_ms": round(self.wait_sum_ms, 3),
+                    "max_ms": round(self.wait_max_ms, 3),
+                    "avg_ms": round(self.wait_sum_ms / self.wait_count, 3) if self.wait_count else 0.0,
+                    "buckets": buckets,
+                },
+            }
+
+
+def _gauge(pool, method: str):
+    fn = getattr(pool, method, None)
+    return fn() if callable(fn) else None
+
+
+# Pool events fire only after a connection has been handed out, so the time
+# spent queueing for one is measured by wrapping Pool.connect itself
+def instrumented_pool_class(pool_class, metrics: PoolMetrics):
+    class InstrumentedPool(pool_class):
+        def connect(self):
+            start = time.perf_counter()
+            try:
+                return super().connect()
+            except exc.TimeoutError:
+                metrics._count("timeouts")
+                raise
+            finally:
+                metrics.observe_wait(time.perf_counter() - start)
+
+    InstrumentedPool.__name__ = f"Instrumented{pool_class.__name__}"
+    return InstrumentedPool
+
+
+sync_pool_metrics = PoolMetrics("sync")
+async_pool_metrics = PoolMetrics("async")
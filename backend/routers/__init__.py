@@ -1 +1,2 @@
-from . import characters, users, worlds, events, locations
+from . import characters, users, worlds, events, locations, internal, bulk, archive, search, typeahead, timeline, calendars, relationships, location_tree, spatial, routes
+from . import async_worlds, async_characters, async_events, async_locations
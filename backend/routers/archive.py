@@ -0,0 +1,205 @@
+import json
+import logging
+import os
+import zlib
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from database import get_db, SessionLocal
+import models, schemas
+from auth import get_current_user
+from world_import import WorldImporter, ArchiveError, IMPORT_BATCH_SIZE
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/worlds", tags=["Archive"])
+
+ARCHIVE_FORMAT = "quillvania-ndjson"
+ARCHIVE_VERSION = 1
+GZIP_CONTENT_TYPES = ("application/gzip", "application/x-gzip")
+
+# Rows fetched per server-side cursor round trip, and bytes buffered per chunk
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+# Limits on what one import may inflate to and on a single NDJSON line, so a
+# gzip bomb or a body without newlines is refused instead of buffered
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", str(1024 ** 3)))
+IMPORT_MAX_LINE_BYTES = int(os.getenv("IMPORT_MAX_LINE_BYTES", str(1024 ** 2)))
+INFLATE_CHUNK_BYTES = 64 * 1024
+
+# Locations and characters go first so an importer has every one of them
+# before the routes, events and relationships that reference them
+EXPORT_SECTIONS = [
+    ("location", models.Location, schemas.Location),
+    ("route", models.Route, schemas.Route),
+    ("character", models.Character, schemas.Character),
+    ("relationship", models.CharacterRelationship, schemas.Relationship),
+    ("event", models.Event, schemas.Event),
+]
+
+
+def _ndjson_line(record_type: str, data: dict) -> str:
+    return json.dumps({"type": record_type, "data": data}, separators=(",", ":")) + "\n"
+
+
+# The request's own session is closed before a StreamingResponse body runs,
+# so the export opens a session of its own for the lifetime of the stream.
+# The world is looked up again in that session; if it was deleted or given
+# away since export_world checked it, the stream ends before the header.
+def _export_world(world_id: int, user_id: int):
+    db = SessionLocal()
+    try:
+        world = _get_owned_world(db, world_id, user_id)
+        if world is None:
+            logger.warning(f"World ID {world_id} went away before its export started")
+            return
+        header = schemas.World.model_validate(world).model_dump(mode="json")
+        header.update({"format": ARCHIVE_FORMAT, "version": ARCHIVE_VERSION})
+        # Event dates are written in the world's calendar, so it travels with them
+        if world.calendar is not None:
+            header["calendar"] = world.calendar.definition
+        # Header goes out on its own so the client gets its first byte at once
+        yield _ndjson_line("world", header)
+
+        buffer, size = [], 0
+        for record_type, model, schema in EXPORT_SECTIONS:
+            stmt = (
+                select(model)
+                .where(model.world_id == world_id)
+                .order_by(model.id)
+                .execution_options(yield_per=EXPORT_BATCH_SIZE)
+            )
+            for obj in db.scalars(stmt):
+                line = _ndjson_line(record_type, schema.model_validate(obj).model_dump(mode="json"))
+                buffer.append(line)
+                size += len(line)
+                if size >= EXPORT_CHUNK_BYTES:
+                    yield "".join(buffer)
+                    buffer, size = [], 0
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        db.close()
+
+
+# -------------------
+# Export a world as NDJSON
+# -------------------
+@router.get("/{world_id}/export")
+def export_world(
+    world_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    world = db.query(models.World).filter(
+        models.World.id == world_id,
+        models.World.user_id == current_user.id
+    ).first()
+    if not world:
+        raise HTTPException(status_code=404, detail="World not found")
+
+    logger.info(f"User {current_user.username} started export of world '{world.name}'")
+    return StreamingResponse(
+        _export_world(world_id, current_user.id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="world-{world_id}.ndjson"'},
+    )
+
+
+class ArchiveTooLarge(Exception):
+    pass
+
+
+# Inflates one body chunk at most INFLATE_CHUNK_BYTES at a time, so a small
+# compressed chunk never expands into one huge buffer
+def _inflate(decoder, chunk: bytes):
+    if decoder is None:
+        yield chunk
+        return
+    data = decoder.decompress(chunk, INFLATE_CHUNK_BYTES)
+    while True:
+        yield data
+        if not decoder.unconsumed_tail:
+            return
+        data = decoder.decompress(decoder.unconsumed_tail, INFLATE_CHUNK_BYTES)
+
+
+# Splits the inflated stream into lines, enforcing the import limits
+class _LineSplitter:
+    def __init__(self):
+        self.partial = b""
+        self.total = 0
+
+    def split(self, data: bytes) -> list:
+        self.total += len(data)
+        if self.total > IMPORT_MAX_BYTES:
+            raise ArchiveTooLarge(f"Archive is larger than {IMPORT_MAX_BYTES} bytes")
+        *complete, self.partial = (self.partial + data).split(b"\n")
+        if len(self.partial) > IMPORT_MAX_LINE_BYTES or any(len(line) > IMPORT_MAX_LINE_BYTES for line in complete):
+            raise ArchiveTooLarge(f"Archive has a line longer than {IMPORT_MAX_LINE_BYTES} bytes")
+        return complete
+
+
+def _get_owned_world(db: Session, world_id: int, user_id: int):
+    return db.query(models.World).filter(
+        models.World.id == world_id,
+        models.World.user_id == user_id
+    ).first()
+
+
+# -------------------
+# Import an NDJSON archive into a world
+# -------------------
+# The body is read incrementally and handed to the importer in batches of
+# lines, so a large archive never sits in memory. Gzip-compressed bodies
+# (Content-Encoding: gzip or an application/gzip content type) are inflated
+# on the fly, in bounded steps. Archives that inflate past IMPORT_MAX_BYTES
+# or hold a line over IMPORT_MAX_LINE_BYTES are refused with a 413.
+# Tarballs are handled by import_world.py.
+@router.post("/{world_id}/import")
+async def import_world(
+    world_id: int,
+    request: Request,
+    current_user: models.User = Depends(get_current_user)
+):
+    db = SessionLocal()
+    try:
+        world = await run_in_threadpool(_get_owned_world, db, world_id, current_user.id)
+        if not world:
+            raise HTTPException(status_code=404, detail="World not found")
+
+        importer = WorldImporter(db, current_user.id, world_id)
+        gzipped = (
+            request.headers.get("content-encoding", "").lower() == "gzip"
+            or request.headers.get("content-type", "").split(";")[0].strip() in GZIP_CONTENT_TYPES
+        )
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+
+        try:
+            splitter, lines = _LineSplitter(), []
+            async for chunk in request.stream():
+                for data in _inflate(decoder, chunk):
+                    lines.extend(splitter.split(data))
+                    if len(lines) >= IMPORT_BATCH_SIZE:
+                        await run_in_threadpool(importer.feed_lines, lines)
+                        lines = []
+            if decoder is not None:
+                lines.extend(splitter.split(decoder.flush()))
+            lines.append(splitter.partial)
+            await run_in_threadpool(importer.feed_lines, lines)
+            report = await run_in_threadpool(importer.finish)
+        except ArchiveTooLarge as e:
+            await run_in_threadpool(importer.abort)
+            raise HTTPException(status_code=413, detail=f"Could not import archive: {e}")
+        except (ArchiveError, zlib.error, UnicodeDecodeError) as e:
+            await run_in_threadpool(importer.abort)
+            raise HTTPException(status_code=422, detail=f"Could not import archive: {e}")
+
+        logger.info(f"User {current_user.username} imported {report['imported']} into world '{world.name}'")
+        return report
+    finally:
+        db.close()
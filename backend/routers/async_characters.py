@@ -0,0 +1,169 @@
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+import models, schemas
+from auth import get_current_user_async
+from pagination import PageParams, page_params, keyset, to_page
+import versioning
+import ownership
+from cache import world_cache
+
+# -------------------
+# Logging setup
+# -------------------
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# async def twin of routers/characters.py, mounted instead of it when DB_MODE=async
+router = APIRouter(prefix="/characters", tags=["Characters"], include_in_schema=True)
+
+# -------------------
+# Create Character for a Specific World
+# -------------------
+@router.post("/world/{world_id}", response_model=schemas.Character)
+async def create_character_for_world(
+    world_id: int,
+    character: schemas.CharacterCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async),
+):
+    world = await db.get(models.World, world_id)
+    if not world:
+        raise HTTPException(status_code=404, detail="World not found")
+    if world.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to add characters to this world")
+
+    db_character = models.Character(
+        name=character.name,
+        description=character.description,
+        role=character.role,
+        world_id=world_id,
+        user_id=world.user_id
+    )
+    db.add(db_character)
+    await versioning.bump_world_version_async(db, world_id, "character")
+    await db.commit()
+    await db.refresh(db_character)
+    return db_character
+
+# -------------------
+# Get All Characters in a World
+# -------------------
+@router.get("/world/{world_id}", response_model=schemas.Page[schemas.Character])
+async def get_characters_by_world(
+    world_id: int,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    version = await versioning.get_world_version_async(db, world_id, current_user.id)
+
+    if version is None:
+        logger.warning(f"User {current_user.username} tried to access characters for unauthorized world ID {world_id}")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="World not found or not yours")
+
+    etag = versioning.list_etag("character", world_id, version, request)
+    if versioning.etag_matches(request, etag):
+        return versioning.not_modified(etag)
+    versioning.set_etag(response, etag)
+
+    cached = await world_cache.get_async("character", world_id, version, page.key())
+    if cached is not None:
+        return cached
+
+    stmt = select(models.Character).where(models.Character.world_id == world_id)
+    result = await db.execute(keyset(stmt, models.Character.id, page))
+    characters = result.scalars().all()
+    logger.info(f"User {current_user.username} fetched {len(characters)} characters from world ID {world_id}")
+    return await world_cache.put_async(
+        "character", world_id, version, page.key(), schemas.Page[schemas.Character], to_page(characters, page)
+    )
+
+
+# -------------------
+# Get a Specific Character by ID
+# -------------------
+@router.get("/{char_id}", response_model=schemas.Character)
+async def get_character(
+    char_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    etag = await versioning.detail_not_modified_async(db, request, "character", models.Character, char_id, current_user.id)
+    if etag:
+        return versioning.not_modified(etag)
+
+    # Ownership is checked on the character row; the world is only joined for its version
+    result = await db.execute(
+        select(models.Character, models.World.version)
+        .join(models.World)
+        .where(models.Character.id == char_id)
+        .where(models.Character.user_id == current_user.id)
+    )
+    row = result.first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Character not found")
+    character, version = row
+    versioning.set_etag(response, versioning.detail_etag("character", character.id, character.world_id, version))
+    return character
+
+
+# -------------------
+# Update Character
+# -------------------
+@router.put("/{character_id}", response_model=schemas.Character)
+async def update_character(
+    character_id: int,
+    character_update: schemas.CharacterUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    statement = ownership.owned_update_statement(
+        models.Character, character_id, current_user.id, character_update.model_dump(exclude_unset=True)
+    )
+    character = (await db.scalars(statement)).first()
+
+    if not character:
+        raise HTTPException(status_code=404, detail="Character not found")
+
+    # The returned row is already current (expire_on_commit=False): no refresh
+    await versioning.bump_world_version_async(db, character.world_id, "character")
+    await db.commit()
+
+    logger.info(f"User {current_user.username} updated character '{character.name}' (ID: {character.id})")
+    return character
+
+# -------------------
+# Delete Character
+# -------------------
+@router.delete("/{character_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_character(
+    character_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    result = await db.execute(
+        select(models.Character)
+        .where(models.Character.id == character_id)
+        .where(models.Character.user_id == current_user.id)
+    )
+    character = result.scalars().first()
+
+    if not character:
+        logger.warning(f"User {current_user.username} tried to delete non-existing character ID {character_id}")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Character not found")
+
+    await db.delete(character)
+    await versioning.bump_world_version_async(db, character.world_id, "character")
+    # Its relationships are deleted with it
+    versioning.note_world_change(db, character.world_id, "relationship")
+    await db.commit()
+
+    logger.info(f"User {current_user.username} deleted character '{character.name}' (ID: {character.id})")
+    return
@@ -0,0 +1,231 @@
+import logging
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from database import get_async_db
+import models, schemas
+from auth import get_current_user_async
+from pagination import PageParams, page_params, keyset, to_page
+import versioning
+import ownership
+import calendars
+from cache import world_cache
+from models import Event, Location, World
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# async def twin of routers/events.py, mounted instead of it when DB_MODE=async
+router = APIRouter(prefix="/events", tags=["Events"])
+
+
+async def _get_owned_world(db: AsyncSession, world_id: int, user_id: int):
+    result = await db.execute(select(World).where(World.id == world_id, World.user_id == user_id))
+    return result.scalars().first()
+
+
+async def _get_owned_event(db: AsyncSession, event_id: int, user_id: int):
+    result = await db.execute(select(Event).where(Event.id == event_id, Event.user_id == user_id))
+    return result.scalars().first()
+
+
+async def _date_columns(db: AsyncSession, world_id: int, text) -> dict:
+    try:
+        return calendars.event_date_columns(await calendars.for_world_async(db, world_id), text)
+    except calendars.CalendarError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+# A new location_id must be in the event's own world; checked inside the UPDATE
+def _in_event_world(location_id: int):
+    return exists().where(Location.id == location_id, Location.world_id == Event.world_id)
+
+
+# Same rule for a new event, whose world is already known
+async def _check_location(db: AsyncSession, world_id: int, location_id):
+    if location_id is None:
+        return
+    if not await db.scalar(select(exists().where(Location.id == location_id, Location.world_id == world_id))):
+        raise HTTPException(status_code=422, detail="Location not found in this world")
+
+
+# -------------------
+# Create a new event
+# -------------------
+@router.post("/", response_model=schemas.Event)
+async def create_event(
+    event: schemas.EventCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    world = await _get_owned_world(db, event.world_id, current_user.id)
+    if not world:
+        raise HTTPException(status_code=404, detail="World not found")
+    await _check_location(db, event.world_id, event.location_id)
+
+    db_event = Event(
+        title=event.title,
+        description=event.description,
+        location_id=event.location_id,
+        world_id=event.world_id,
+        user_id=world.user_id,
+        **await _date_columns(db, event.world_id, event.date)
+    )
+    db.add(db_event)
+    await versioning.bump_world_version_async(db, event.world_id, "event")
+    await db.commit()
+    await db.refresh(db_event)
+    logger.info(f"User {current_user.username} created event '{db_event.title}' (ID: {db_event.id})")
+    return db_event
+
+
+# -------------------
+# Create event for a specific world
+# -------------------
+@router.post("/world/{world_id}", response_model=schemas.Event)
+async def create_event_for_world(
+    world_id: int,
+    event: schemas.EventBase,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    world = await _get_owned_world(db, world_id, current_user.id)
+    if not world:
+        raise HTTPException(status_code=404, detail="World not found")
+    await _check_location(db, world_id, event.location_id)
+
+    db_event = Event(
+        title=event.title,
+        description=event.description,
+        location_id=event.location_id,
+        world_id=world_id,
+        user_id=world.user_id,
+        **await _date_columns(db, world_id, event.date)
+    )
+    db.add(db_event)
+    await versioning.bump_world_version_async(db, world_id, "event")
+    await db.commit()
+    await db.refresh(db_event)
+
+    logger.info(f"User {current_user.username} created event '{db_event.title}' in world ID {world_id}")
+    return db_event
+
+
+# -------------------
+# Get all events for a specific world
+# -------------------
+@router.get("/world/{world_id}", response_model=schemas.Page[schemas.Event])
+async def get_events_by_world(
+    world_id: int,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    version = await versioning.get_world_version_async(db, world_id, current_user.id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="World not found")
+
+    etag = versioning.list_etag("event", world_id, version, request)
+    if versioning.etag_matches(request, etag):
+        return versioning.not_modified(etag)
+    versioning.set_etag(response, etag)
+
+    cached = await world_cache.get_async("event", world_id, version, page.key())
+    if cached is not None:
+        return cached
+
+    result = await db.execute(keyset(select(Event).where(Event.world_id == world_id), Event.id, page))
+    events = result.scalars().all()
+    logger.info(f"User {current_user.username} fetched {len(events)} events for world ID {world_id}")
+    return await world_cache.put_async(
+        "event", world_id, version, page.key(), schemas.Page[schemas.Event], to_page(events, page)
+    )
+
+
+# -------------------
+# Get a single event
+# -------------------
+@router.get("/{event_id}", response_model=schemas.EventDetail)
+async def get_event(
+    event_id: int,
+    request: Request,
+    response: Response,
+    embed: Optional[str] = Query(None, pattern="^location$", description="location: include the event's location"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    # The embedded representation gets its own ETags
+    kind = "event+location" if embed else "event"
+    etag = await versioning.detail_not_modified_async(db, request, kind, Event, event_id, current_user.id)
+    if etag:
+        return versioning.not_modified(etag)
+
+    # World joined for its version only; ownership is on the event row
+    statement = select(Event, World.version).join(World).where(Event.id == event_id, Event.user_id == current_user.id)
+    if embed:
+        statement = statement.options(joinedload(Event.location))
+    result = await db.execute(statement)
+    row = result.first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Event not found")
+    event, version = row
+    versioning.set_etag(response, versioning.detail_etag(kind, event.id, event.world_id, version))
+    return event if embed else schemas.Event.model_validate(event)
+
+
+# -------------------
+# Update an event
+# -------------------
+@router.put("/{event_id}", response_model=schemas.Event)
+async def update_event(
+    event_id: int,
+    event_update: schemas.EventUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    update_data = event_update.model_dump(exclude_unset=True)
+    if "date" in update_data:
+        try:
+            update_data.update(calendars.event_date_columns(await calendars.for_event_async(db, event_id), update_data["date"]))
+        except calendars.CalendarError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    conditions = ()
+    if update_data.get("location_id") is not None:
+        conditions = (_in_event_world(update_data["location_id"]),)
+
+    event = (await db.scalars(
+        ownership.owned_update_statement(Event, event_id, current_user.id, update_data, *conditions)
+    )).first()
+    if not event:
+        if conditions and await db.scalar(select(Event.id).where(Event.id == event_id, Event.user_id == current_user.id)):
+            raise HTTPException(status_code=422, detail="Location not found in this world")
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    await versioning.bump_world_version_async(db, event.world_id, "event")
+    await db.commit()
+
+    logger.info(f"User {current_user.username} updated event '{event.title}' (ID: {event.id})")
+    return event
+
+
+# -------------------
+# Delete an event
+# -------------------
+@router.delete("/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_event(
+    event_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    event = await _get_owned_event(db, event_id, current_user.id)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    await db.delete(event)
+    await versioning.bump_world_version_async(db, event.world_id, "event")
+    await db.commit()
+    return
@@ -0,0 +1,227 @@
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+import models, schemas
+from auth import get_current_user_async
+from pagination import PageParams, page_params, keyset, to_page
+import versioning
+import ownership
+import location_tree
+import spatial
+from cache import world_cache
+from models import Event, Location, World
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# async def twin of routers/locations.py, mounted instead of it when DB_MODE=async
+router = APIRouter(prefix="/locations", tags=["Locations"])
+
+
+async def _get_owned_world(db: AsyncSession, world_id: int, user_id: int):
+    result = await db.execute(select(World).where(World.id == world_id, World.user_id == user_id))
+    return result.scalars().first()
+
+
+async def _get_owned_location(db: AsyncSession, location_id: int, user_id: int):
+    result = await db.execute(select(Location).where(Location.id == location_id, Location.user_id == user_id))
+    return result.scalars().first()
+
+
+# -------------------
+# Create a new location
+# -------------------
+@router.post("/", response_model=schemas.Location)
+async def create_location(
+    location: schemas.LocationCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    world = await _get_owned_world(db, location.world_id, current_user.id)
+    if not world:
+        raise HTTPException(status_code=404, detail="World not found")
+    try:
+        await location_tree.check_parent_async(db, location.world_id, location.parent_id)
+    except location_tree.TreeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    db_location = Location(
+        name=location.name,
+        description=location.description,
+        world_id=location.world_id,
+        user_id=world.user_id,
+        parent_id=location.parent_id,
+        coordinates=location.coordinates
+    )
+    db.add(db_location)
+    await db.flush()
+    await location_tree.add_async(db, [{"node_id": db_location.id, "parent_id": db_location.parent_id}])
+    await versioning.bump_world_version_async(db, location.world_id, "location")
+    await db.commit()
+    await db.refresh(db_location)
+    logger.info(f"User {current_user.username} created location '{db_location.name}' (ID: {db_location.id})")
+    return db_location
+
+
+# -------------------
+# Get all locations for a specific world
+# -------------------
+@router.get("/world/{world_id}", response_model=schemas.Page[schemas.Location])
+async def get_locations_by_world(
+    world_id: int,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    version = await versioning.get_world_version_async(db, world_id, current_user.id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="World not found")
+
+    etag = versioning.list_etag("location", world_id, version, request)
+    if versioning.etag_matches(request, etag):
+        return versioning.not_modified(etag)
+    versioning.set_etag(response, etag)
+
+    cached = await world_cache.get_async("location", world_id, version, page.key())
+    if cached is not None:
+        return cached
+
+    result = await db.execute(keyset(select(Location).where(Location.world_id == world_id), Location.id, page))
+    locations = result.scalars().all()
+    logger.info(f"User {current_user.username} fetched {len(locations)} locations for world ID {world_id}")
+    return await world_cache.put_async(
+        "location", world_id, version, page.key(), schemas.Page[schemas.Location], to_page(locations, page)
+    )
+
+
+# -------------------
+# Get the events at a location
+# -------------------
+@router.get("/{location_id}/events", response_model=schemas.Page[schemas.Event])
+async def get_location_events(
+    location_id: int,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    result = await db.execute(
+        select(Location.world_id, World.version).join(World).where(Location.id == location_id, Location.user_id == current_user.id)
+    )
+    row = result.first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Location not found")
+    world_id, version = row
+
+    etag = versioning.list_etag(f"location{location_id}-event", world_id, version, request)
+    if versioning.etag_matches(request, etag):
+        return versioning.not_modified(etag)
+    versioning.set_etag(response, etag)
+
+    # Cached with the world's other event pages, so event writes drop it too
+    page_key = page.key(f"location{location_id}:")
+    cached = await world_cache.get_async("event", world_id, version, page_key)
+    if cached is not None:
+        return cached
+
+    result = await db.execute(keyset(select(Event).where(Event.location_id == location_id), Event.id, page))
+    events = result.scalars().all()
+    logger.info(f"User {current_user.username} fetched {len(events)} events for location ID {location_id}")
+    return await world_cache.put_async(
+        "event", world_id, version, page_key, schemas.Page[schemas.Event], to_page(events, page)
+    )
+
+
+# -------------------
+# Get a single location
+# -------------------
+@router.get("/{location_id}", response_model=schemas.Location)
+async def get_location(
+    location_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    etag = await versioning.detail_not_modified_async(db, request, "location", Location, location_id, current_user.id)
+    if etag:
+        return versioning.not_modified(etag)
+
+    # World joined for its version only; ownership is on the location row
+    result = await db.execute(
+        select(Location, World.version).join(World).where(Location.id == location_id, Location.user_id == current_user.id)
+    )
+    row = result.first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Location not found")
+    location, version = row
+    versioning.set_etag(response, versioning.detail_etag("location", location.id, location.world_id, version))
+    return location
+
+
+# -------------------
+# Update a location
+# -------------------
+@router.put("/{location_id}", response_model=schemas.Location)
+async def update_location(
+    location_id: int,
+    location_update: schemas.LocationUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    update_data = location_update.model_dump(exclude_unset=True)
+    if "coordinates" in update_data:
+        update_data.update(spatial.point_columns(location_update.coordinates))
+    if "parent_id" in update_data:
+        # Moving rewrites the closure table, which needs the current parent first
+        current = (await db.execute(
+            select(Location.world_id, Location.parent_id).where(Location.id == location_id, Location.user_id == current_user.id)
+        )).first()
+        if not current:
+            raise HTTPException(status_code=404, detail="Location not found")
+        if update_data["parent_id"] != current.parent_id:
+            try:
+                await location_tree.check_parent_async(db, current.world_id, update_data["parent_id"], location_id)
+            except location_tree.TreeError as e:
+                raise HTTPException(status_code=422, detail=str(e))
+            await location_tree.move_async(db, location_id, update_data["parent_id"])
+
+    location = (await db.scalars(
+        ownership.owned_update_statement(Location, location_id, current_user.id, update_data)
+    )).first()
+    if not location:
+        raise HTTPException(status_code=404, detail="Location not found")
+
+    await versioning.bump_world_version_async(db, location.world_id, "location")
+    await db.commit()
+
+    logger.info(f"User {current_user.username} updated location '{location.name}' (ID: {location.id})")
+    return location
+
+
+# -------------------
+# Delete a location
+# -------------------
+@router.delete("/{location_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_location(
+    location_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async)
+):
+    location = await _get_owned_location(db, location_id, current_user.id)
+    if not location:
+        raise HTTPException(status_code=404, detail="Location not found")
+
+    # Its sub-locations move up a level
+    await location_tree.remove_async(db, location.id, location.parent_id)
+    await db.delete(location)
+    await versioning.bump_world_version_async(db, location.world_id, "location")
+    # Routes to and from it are deleted with it
+    versioning.note_world_change(db, location.world_id, "route")
+    await db.commit()
+    return
@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+import models, schemas
+from auth import get_current_user_async
+from pagination import PageParams, page_params, keyset, to_page, SNAPSHOT_MAX_ITEMS
+import versioning
+import ownership
+
+# async def twin of routers/worlds.py, mounted instead of it when DB_MODE=async
+router = APIRouter(prefix="/worlds", tags=["Worlds"])
+
+@router.post("/", response_model=schemas.World)
+async def create_world(world: schemas.WorldCreate, db: AsyncSession = Depends(get_async_db), current_user: models.User = Depends(get_current_user_async)):
+    db_world = models.World(name=world.name, description=world.description, user_id=current_user.id)
+    db.add(db_world)
+    await db.commit()
+    await db.refresh(db_world)
+    return db_world
+
+@router.get("/", response_model=schemas.Page[schemas.World])
+async def get_worlds(page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_async_db), current_user: models.User = Depends(get_current_user_async)):
+    stmt = select(models.World).where(models.World.user_id == current_user.id)
+    result = await db.execute(keyset(stmt, models.World.id, page))
+    return to_page(result.scalars().all(), page)
+
+SNAPSHOT_COLLECTIONS = (
+    ("characters", models.Character),
+    ("events", models.Event),
+    ("locations", models.Location),
+)
+
+# One ownership check, then one keyset window per collection: a fixed four
+# queries, each capped at SNAPSHOT_MAX_ITEMS rows however large the world is
+@router.get("/{world_id}/snapshot", response_model=schemas.WorldSnapshot)
+async def get_world_snapshot(world_id: int, db: AsyncSession = Depends(get_async_db), current_user: models.User = Depends(get_current_user_async)):
+    result = await db.execute(select(models.World).where(models.World.id == world_id, models.World.user_id == current_user.id))
+    world = result.scalars().first()
+    if not world:
+        raise HTTPException(status_code=404, detail="World not found")
+
+    params = PageParams(SNAPSHOT_MAX_ITEMS, None, False)
+    snapshot = {**schemas.World.model_validate(world).model_dump(), "truncated": False}
+    for name, model in SNAPSHOT_COLLECTIONS:
+        result = await db.execute(keyset(select(model).where(model.world_id == world_id), model.id, params))
+        page = to_page(result.scalars().all(), params)
+        snapshot[name] = page["items"]
+        snapshot["truncated"] = snapshot["truncated"] or page["next_cursor"] is not None
+    return snapshot
+
+@router.post("/{world_id}/transfer", response_model=schemas.World)
+async def transfer_world(world_id: int, transfer: schemas.WorldTransfer, db: AsyncSession = Depends(get_async_db), current_user: models.User = Depends(get_current_user_async)):
+    result = await db.execute(select(models.World).where(models.World.id == world_id, models.World.user_id == current_user.id))
+    world = result.scalars().first()
+    if not world:
+        raise HTTPException(status_code=404, detail="World not found")
+    recipient_id = await ownership.find_recipient_async(db, transfer.username_or_email)
+    if recipient_id is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    if recipient_id != current_user.id:
+        await ownership.transfer_world_async(db, world_id, recipient_id)
+        await db.commit()
+        await db.refresh(world)
+    return world
+
+@router.delete("/{world_id}", status_code=204)
+async def delete_world(world_id: int, db: AsyncSession = Depends(get_async_db), current_user: models.User = Depends(get_current_user_async)):
+    result = await db.execute(select(models.World).where(models.World.id == world_id, models.World.user_id == current_user.id))
+    world = result.scalars().first()
+    if not world:
+        raise HTTPException(status_code=404, detail="World not found")
+    await db.delete(world)
+    versioning.note_world_change(db, world_id, "world")
+    await db.commit()
+    return
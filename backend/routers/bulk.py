@@ -0,0 +1,361 @@
+import logging
+import os
+from typing import Any, Dict, List
+from fastapi import APIRouter, Body, Depends, HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.orm import Session
+from database import get_db
+import models, schemas
+from auth import get_current_user
+import versioning
+import calendars
+import location_tree
+import spatial
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/worlds", tags=["Bulk"])
+
+# Upper bound on items per request; larger imports should be split client-side
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "1000"))
+
+
+def _get_owned_world(db: Session, world_id: int, current_user: models.User):
+    world = db.query(models.World).filter(
+        models.World.id == world_id,
+        models.World.user_id == current_user.id
+    ).first()
+    if not world:
+        raise HTTPException(status_code=404, detail="World not found")
+    return world
+
+
+def _check_batch_size(items: list):
+    if not items:
+        raise HTTPException(status_code=422, detail="Batch is empty")
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {BULK_MAX_ITEMS} items")
+
+
+# Validates every item before anything is written; returns the parsed items
+# and a list of {"index", "errors"} entries for the ones that failed
+def _validate_batch(items: List[Dict[str, Any]], schema):
+    parsed, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            parsed.append(schema.model_validate(item))
+        except ValidationError as e:
+            parsed.append(None)
+            errors.append({"index": index, "errors": e.errors(include_url=False, include_context=False, include_input=False)})
+    return parsed, errors
+
+
+def _item_error(index: int, loc: str, msg: str):
+    return {"index": index, "errors": [{"type": "value_error", "loc": [loc], "msg": msg}]}
+
+
+# The whole batch is rejected if any item is invalid, so nothing is half-imported
+def _raise_item_errors(errors: list):
+    if errors:
+        errors.sort(key=lambda e: e["index"])
+        raise HTTPException(status_code=422, detail=errors)
+
+
+# Single multi-row INSERT ... RETURNING (batched by SQLAlchemy's insertmanyvalues);
+# after_insert(created) runs in the same transaction
+def _insert_returning(db: Session, model, world_id: int, kind: str, rows: List[dict], after_insert=None):
+    created = db.scalars(insert(model).returning(model, sort_by_parameter_order=True), rows).all()
+    if after_insert is not None:
+        after_insert(created)
+    versioning.bump_world_version(db, world_id, kind)
+    db.commit()
+    return created
+
+
+# For PATCH batches: one query checks that every item names an entity of
+# this world (and owner), once. Returns {id: row} with the extra columns.
+def _check_targets(db: Session, model, world_id: int, current_user: models.User, parsed: list, errors: list, *columns):
+    ids = {item.id for item in parsed if item is not None}
+    found = {
+        row.id: row for row in db.execute(
+            select(model.id, *columns).where(
+                model.world_id == world_id,
+                model.user_id == current_user.id,
+                model.id.in_(ids),
+            )
+        )
+    }
+    seen = set()
+    for index, item in enumerate(parsed):
+        if item is None:
+            continue
+        if item.id not in found:
+            errors.append(_item_error(index, "id", "Not found in this world"))
+        elif item.id in seen:
+            errors.append(_item_error(index, "id", "Listed more than once in this batch"))
+        seen.add(item.id)
+    return found
+
+
+# changes: [(id, {column: value})] in request order. Items changing the same
+# set of columns share one executemany UPDATE; the rows are then read back
+# with a single SELECT and serialized before commit expires them.
+def _update_many(db: Session, model, world_id: int, kind: str, schema, changes: list):
+    table = model.__table__
+    groups = {}
+    for entity_id, values in changes:
+        values = {key: value for key, value in values.items() if key in table.c}
+        if values:
+            groups.setdefault(tuple(sorted(values)), []).append(
+                {"entity_id": entity_id, **{f"new_{key}": value for key, value in values.items()}}
+            )
+    for fields, rows in groups.items():
+        db.execute(
+            update(table)
+            .where(table.c.id == bindparam("entity_id"))
+            .values({field: bindparam(f"new_{field}") for field in fields}),
+            rows,
+        )
+
+    ids = [entity_id for entity_id, _ in changes]
+    rows = {row.id: row for row in db.scalars(select(model).where(model.id.in_(ids)))}
+    updated = [schema.model_validate(rows[entity_id]) for entity_id in ids]
+    versioning.bump_world_version(db, world_id, kind)
+    db.commit()
+    return updated
+
+
+# -------------------
+# Bulk create characters
+# -------------------
+@router.post("/{world_id}/characters:bulk", response_model=schemas.BulkCreated[schemas.Character])
+def bulk_create_characters(
+    world_id: int,
+    items: List[Dict[str, Any]] = Body(...),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    _check_batch_size(items)
+    world = _get_owned_world(db, world_id, current_user)
+
+    parsed, errors = _validate_batch(items, schemas.CharacterCreate)
+    for index, character in enumerate(parsed):
+        if character is not None and character.world_id not in (None, world_id):
+            errors.append(_item_error(index, "world_id", "world_id does not match the world in the URL"))
+    _raise_item_errors(errors)
+
+    created = _insert_returning(db, models.Character, world_id, "character", [
+        {"name": c.name, "description": c.description, "role": c.role, "world_id": world_id, "user_id": world.user_id}
+        for c in parsed
+    ])
+    logger.info(f"User {current_user.username} bulk created {len(created)} characters in world '{world.name}'")
+    return {"created": created, "count": len(created)}
+
+
+# -------------------
+# Bulk create locations
+# -------------------
+@router.post("/{world_id}/locations:bulk", response_model=schemas.BulkCreated[schemas.Location])
+def bulk_create_locations(
+    world_id: int,
+    items: List[Dict[str, Any]] = Body(...),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    _check_batch_size(items)
+    world = _get_owned_world(db, world_id, current_user)
+
+    parsed, errors = _validate_batch(items, schemas.LocationBase)
+
+    # Parents must already exist in this world (not elsewhere in the batch)
+    parent_ids = {l.parent_id for l in parsed if l is not None and l.parent_id is not None}
+    known_parents = set()
+    if parent_ids:
+        known_parents = set(db.scalars(
+            select(models.Location.id).where(
+                models.Location.world_id == world_id,
+                models.Location.id.in_(parent_ids),
+            )
+        ))
+    for index, location in enumerate(parsed):
+        if location is not None and location.parent_id is not None and location.parent_id not in known_parents:
+            errors.append(_item_error(index, "parent_id", "Parent location not found in this world"))
+    _raise_item_errors(errors)
+
+    created = _insert_returning(db, models.Location, world_id, "location", [
+        {"name": l.name, "description": l.description, "parent_id": l.parent_id, "world_id": world_id, "user_id": world.user_id,
+         **spatial.point_columns(l.coordinates)}
+        for l in parsed
+    ], after_insert=lambda created: location_tree.add(db, [
+        {"node_id": l.id, "parent_id": l.parent_id} for l in created
+    ]))
+    logger.info(f"User {current_user.username} bulk created {len(created)} locations in world '{world.name}'")
+    return {"created": created, "count": len(created)}
+
+
+# -------------------
+# Bulk create events
+# -------------------
+@router.post("/{world_id}/events:bulk", response_model=schemas.BulkCreated[schemas.Event])
+def bulk_create_events(
+    world_id: int,
+    items: List[Dict[str, Any]] = Body(...),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    _check_batch_size(items)
+    world = _get_owned_world(db, world_id, current_user)
+
+    parsed, errors = _validate_batch(items, schemas.EventBase)
+
+    # One query to check every referenced location belongs to this world
+    location_ids = {e.location_id for e in parsed if e is not None and e.location_id is not None}
+    known_locations = set()
+    if location_ids:
+        known_locations = set(db.scalars(
+            select(models.Location.id).where(
+                models.Location.world_id == world_id,
+                models.Location.id.in_(location_ids),
+            )
+        ))
+
+    calendar = calendars.for_world(db, world_id)
+    rows = []
+    for index, event in enumerate(parsed):
+        if event is None:
+            continue
+        if event.location_id is not None and event.location_id not in known_locations:
+            errors.append(_item_error(index, "location_id", "Location not found in this world"))
+            continue
+        try:
+            date_columns = calendars.event_date_columns(calendar, event.date)
+        except calendars.CalendarError as e:
+            errors.append(_item_error(index, "date", str(e)))
+            continue
+        rows.append({
+            "title": event.title,
+            "description": event.description,
+            "location_id": event.location_id,
+            "world_id": world_id,
+            "user_id": world.user_id,
+            **date_columns,
+        })
+    _raise_item_errors(errors)
+
+    created = _insert_returning(db, models.Event, world_id, "event", rows)
+    logger.info(f"User {current_user.username} bulk created {len(created)} events in world '{world.name}'")
+    return {"created": created, "count": len(created)}
+
+
+# -------------------
+# Bulk update characters
+# -------------------
+@router.patch("/{world_id}/characters:bulk", response_model=schemas.BulkUpdated[schemas.Character])
+def bulk_update_characters(
+    world_id: int,
+    items: List[Dict[str, Any]] = Body(...),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    _check_batch_size(items)
+    world = _get_owned_world(db, world_id, current_user)
+
+    parsed, errors = _validate_batch(items, schemas.CharacterPatch)
+    _check_targets(db, models.Character, world_id, current_user, parsed, errors)
+    _raise_item_errors(errors)
+
+    updated = _update_many(db, models.Character, world_id, "character", schemas.Character, [
+        (c.id, c.model_dump(exclude_unset=True, exclude={"id"})) for c in parsed
+    ])
+    logger.info(f"User {current_user.username} bulk updated {len(updated)} characters in world '{world.name}'")
+    return {"updated": updated, "count": len(updated)}
+
+
+# -------------------
+# Bulk update locations
+# -------------------
+@router.patch("/{world_id}/locations:bulk", response_model=schemas.BulkUpdated[schemas.Location])
+def bulk_update_locations(
+    world_id: int,
+    items: List[Dict[str, Any]] = Body(...),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    _check_batch_size(items)
+    world = _get_owned_world(db, world_id, current_user)
+
+    parsed, errors = _validate_batch(items, schemas.LocationPatch)
+    current = _check_targets(db, models.Location, world_id, current_user, parsed, errors, models.Location.parent_id)
+    _raise_item_errors(errors)
+
+    changes = []
+    for index, location in enumerate(parsed):
+        values = location.model_dump(exclude_unset=True, exclude={"id"})
+        if "coordinates" in values:
+            values.update(spatial.point_columns(location.coordinates))
+        # Moves go one at a time, so each is checked against the tree as the
+        # earlier ones in the batch left it
+        if "parent_id" in values and values["parent_id"] != current[location.id].parent_id:
+            try:
+                location_tree.check_parent(db, world_id, values["parent_id"], location.id)
+            except location_tree.TreeError as e:
+                _raise_item_errors([_item_error(index, "parent_id", str(e))])
+            location_tree.move(db, location.id, values["parent_id"])
+        changes.append((location.id, values))
+
+    updated = _update_many(db, models.Location, world_id, "location", schemas.Location, changes)
+    logger.info(f"User {current_user.username} bulk updated {len(updated)} locations in world '{world.name}'")
+    return {"updated": updated, "count": len(updated)}
+
+
+# -------------------
+# Bulk update events
+# -------------------
+@router.patch("/{world_id}/events:bulk", response_model=schemas.BulkUpdated[schemas.Event])
+def bulk_update_events(
+    world_id: int,
+    items: List[Dict[str, Any]] = Body(...),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    _check_batch_size(items)
+    world = _get_owned_world(db, world_id, current_user)
+
+    parsed, errors = _validate_batch(items, schemas.EventPatch)
+    _check_targets(db, models.Event, world_id, current_user, parsed, errors)
+
+    location_ids = {e.location_id for e in parsed if e is not None and e.location_id is not None}
+    known_locations = set()
+    if location_ids:
+        known_locations = set(db.scalars(
+            select(models.Location.id).where(
+                models.Location.world_id == world_id,
+                models.Location.id.in_(location_ids),
+            )
+        ))
+
+    calendar = None
+    changes = []
+    for index, event in enumerate(parsed):
+        if event is None:
+            continue
+        values = event.model_dump(exclude_unset=True, exclude={"id"})
+        if values.get("location_id") is not None and values["location_id"] not in known_locations:
+            errors.append(_item_error(index, "location_id", "Location not found in this world"))
+            continue
+        if "date" in values:
+            if calendar is None:
+                calendar = calendars.for_world(db, world_id)
+            try:
+                values.update(calendars.event_date_columns(calendar, values["date"]))
+            except calendars.CalendarError as e:
+                errors.append(_item_error(index, "date", str(e)))
+                continue
+        changes.append((event.id, values))
+    _raise_item_errors(errors)
+
+    updated = _update_many(db, models.Event, world_id, "event", schemas.Event, changes)
+    logger.info(f"User {current_user.username} bulk updated {len(updated)} events in world '{world.name}'")
+    return {"updated": updated, "count": len(updated)}
@@ -0,0 +1,108 @@
+import logging
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from database import get_db
+import models, schemas
+from auth import get_current_user
+import versioning
+import calendars
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/worlds", tags=["Calendars"])
+
+# Events that no longer parse are listed back, up to this many
+MAX_REPORTED_EVENTS = 20
+
+
+def _get_owned_world(db: Session, world_id: int, current_user: models.User):
+    world = db.query(models.World).filter(
+        models.World.id == world_id,
+        models.World.user_id == current_user.id
+    ).first()
+    if not world:
+        raise HTTPException(status_code=404, detail="World not found")
+    return world
+
+
+def _describe(world: models.World) -> dict:
+    calendar = calendars.from_definition(world.calendar.definition if world.calendar else None)
+    if calendar is calendars.GREGORIAN:
+        return {"world_id": world.id, "kind": "gregorian"}
+    return {"world_id": world.id, "kind": "custom", "definition": calendar.definition, "days_per_year": calendar.days_per_year}
+
+
+# Re-reads every dated event's text in the new calendar and rewrites its
+# ordinal; refuses the change if any of them would stop making sense
+def _reparse_events(db: Session, world_id: int, calendar):
+    rows = db.execute(
+        select(models.Event.id, models.Event.date_display)
+        .where(models.Event.world_id == world_id, models.Event.date_display.isnot(None))
+    ).all()
+    updates, failures = [], []
+    for event_id, text in rows:
+        try:
+            updates.append({"id": event_id, **calendars.event_date_columns(calendar, text)})
+        except calendars.CalendarError as e:
+            failures.append({"event_id": event_id, "date": text, "msg": str(e)})
+    if failures:
+        raise HTTPException(status_code=422, detail={
+            "message": f"{len(failures)} event date(s) cannot be read in this calendar",
+            "events": failures[:MAX_REPORTED_EVENTS],
+        })
+    if updates:
+        db.execute(update(models.Event), updates)
+    return len(updates)
+
+
+# -------------------
+# Get a world's calendar
+# -------------------
+@router.get("/{world_id}/calendar", response_model=schemas.Calendar)
+def get_calendar(world_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    return _describe(_get_owned_world(db, world_id, current_user))
+
+
+# -------------------
+# Set a world's calendar
+# -------------------
+@router.put("/{world_id}/calendar", response_model=schemas.Calendar)
+def set_calendar(
+    world_id: int,
+    definition: schemas.CalendarDefinition,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    world = _get_owned_world(db, world_id, current_user)
+    try:
+        calendar = calendars.FictionalCalendar(calendars.validate_definition(definition.model_dump()))
+    except calendars.CalendarError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    count = _reparse_events(db, world_id, calendar)
+    if world.calendar is None:
+        world.calendar = models.Calendar(definition=calendar.definition)
+    else:
+        world.calendar.definition = calendar.definition
+    versioning.bump_world_version(db, world_id, "event")
+    db.commit()
+    db.refresh(world)
+    logger.info(f"User {current_user.username} set the calendar of world ID {world_id} ({count} event dates re-read)")
+    return _describe(world)
+
+
+# -------------------
+# Go back to the Gregorian calendar
+# -------------------
+@router.delete("/{world_id}/calendar", response_model=schemas.Calendar)
+def delete_calendar(world_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    world = _get_owned_world(db, world_id, current_user)
+    if world.calendar is not None:
+        _reparse_events(db, world_id, calendars.GREGORIAN)
+        db.delete(world.calendar)
+        versioning.bump_world_version(db, world_id, "event")
+        db.commit()
+        db.refresh(world)
+    return _describe(world)
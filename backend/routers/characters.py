@@ -1,10 +1,13 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
 from database import get_db
 import models, schemas
 from auth import get_current_user
+from pagination import PageParams, page_params, keyset, to_page
+import versioning
+import ownership
+from cache import world_cache
 from schemas import CharacterUpdate
 from typing import Any
 
@@ -40,9 +43,11 @@ def create_character_for_world(
         name=character.name,
         description=character.description,
         role=character.role,
-        world_id=world_id  # only include world_id
+        world_id=world_id,
+        user_id=world.user_id
     )
     db.add(db_character)
+    versioning.bump_world_version(db, world_id, "character")
     db.commit()
     db.refresh(db_character)
     return db_character
@@ -50,25 +55,37 @@ def create_character_for_world(
 # -------------------
 # Get All Characters in a World
 # -------------------
-@router.get("/world/{world_id}", response_model=List[schemas.Character])
+@router.get("/world/{world_id}", response_model=schemas.Page[schemas.Character])
 def get_characters_by_world(
     world_id: int,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    # Verify ownership of the world
-    world = db.query(models.World).filter(
-        models.World.id == world_id,
-        models.World.user_id == current_user.id
-    ).first()
+    # Verify ownership of the world (and read its version for the ETag)
+    version = versioning.get_world_version(db, world_id, current_user.id)
 
-    if not world:
+    if version is None:
         logger.warning(f"User {current_user.username} tried to access characters for unauthorized world ID {world_id}")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="World not found or not yours")
 
-    characters = db.query(models.Character).filter(models.Character.world_id == world_id).all()
-    logger.info(f"User {current_user.username} fetched {len(characters)} characters from world '{world.name}'")
-    return characters
+    etag = versioning.list_etag("character", world_id, version, request)
+    if versioning.etag_matches(request, etag):
+        return versioning.not_modified(etag)
+    versioning.set_etag(response, etag)
+
+    cached = world_cache.get("character", world_id, version, page.key())
+    if cached is not None:
+        return cached
+
+    query = db.query(models.Character).filter(models.Character.world_id == world_id)
+    characters = keyset(query, models.Character.id, page).all()
+    logger.info(f"User {current_user.username} fetched {len(characters)} characters from world ID {world_id}")
+    return world_cache.put(
+        "character", world_id, version, page.key(), schemas.Page[schemas.Character], to_page(characters, page)
+    )
 
 
 # -------------------
@@ -77,54 +94,56 @@ def get_characters_by_world(
 @router.get("/{char_id}", response_model=schemas.Character)
 def get_character(
     char_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    # Get the character and ensure the current user owns the world
-    character = (
-        db.query(models.Character)
+    etag = versioning.detail_not_modified(db, request, "character", models.Character, char_id, current_user.id)
+    if etag:
+        return versioning.not_modified(etag)
+
+    # Ownership is checked on the character row; the world is only joined for its version
+    row = (
+        db.query(models.Character, models.World.version)
         .join(models.World)
         .filter(models.Character.id == char_id)
-        .filter(models.World.user_id == current_user.id)  # check ownership via the world
+        .filter(models.Character.user_id == current_user.id)
         .first()
     )
-    if not character:
+    if not row:
         raise HTTPException(status_code=404, detail="Character not found")
+    character, version = row
+    versioning.set_etag(response, versioning.detail_etag("character", character.id, character.world_id, version))
     return character
 
 
 # -------------------
 # Update Character
 # -------------------
-@router.put("/{character_id}")  # Fixed: removed duplicate "characters" prefix
+@router.put("/{character_id}", response_model=schemas.Character)  # Fixed: removed duplicate "characters" prefix
 def update_character(
     character_id: int,  # Fixed: parameter name matches path parameter
     character_update: schemas.CharacterUpdate,  # Fixed: added schemas prefix
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)  # Fixed: proper type annotation
 ):
-    # Get character and verify ownership via world
-    character = (
-        db.query(models.Character)
-        .join(models.World)
-        .filter(models.Character.id == character_id)
-        .filter(models.World.user_id == current_user.id)
-        .first()
+    # Update only provided fields, checking ownership in the same statement
+    statement = ownership.owned_update_statement(
+        models.Character, character_id, current_user.id, character_update.model_dump(exclude_unset=True)
     )
-    
+    character = db.scalars(statement).first()
+
     if not character:
         raise HTTPException(status_code=404, detail="Character not found")
-    
-    # Update only provided fields
-    update_data = character_update.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(character, key, value)
-    
+
+    # Serialized before commit expires the row (a refresh would be another SELECT)
+    result = schemas.Character.model_validate(character)
+    versioning.bump_world_version(db, character.world_id, "character")
     db.commit()
-    db.refresh(character)
-    
-    logger.info(f"User {current_user.username} updated character '{character.name}' (ID: {character.id})")
-    return character
+
+    logger.info(f"User {current_user.username} updated character '{result.name}' (ID: {result.id})")
+    return result
 
 # -------------------
 # Delete Character
@@ -145,6 +164,9 @@ def delete_character(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Character not found")
 
     db.delete(character)
+    versioning.bump_world_version(db, character.world_id, "character")
+    # Its relationships are deleted with it
+    versioning.note_world_change(db, character.world_id, "relationship")
     db.commit()
 
     logger.info(f"User {current_user.username} deleted character '{character.name}' (ID: {character.id})")
@@ -1,17 +1,44 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import exists, select
+from sqlalchemy.orm import Session, joinedload
 from database import get_db
 import models, schemas
 from auth import get_current_user
-from models import Event, World
+from pagination import PageParams, page_params, keyset, to_page
+import versioning
+import ownership
+import calendars
+from cache import world_cache
+from models import Event, Location, World
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/events", tags=["Events"])
 
+
+# Parses the client's date text with the world's calendar
+def _date_columns(db: Session, world_id: int, text) -> dict:
+    try:
+        return calendars.event_date_columns(calendars.for_world(db, world_id), text)
+    except calendars.CalendarError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+# A new location_id must be in the event's own world; checked inside the UPDATE
+def _in_event_world(location_id: int):
+    return exists().where(Location.id == location_id, Location.world_id == Event.world_id)
+
+
+# Same rule for a new event, whose world is already known
+def _check_location(db: Session, world_id: int, location_id):
+    if location_id is None:
+        return
+    if not db.scalar(select(exists().where(Location.id == location_id, Location.world_id == world_id))):
+        raise HTTPException(status_code=422, detail="Location not found in this world")
+
 # -------------------
 # Create a new event
 # -------------------
@@ -28,14 +55,18 @@ def create_event(
     ).first()
     if not world:
         raise HTTPException(status_code=404, detail="World not found")
+    _check_location(db, event.world_id, event.location_id)
 
     db_event = Event(
         title=event.title,  # ✅ updated
         description=event.description,
+        location_id=event.location_id,
         world_id=event.world_id,
-        user_id=current_user.id
+        user_id=world.user_id,
+        **_date_columns(db, event.world_id, event.date)
     )
     db.add(db_event)
+    versioning.bump_world_version(db, event.world_id, "event")
     db.commit()
     db.refresh(db_event)
     logger.info(f"User {current_user.username} created event '{db_event.title}' (ID: {db_event.id})")
@@ -59,16 +90,18 @@ def create_event_for_world(
     ).first()
     if not world:
         raise HTTPException(status_code=404, detail="World not found")
+    _check_location(db, world_id, event.location_id)
 
     db_event = Event(
         title=event.title,  # ✅ updated
         description=event.description,
-        date=event.date,
         location_id=event.location_id,
         world_id=world_id,
-        user_id=current_user.id
+        user_id=world.user_id,
+        **_date_columns(db, world_id, event.date)
     )
     db.add(db_event)
+    versioning.bump_world_version(db, world_id, "event")
     db.commit()
     db.refresh(db_event)
 
@@ -79,40 +112,66 @@ def create_event_for_world(
 # -------------------
 # Get all events for a specific world
 # -------------------
-@router.get("/world/{world_id}", response_model=List[schemas.Event])
+@router.get("/world/{world_id}", response_model=schemas.Page[schemas.Event])
 def get_events_by_world(
     world_id: int,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    world = db.query(World).filter(
-        World.id == world_id,
-        World.user_id == current_user.id
-    ).first()
-    if not world:
+    version = versioning.get_world_version(db, world_id, current_user.id)
+    if version is None:
         raise HTTPException(status_code=404, detail="World not found")
 
-    events = db.query(Event).filter(Event.world_id == world_id).all()
-    logger.info(f"User {current_user.username} fetched {len(events)} events for world '{world.name}'")
-    return events
+    etag = versioning.list_etag("event", world_id, version, request)
+    if versioning.etag_matches(request, etag):
+        return versioning.not_modified(etag)
+    versioning.set_etag(response, etag)
+
+    cached = world_cache.get("event", world_id, version, page.key())
+    if cached is not None:
+        return cached
+
+    events = keyset(db.query(Event).filter(Event.world_id == world_id), Event.id, page).all()
+    logger.info(f"User {current_user.username} fetched {len(events)} events for world ID {world_id}")
+    return world_cache.put(
+        "event", world_id, version, page.key(), schemas.Page[schemas.Event], to_page(events, page)
+    )
 
 
 # -------------------
 # Get a single event
 # -------------------
-@router.get("/{event_id}", response_model=schemas.Event)
+@router.get("/{event_id}", response_model=schemas.EventDetail)
 def get_event(
     event_id: int,
+    request: Request,
+    response: Response,
+    embed: Optional[str] = Query(None, pattern="^location$", description="location: include the event's location"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    event = db.query(Event).join(World).filter(
+    # The embedded representation gets its own ETags
+    kind = "event+location" if embed else "event"
+    etag = versioning.detail_not_modified(db, request, kind, Event, event_id, current_user.id)
+    if etag:
+        return versioning.not_modified(etag)
+
+    # World joined for its version only; ownership is on the event row
+    query = db.query(Event, World.version).join(World).filter(
         Event.id == event_id,
-        World.user_id == current_user.id
-    ).first()
-    if not event:
+        Event.user_id == current_user.id
+    )
+    if embed:
+        query = query.options(joinedload(Event.location))
+    row = query.first()
+    if not row:
         raise HTTPException(status_code=404, detail="Event not found")
-    return event
+    event, version = row
+    versioning.set_etag(response, versioning.detail_etag(kind, event.id, event.world_id, version))
+    return event if embed else schemas.Event.model_validate(event)
 
 
 # -------------------
@@ -125,22 +184,32 @@ def update_event(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    event = db.query(Event).join(World).filter(
-        Event.id == event_id,
-        World.user_id == current_user.id
+    update_data = event_update.model_dump(exclude_unset=True)
+    if "date" in update_data:
+        try:
+            update_data.update(calendars.event_date_columns(calendars.for_event(db, event_id), update_data["date"]))
+        except calendars.CalendarError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    conditions = ()
+    if update_data.get("location_id") is not None:
+        conditions = (_in_event_world(update_data["location_id"]),)
+
+    event = db.scalars(
+        ownership.owned_update_statement(Event, event_id, current_user.id, update_data, *conditions)
     ).first()
     if not event:
+        # Only a failed write pays for working out why
+        if conditions and db.scalar(select(Event.id).where(Event.id == event_id, Event.user_id == current_user.id)):
+            raise HTTPException(status_code=422, detail="Location not found in this world")
         raise HTTPException(status_code=404, detail="Event not found")
 
-    update_data = event_update.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(event, key, value)
-
+    # Serialized before commit expires the row (a refresh would be another SELECT)
+    result = schemas.Event.model_validate(event)
+    versioning.bump_world_version(db, event.world_id, "event")
     db.commit()
-    db.refresh(event)
 
-    logger.info(f"User {current_user.username} updated event '{event.title}' (ID: {event.id})")
-    return event
+    logger.info(f"User {current_user.username} updated event '{result.title}' (ID: {result.id})")
+    return result
 
 
 # -------------------
@@ -152,13 +221,14 @@ def delete_event(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    event = db.query(Event).join(World).filter(
+    event = db.query(Event).filter(
         Event.id == event_id,
-        World.user_id == current_user.id
+        Event.user_id == current_user.id
     ).first()
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
     db.delete(event)
+    versioning.bump_world_version(db, event.world_id, "event")
     db.commit()
     return
@@ -0,0 +1,58 @@
+import hmac
+import os
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from auth import token_cache
+from hashing import password_pool
+from throttle import login_throttle
+from cache import world_cache
+import world_indexes
+from database import DB_MODE, POOL_SETTINGS
+from pool_metrics import sync_pool_metrics, async_pool_metrics
+
+# Shared secret for the stats endpoints, sent as the X-Operator-Token header.
+# Unset means the endpoints are switched off and answer 404.
+INTERNAL_STATS_TOKEN = os.getenv("INTERNAL_STATS_TOKEN", "")
+
+
+def require_operator(x_operator_token: Optional[str] = Header(None)):
+    if not INTERNAL_STATS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_operator_token is None or not hmac.compare_digest(x_operator_token, INTERNAL_STATS_TOKEN):
+        raise HTTPException(status_code=403, detail="Operator token required")
+
+
+# Operational stats for dashboards; kept out of the public OpenAPI schema
+router = APIRouter(
+    prefix="/internal",
+    tags=["Internal"],
+    include_in_schema=False,
+    dependencies=[Depends(require_operator)],
+)
+
+@router.get("/token-cache")
+def get_token_cache_stats():
+    return token_cache.stats()
+
+@router.get("/pool")
+def get_pool_stats():
+    pools = {"sync": sync_pool_metrics.snapshot()}
+    if DB_MODE == "async":
+        pools["async"] = async_pool_metrics.snapshot()
+    return {"settings": POOL_SETTINGS, "pools": pools}
+
+@router.get("/hashing")
+def get_hashing_stats():
+    return password_pool.stats()
+
+@router.get("/login-throttle")
+def get_login_throttle_stats():
+    return login_throttle.stats()
+
+@router.get("/cache")
+def get_cache_stats():
+    return world_cache.stats()
+
+@router.get("/world-indexes")
+def get_world_index_stats():
+    return world_indexes.stats()
@@ -0,0 +1,97 @@
+import logging
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session
+from database import get_db
+import models, schemas
+from auth import get_current_user
+from pagination import PageParams, page_params, keyset, to_page
+import versioning
+import location_tree
+from models import Location, World
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/locations", tags=["Locations"])
+
+
+# Ownership check and ETag for reads about one location's place in the tree
+def _check_location(db: Session, location_id: int, view: str, current_user: models.User, request: Request, response: Response):
+    row = db.query(Location.world_id, World.version).join(World).filter(
+        Location.id == location_id,
+        Location.user_id == current_user.id
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Location not found")
+    world_id, version = row
+    etag = versioning.list_etag(f"location{location_id}-{view}", world_id, version, request)
+    if versioning.etag_matches(request, etag):
+        return versioning.not_modified(etag)
+    versioning.set_etag(response, etag)
+    return None
+
+
+def _node(location: Location, depth: int) -> dict:
+    return dict(schemas.Location.model_validate(location).model_dump(), depth=depth)
+
+
+# -------------------
+# Locations inside a location
+# -------------------
+@router.get("/{location_id}/subtree", response_model=schemas.Page[schemas.LocationNode])
+def get_subtree(
+    location_id: int,
+    request: Request,
+    response: Response,
+    max_depth: Optional[int] = Query(None, ge=1, description="1 lists direct children only"),
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    not_modified = _check_location(db, location_id, "subtree", current_user, request, response)
+    if not_modified:
+        return not_modified
+
+    rows = db.execute(keyset(location_tree.subtree_statement(location_id, max_depth), Location.id, page)).all()
+    logger.info(f"User {current_user.username} fetched {len(rows)} sub-locations of location ID {location_id}")
+    depths = {location.id: depth for location, depth in rows}
+    result = to_page([location for location, _ in rows], page)
+    result["items"] = [_node(location, depths[location.id]) for location in result["items"]]
+    return result
+
+
+# -------------------
+# Breadcrumbs: the top-level location down to this one
+# -------------------
+@router.get("/{location_id}/ancestors", response_model=List[schemas.LocationNode])
+def get_ancestors(
+    location_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    not_modified = _check_location(db, location_id, "ancestors", current_user, request, response)
+    if not_modified:
+        return not_modified
+    return [_node(location, depth) for location, depth in db.execute(location_tree.ancestors_statement(location_id))]
+
+
+# -------------------
+# Sizes of the subtree under a location
+# -------------------
+@router.get("/{location_id}/subtree/counts", response_model=schemas.LocationCounts)
+def get_subtree_counts(
+    location_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    not_modified = _check_location(db, location_id, "counts", current_user, request, response)
+    if not_modified:
+        return not_modified
+
+    locations, events, depth = db.execute(location_tree.counts_statement(location_id)).one()
+    return {"location_id": location_id, "locations": locations, "events": events, "depth": depth or 0}
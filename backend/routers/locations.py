@@ -1,11 +1,16 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
 from database import get_db
 import models, schemas
 from auth import get_current_user
-from models import Location, World
+from pagination import PageParams, page_params, keyset, to_page
+import versioning
+import ownership
+import location_tree
+import spatial
+from cache import world_cache
+from models import Event, Location, World
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -28,13 +33,23 @@ def create_location(
     ).first()
     if not world:
         raise HTTPException(status_code=404, detail="World not found")
+    try:
+        location_tree.check_parent(db, location.world_id, location.parent_id)
+    except location_tree.TreeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
     db_location = Location(
         name=location.name,
         description=location.description,
-        world_id=location.world_id
+        world_id=location.world_id,
+        user_id=world.user_id,
+        parent_id=location.parent_id,
+        coordinates=location.coordinates
     )
     db.add(db_location)
+    db.flush()
+    location_tree.add(db, [{"node_id": db_location.id, "parent_id": db_location.parent_id}])
+    versioning.bump_world_version(db, location.world_id, "location")
     db.commit()
     db.refresh(db_location)
     logger.info(f"User {current_user.username} created location '{db_location.name}' (ID: {db_location.id})")
@@ -44,22 +59,71 @@ def create_location(
 # -------------------
 # Get all locations for a specific world
 # -------------------
-@router.get("/world/{world_id}", response_model=List[schemas.Location])
+@router.get("/world/{world_id}", response_model=schemas.Page[schemas.Location])
 def get_locations_by_world(
     world_id: int,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    world = db.query(World).filter(
-        World.id == world_id,
-        World.user_id == current_user.id
-    ).first()
-    if not world:
+    version = versioning.get_world_version(db, world_id, current_user.id)
+    if version is None:
         raise HTTPException(status_code=404, detail="World not found")
 
-    locations = db.query(Location).filter(Location.world_id == world_id).all()
-    logger.info(f"User {current_user.username} fetched {len(locations)} locations for world '{world.name}'")
-    return locations
+    etag = versioning.list_etag("location", world_id, version, request)
+    if versioning.etag_matches(request, etag):
+        return versioning.not_modified(etag)
+    versioning.set_etag(response, etag)
+
+    cached = world_cache.get("location", world_id, version, page.key())
+    if cached is not None:
+        return cached
+
+    locations = keyset(db.query(Location).filter(Location.world_id == world_id), Location.id, page).all()
+    logger.info(f"User {current_user.username} fetched {len(locations)} locations for world ID {world_id}")
+    return world_cache.put(
+        "location", world_id, version, page.key(), schemas.Page[schemas.Location], to_page(locations, page)
+    )
+
+
+# -------------------
+# Get the events at a location
+# -------------------
+@router.get("/{location_id}/events", response_model=schemas.Page[schemas.Event])
+def get_location_events(
+    location_id: int,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    row = db.query(Location.world_id, World.version).join(World).filter(
+        Location.id == location_id,
+        Location.user_id == current_user.id
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Location not found")
+    world_id, version = row
+
+    etag = versioning.list_etag(f"location{location_id}-event", world_id, version, request)
+    if versioning.etag_matches(request, etag):
+        return versioning.not_modified(etag)
+    versioning.set_etag(response, etag)
+
+    # Cached with the world's other event pages, so event writes drop it too
+    page_key = page.key(f"location{location_id}:")
+    cached = world_cache.get("event", world_id, version, page_key)
+    if cached is not None:
+        return cached
+
+    events = keyset(db.query(Event).filter(Event.location_id == location_id), Event.id, page).all()
+    logger.info(f"User {current_user.username} fetched {len(events)} events for location ID {location_id}")
+    return world_cache.put(
+        "event", world_id, version, page_key, schemas.Page[schemas.Event], to_page(events, page)
+    )
 
 
 # -------------------
@@ -68,15 +132,24 @@ def get_locations_by_world(
 @router.get("/{location_id}", response_model=schemas.Location)
 def get_location(
     location_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    location = db.query(Location).join(World).filter(
+    etag = versioning.detail_not_modified(db, request, "location", Location, location_id, current_user.id)
+    if etag:
+        return versioning.not_modified(etag)
+
+    # World joined for its version only; ownership is on the location row
+    row = db.query(Location, World.version).join(World).filter(
         Location.id == location_id,
-        World.user_id == current_user.id
+        Location.user_id == current_user.id
     ).first()
-    if not location:
+    if not row:
         raise HTTPException(status_code=404, detail="Location not found")
+    location, version = row
+    versioning.set_etag(response, versioning.detail_etag("location", location.id, location.world_id, version))
     return location
 
 
@@ -90,22 +163,37 @@ def update_location(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    location = db.query(Location).join(World).filter(
-        Location.id == location_id,
-        World.user_id == current_user.id
+    update_data = location_update.model_dump(exclude_unset=True)
+    if "coordinates" in update_data:
+        update_data.update(spatial.point_columns(location_update.coordinates))
+    if "parent_id" in update_data:
+        # Moving rewrites the closure table, which needs the current parent first
+        current = db.query(Location.world_id, Location.parent_id).filter(
+            Location.id == location_id,
+            Location.user_id == current_user.id
+        ).first()
+        if not current:
+            raise HTTPException(status_code=404, detail="Location not found")
+        if update_data["parent_id"] != current.parent_id:
+            try:
+                location_tree.check_parent(db, current.world_id, update_data["parent_id"], location_id)
+            except location_tree.TreeError as e:
+                raise HTTPException(status_code=422, detail=str(e))
+            location_tree.move(db, location_id, update_data["parent_id"])
+
+    location = db.scalars(
+        ownership.owned_update_statement(Location, location_id, current_user.id, update_data)
     ).first()
     if not location:
         raise HTTPException(status_code=404, detail="Location not found")
 
-    update_data = location_update.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(location, key, value)
-
+    # Serialized before commit expires the row (a refresh would be another SELECT)
+    result = schemas.Location.model_validate(location)
+    versioning.bump_world_version(db, location.world_id, "location")
     db.commit()
-    db.refresh(location)
 
-    logger.info(f"User {current_user.username} updated location '{location.name}' (ID: {location.id})")
-    return location
+    logger.info(f"User {current_user.username} updated location '{result.name}' (ID: {result.id})")
+    return result
 
 
 # -------------------
@@ -117,13 +205,18 @@ def delete_location(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    location = db.query(Location).join(World).filter(
+    location = db.query(Location).filter(
         Location.id == location_id,
-        World.user_id == current_user.id
+        Location.user_id == current_user.id
     ).first()
     if not location:
         raise HTTPException(status_code=404, detail="Location not found")
 
+    # Its sub-locations move up a level
+    location_tree.remove(db, location.id, location.parent_id)
     db.delete(location)
+    versioning.bump_world_version(db, location.world_id, "location")
+    # Routes to and from it are deleted with it
+    versioning.note_world_change(db, location.world_id, "route")
     db.commit()
     return
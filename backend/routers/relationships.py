@@ -0,0 +1,220 @@
+import logging
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from database import get_db
+import models, schemas
+from auth import get_current_user
+from pagination import PageParams, page_params, keyset, to_page
+import versioning
+from cache import world_cache
+from character_graph import character_graphs, DIRECTIONS, GRAPH_MAX_DEPTH, GRAPH_MAX_NODES
+from models import CharacterRelationship
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/worlds", tags=["Relationships"])
+
+DIRECTION_PATTERN = "^(" + "|".join(DIRECTIONS) + ")$"
+
+
+def _world_version(db: Session, world_id: int, current_user: models.User) -> int:
+    version = versioning.get_world_version(db, world_id, current_user.id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="World not found")
+    return version
+
+
+# Graph reads share one ETag kind; the query string tells them apart
+def _graph(db: Session, world_id: int, current_user: models.User, request: Request, response: Response):
+    version = _world_version(db, world_id, current_user)
+    etag = versioning.list_etag("graph", world_id, version, request)
+    if versioning.etag_matches(request, etag):
+        return None, versioning.not_modified(etag)
+    versioning.set_etag(response, etag)
+    return character_graphs.get(db, world_id, version), None
+
+
+def _require_character(graph, character_id: int):
+    if character_id not in graph:
+        raise HTTPException(status_code=404, detail=f"Character {character_id} not found in this world")
+
+
+# -------------------
+# Create a relationship
+# -------------------
+@router.post("/{world_id}/relationships", response_model=schemas.Relationship)
+def create_relationship(
+    world_id: int,
+    relationship: schemas.RelationshipCreate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    _world_version(db, world_id, current_user)
+    if relationship.source_id == relationship.target_id:
+        raise HTTPException(status_code=422, detail="A character cannot be related to itself")
+
+    endpoints = db.scalar(
+        select(func.count()).select_from(models.Character).where(
+            models.Character.id.in_((relationship.source_id, relationship.target_id)),
+            models.Character.world_id == world_id,
+        )
+    )
+    if endpoints != 2:
+        raise HTTPException(status_code=404, detail="Both characters must exist in this world")
+
+    duplicate = db.scalar(select(CharacterRelationship.id).where(
+        CharacterRelationship.source_id == relationship.source_id,
+        CharacterRelationship.target_id == relationship.target_id,
+        CharacterRelationship.type == relationship.type,
+    ))
+    if duplicate is not None:
+        raise HTTPException(status_code=409, detail=f"Relationship already exists (ID: {duplicate})")
+
+    db_relationship = CharacterRelationship(**relationship.model_dump(), world_id=world_id)
+    db.add(db_relationship)
+    versioning.bump_world_version(db, world_id, "relationship")
+    db.commit()
+    db.refresh(db_relationship)
+    logger.info(f"User {current_user.username} added relationship ID {db_relationship.id} in world ID {world_id}")
+    return db_relationship
+
+
+# -------------------
+# List a world's relationships
+# -------------------
+@router.get("/{world_id}/relationships", response_model=schemas.Page[schemas.Relationship])
+def get_relationships(
+    world_id: int,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    version = _world_version(db, world_id, current_user)
+    etag = versioning.list_etag("relationship", world_id, version, request)
+    if versioning.etag_matches(request, etag):
+        return versioning.not_modified(etag)
+    versioning.set_etag(response, etag)
+
+    cached = world_cache.get("relationship", world_id, version, page.key())
+    if cached is not None:
+        return cached
+
+    relationships = keyset(
+        db.query(CharacterRelationship).filter(CharacterRelationship.world_id == world_id), CharacterRelationship.id, page
+    ).all()
+    return world_cache.put(
+        "relationship", world_id, version, page.key(), schemas.Page[schemas.Relationship], to_page(relationships, page)
+    )
+
+
+# -------------------
+# Delete a relationship
+# -------------------
+@router.delete("/{world_id}/relationships/{relationship_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_relationship(
+    world_id: int,
+    relationship_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    _world_version(db, world_id, current_user)
+    relationship = db.query(CharacterRelationship).filter(
+        CharacterRelationship.id == relationship_id,
+        CharacterRelationship.world_id == world_id
+    ).first()
+    if not relationship:
+        raise HTTPException(status_code=404, detail="Relationship not found")
+
+    db.delete(relationship)
+    versioning.bump_world_version(db, world_id, "relationship")
+    db.commit()
+    return
+
+
+# -------------------
+# Characters within depth hops of one character
+# -------------------
+@router.get("/{world_id}/characters/{character_id}/neighborhood", response_model=schemas.Neighborhood)
+def get_neighborhood(
+    world_id: int,
+    character_id: int,
+    request: Request,
+    response: Response,
+    depth: int = Query(1, ge=1, le=GRAPH_MAX_DEPTH),
+    direction: str = Query("both", pattern=DIRECTION_PATTERN),
+    type: Optional[List[str]] = Query(None, description="Repeat to follow several relationship types"),
+    max_nodes: int = Query(GRAPH_MAX_NODES, ge=1, le=GRAPH_MAX_NODES),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    graph, not_modified = _graph(db, world_id, current_user, request, response)
+    if not_modified:
+        return not_modified
+    _require_character(graph, character_id)
+
+    nodes, edges, truncated = graph.neighborhood(character_id, depth, direction, set(type or ()), max_nodes)
+    return {"character_id": character_id, "depth": depth, "nodes": nodes, "edges": edges, "truncated": truncated}
+
+
+# -------------------
+# Shortest path between two characters
+# -------------------
+@router.get("/{world_id}/graph/path", response_model=schemas.GraphPath)
+def get_shortest_path(
+    world_id: int,
+    request: Request,
+    response: Response,
+    source_id: int = Query(...),
+    target_id: int = Query(...),
+    direction: str = Query("out", pattern=DIRECTION_PATTERN),
+    type: Optional[List[str]] = Query(None, description="Repeat to follow several relationship types"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    graph, not_modified = _graph(db, world_id, current_user, request, response)
+    if not_modified:
+        return not_modified
+    _require_character(graph, source_id)
+    _require_character(graph, target_id)
+
+    path = graph.shortest_path(source_id, target_id, direction, set(type or ()))
+    if path is None:
+        return {"source_id": source_id, "target_id": target_id, "found": False}
+    character_ids, edge_ids = path
+    return {
+        "source_id": source_id,
+        "target_id": target_id,
+        "found": True,
+        "length": len(edge_ids),
+        "character_ids": character_ids,
+        "edges": [graph.edge(edge_id) for edge_id in edge_ids],
+    }
+
+
+# -------------------
+# Connected groups of characters
+# -------------------
+@router.get("/{world_id}/graph/components", response_model=schemas.GraphComponents)
+def get_components(
+    world_id: int,
+    request: Request,
+    response: Response,
+    min_size: int = Query(2, ge=1, description="1 also lists characters without relationships"),
+    limit: int = Query(50, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    graph, not_modified = _graph(db, world_id, current_user, request, response)
+    if not_modified:
+        return not_modified
+
+    components = [members for members in graph.components() if len(members) >= min_size]
+    return {
+        "count": len(components),
+        "components": [{"size": len(members), "character_ids": members} for members in components[:limit]],
+    }
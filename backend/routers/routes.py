@@ -0,0 +1,143 @@
+import logging
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from database import get_db
+import models, schemas
+from auth import get_current_user
+from pagination import PageParams, page_params, keyset, to_page
+import versioning
+from cache import world_cache
+from travel import route_graphs
+from models import Route
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/worlds", tags=["Routes"])
+
+
+def _world_version(db: Session, world_id: int, current_user: models.User) -> int:
+    version = versioning.get_world_version(db, world_id, current_user.id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="World not found")
+    return version
+
+
+# -------------------
+# Create a route
+# -------------------
+@router.post("/{world_id}/routes", response_model=schemas.Route)
+def create_route(
+    world_id: int,
+    route: schemas.RouteCreate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    _world_version(db, world_id, current_user)
+    if route.source_id == route.target_id:
+        raise HTTPException(status_code=422, detail="A route must join two different locations")
+
+    endpoints = db.scalar(
+        select(func.count()).select_from(models.Location).where(
+            models.Location.id.in_((route.source_id, route.target_id)),
+            models.Location.world_id == world_id,
+        )
+    )
+    if endpoints != 2:
+        raise HTTPException(status_code=404, detail="Both locations must exist in this world")
+
+    db_route = Route(**route.model_dump(), world_id=world_id)
+    db.add(db_route)
+    versioning.bump_world_version(db, world_id, "route")
+    db.commit()
+    db.refresh(db_route)
+    logger.info(f"User {current_user.username} added route ID {db_route.id} in world ID {world_id}")
+    return db_route
+
+
+# -------------------
+# List a world's routes
+# -------------------
+@router.get("/{world_id}/routes", response_model=schemas.Page[schemas.Route])
+def get_routes(
+    world_id: int,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    version = _world_version(db, world_id, current_user)
+    etag = versioning.list_etag("route", world_id, version, request)
+    if versioning.etag_matches(request, etag):
+        return versioning.not_modified(etag)
+    versioning.set_etag(response, etag)
+
+    cached = world_cache.get("route", world_id, version, page.key())
+    if cached is not None:
+        return cached
+
+    routes = keyset(db.query(Route).filter(Route.world_id == world_id), Route.id, page).all()
+    return world_cache.put("route", world_id, version, page.key(), schemas.Page[schemas.Route], to_page(routes, page))
+
+
+# -------------------
+# Delete a route
+# -------------------
+@router.delete("/{world_id}/routes/{route_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_route(
+    world_id: int,
+    route_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    _world_version(db, world_id, current_user)
+    route = db.query(Route).filter(Route.id == route_id, Route.world_id == world_id).first()
+    if not route:
+        raise HTTPException(status_code=404, detail="Route not found")
+
+    db.delete(route)
+    versioning.bump_world_version(db, world_id, "route")
+    db.commit()
+    return
+
+
+# -------------------
+# Fastest journey between two locations
+# -------------------
+@router.get("/{world_id}/travel", response_model=schemas.TravelPlan)
+def get_travel_plan(
+    world_id: int,
+    request: Request,
+    response: Response,
+    source_id: int = Query(...),
+    target_id: int = Query(...),
+    mode: Optional[List[str]] = Query(None, description="Repeat to allow several travel modes"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    version = _world_version(db, world_id, current_user)
+    etag = versioning.list_etag("travel", world_id, version, request)
+    if versioning.etag_matches(request, etag):
+        return versioning.not_modified(etag)
+    versioning.set_etag(response, etag)
+
+    graph = route_graphs.get(db, world_id, version)
+    for location_id in (source_id, target_id):
+        if location_id not in graph:
+            raise HTTPException(status_code=404, detail=f"Location {location_id} not found in this world")
+
+    journey = graph.shortest(source_id, target_id, mode or ())
+    if journey is None:
+        return {"source_id": source_id, "target_id": target_id, "found": False}
+    travel_time, location_ids, route_ids = journey
+    return {
+        "source_id": source_id,
+        "target_id": target_id,
+        "found": True,
+        "travel_time": travel_time,
+        "location_ids": location_ids,
+        "routes": [graph.route(route_id) for route_id in route_ids],
+    }
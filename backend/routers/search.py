@@ -0,0 +1,60 @@
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session
+from database import get_db
+import models, schemas
+from auth import get_current_user
+import versioning
+from fulltext import search, SearchUnavailable, SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/worlds", tags=["Search"])
+
+
+def _search(db: Session, current_user: models.User, q: str, world_id, limit: int):
+    try:
+        hits = search(db, current_user.id, q, world_id=world_id, limit=limit)
+    except SearchUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    logger.info(f"User {current_user.username} searched {'world ID ' + str(world_id) if world_id else 'all worlds'}: {len(hits)} hits")
+    return {"query": q, "hits": hits}
+
+
+# -------------------
+# Search every world the user owns
+# -------------------
+@router.get("/search", response_model=schemas.SearchResults)
+def search_all_worlds(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(SEARCH_DEFAULT_LIMIT, ge=1, le=SEARCH_MAX_LIMIT),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    return _search(db, current_user, q, None, limit)
+
+
+# -------------------
+# Search one world
+# -------------------
+@router.get("/{world_id}/search", response_model=schemas.SearchResults)
+def search_world(
+    world_id: int,
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(SEARCH_DEFAULT_LIMIT, ge=1, le=SEARCH_MAX_LIMIT),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    version = versioning.get_world_version(db, world_id, current_user.id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="World not found")
+
+    etag = versioning.list_etag("search-result", world_id, version, request)
+    if versioning.etag_matches(request, etag):
+        return versioning.not_modified(etag)
+    versioning.set_etag(response, etag)
+
+    return _search(db, current_user, q, world_id, limit)
@@ -0,0 +1,97 @@
+import logging
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session
+from database import get_db
+import models, schemas
+from auth import get_current_user
+import versioning
+import spatial
+from spatial import MAP_DEFAULT_LIMIT, MAP_MAX_LIMIT, NEAREST_MAX_K
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/worlds", tags=["Map"])
+
+
+def _check_world(db: Session, world_id: int, current_user: models.User, request: Request, response: Response):
+    version = versioning.get_world_version(db, world_id, current_user.id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="World not found")
+    etag = versioning.list_etag("map", world_id, version, request)
+    if versioning.etag_matches(request, etag):
+        return version, versioning.not_modified(etag)
+    versioning.set_etag(response, etag)
+    return version, None
+
+
+def _parse_bbox(bbox: str):
+    try:
+        x0, y0, x1, y1 = (float(part) for part in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=422, detail="bbox must be four numbers: min_x,min_y,max_x,max_y")
+    return min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
+
+
+# -------------------
+# Locations inside a bounding box (the visible part of the map)
+# -------------------
+@router.get("/{world_id}/locations", response_model=schemas.LocationsInView)
+def get_locations_in_box(
+    world_id: int,
+    request: Request,
+    response: Response,
+    bbox: str = Query(..., description="min_x,min_y,max_x,max_y"),
+    limit: int = Query(MAP_DEFAULT_LIMIT, ge=1, le=MAP_MAX_LIMIT),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    box = _parse_bbox(bbox)
+    version, not_modified = _check_world(db, world_id, current_user, request, response)
+    if not_modified:
+        return not_modified
+
+    locations, truncated = spatial.in_box(db, world_id, version, box, limit)
+    logger.info(f"User {current_user.username} fetched {len(locations)} map locations for world ID {world_id}")
+    return {"items": locations, "truncated": truncated}
+
+
+# -------------------
+# The k locations nearest to a point or to another location
+# -------------------
+@router.get("/{world_id}/locations/nearest", response_model=List[schemas.NearbyLocation])
+def get_nearest_locations(
+    world_id: int,
+    request: Request,
+    response: Response,
+    x: Optional[float] = Query(None),
+    y: Optional[float] = Query(None),
+    location_id: Optional[int] = Query(None, description="Search around this location instead of x/y (it is left out)"),
+    k: int = Query(10, ge=1, le=NEAREST_MAX_K),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    version, not_modified = _check_world(db, world_id, current_user, request, response)
+    if not_modified:
+        return not_modified
+
+    if location_id is not None:
+        origin = db.query(models.Location).filter(
+            models.Location.id == location_id,
+            models.Location.world_id == world_id
+        ).first()
+        if not origin:
+            raise HTTPException(status_code=404, detail="Location not found")
+        if origin.coordinates is None:
+            raise HTTPException(status_code=422, detail="Location has no coordinates")
+        x, y = origin.x, origin.y
+    elif x is None or y is None:
+        raise HTTPException(status_code=422, detail="Give x and y, or location_id")
+
+    hits = spatial.nearest(db, world_id, version, x, y, k + (location_id is not None))
+    return [
+        dict(schemas.Location.model_validate(location).model_dump(), distance=distance)
+        for location, distance in hits
+        if location.id != location_id
+    ][:k]
@@ -0,0 +1,91 @@
+import logging
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session
+from database import get_db
+import models, schemas
+from auth import get_current_user
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+import versioning
+import timeline
+import calendars
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/worlds", tags=["Timeline"])
+
+
+def _check_world(db: Session, world_id: int, current_user: models.User, request: Request, response: Response):
+    version = versioning.get_world_version(db, world_id, current_user.id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="World not found")
+    etag = versioning.list_etag("timeline", world_id, version, request)
+    if versioning.etag_matches(request, etag):
+        return versioning.not_modified(etag)
+    versioning.set_etag(response, etag)
+    return None
+
+
+# Bounds are written in the world's calendar; a bound covering a span (a
+# whole year) includes all of it
+def _ordinal_range(db: Session, world_id: int, start: Optional[str], end: Optional[str]):
+    calendar = calendars.for_world(db, world_id)
+    try:
+        first = calendar.parse(start).ordinal if start else None
+        last = calendar.parse(end).last_ordinal if end else None
+    except calendars.CalendarError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if first is not None and last is not None and first > last:
+        raise HTTPException(status_code=422, detail="start must not be after end")
+    return calendar, first, last
+
+
+# -------------------
+# Events in a date range, in date order
+# -------------------
+@router.get("/{world_id}/timeline", response_model=schemas.TimelinePage)
+def get_timeline(
+    world_id: int,
+    request: Request,
+    response: Response,
+    start: Optional[str] = Query(None, description="Earliest date (inclusive), in the world's calendar"),
+    end: Optional[str] = Query(None, description="Latest date (inclusive), in the world's calendar"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    not_modified = _check_world(db, world_id, current_user, request, response)
+    if not_modified:
+        return not_modified
+
+    _, first, last = _ordinal_range(db, world_id, start, end)
+    try:
+        page = timeline.events_page(db, world_id, first, last, limit, after)
+    except timeline.CursorError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    logger.info(f"User {current_user.username} fetched {len(page['items'])} timeline events for world ID {world_id}")
+    return page
+
+
+# -------------------
+# Event density per year / decade / century
+# -------------------
+@router.get("/{world_id}/timeline/histogram", response_model=schemas.TimelineHistogram)
+def get_timeline_histogram(
+    world_id: int,
+    request: Request,
+    response: Response,
+    zoom: str = Query("year", pattern="^(" + "|".join(timeline.ZOOM_YEARS) + ")$"),
+    start: Optional[str] = Query(None),
+    end: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    not_modified = _check_world(db, world_id, current_user, request, response)
+    if not_modified:
+        return not_modified
+
+    calendar, first, last = _ordinal_range(db, world_id, start, end)
+    return timeline.histogram(db, world_id, calendar, zoom, first, last)
@@ -0,0 +1,41 @@
+import logging
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from database import get_db
+import models, schemas
+from auth import get_current_user
+import versioning
+from typeahead import name_indexes, SOURCES, TYPEAHEAD_DEFAULT_LIMIT, TYPEAHEAD_MAX_LIMIT
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/worlds", tags=["Typeahead"])
+
+
+# -------------------
+# Name completion within one world
+# -------------------
+@router.get("/{world_id}/typeahead", response_model=schemas.TypeaheadResults)
+def typeahead(
+    world_id: int,
+    q: str = Query(..., min_length=1, max_length=64),
+    kind: Optional[List[str]] = Query(None, description="Repeat to allow several: character, event, location"),
+    limit: int = Query(TYPEAHEAD_DEFAULT_LIMIT, ge=1, le=TYPEAHEAD_MAX_LIMIT),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    unknown = set(kind or ()) - set(SOURCES)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown kind(s): {', '.join(sorted(unknown))}")
+
+    version = versioning.get_world_version(db, world_id, current_user.id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="World not found")
+
+    index = name_indexes.get(db, world_id, version)
+    hits, truncated = index.complete(q, set(kind or ()), limit)
+    if truncated:
+        logger.warning(f"Typeahead for world ID {world_id} hit its time budget ({len(index)} names)")
+    return {"query": q, "hits": hits, "truncated": truncated}
@@ -1,36 +1,86 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 import models, schemas
-from auth import hash_password, verify_password, create_access_token
+from auth import hash_password_async, verify_and_update_password, create_access_token
 from database import get_db
+from hashing import HashingBusy
+from throttle import login_throttle
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
-@router.post("/", response_model=schemas.User)
-def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    existing_user = db.query(models.User).filter(
+# These routes are async so that waiting on the bcrypt process pool does not
+# hold a threadpool worker; their short database calls still run on the threadpool.
+
+
+def _busy():
+    return HTTPException(status_code=503, detail="Too many password requests, try again shortly", headers={"Retry-After": "1"})
+
+
+def _find_user(db: Session, username_or_email: str):
+    return db.query(models.User).filter(
+        (models.User.username == username_or_email) |
+        (models.User.email == username_or_email)
+    ).first()
+
+
+def _find_conflicting_user(db: Session, user: schemas.UserCreate):
+    return db.query(models.User).filter(
         (models.User.username == user.username) | (models.User.email == user.email)
     ).first()
+
+
+def _save_user(db: Session, db_user: models.User):
+    db.add(db_user)
+    db.commit()
+    db.refresh(db_user)
+    return db_user
+
+
+@router.post("/", response_model=schemas.User)
+async def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
+    existing_user = await run_in_threadpool(_find_conflicting_user, db, user)
     if existing_user:
         raise HTTPException(status_code=400, detail="User already exists")
+    try:
+        hashed_password = await hash_password_async(user.password)
+    except HashingBusy:
+        raise _busy()
     db_user = models.User(
         username=user.username,
         email=user.email,
         full_name=user.full_name,
-        hashed_password=hash_password(user.password)
+        hashed_password=hashed_password
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+    return await run_in_threadpool(_save_user, db, db_user)
 
 @router.post("/login")
-def login_user(login: schemas.LoginSchema, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(
-        (models.User.username == login.username_or_email) |
-        (models.User.email == login.username_or_email)
-    ).first()
-    if not user or not verify_password(login.password, user.hashed_password):
+async def login_user(login: schemas.LoginSchema, request: Request, db: Session = Depends(get_db)):
+    client_ip = request.client.host if request.client else None
+    # Over-limit attempts are refused before any database or bcrypt work
+    retry_after = await login_throttle.check(login.username_or_email, client_ip)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many failed login attempts, try again later",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    user = await run_in_threadpool(_find_user, db, login.username_or_email)
+    if not user:
+        await login_throttle.record_failure(login.username_or_email, client_ip)
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    try:
+        valid, new_hash = await verify_and_update_password(login.password, user.hashed_password)
+    except HashingBusy:
+        raise _busy()
+    if not valid:
+        await login_throttle.record_failure(login.username_or_email, client_ip)
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    await login_throttle.record_success(login.username_or_email)
+    # Stored hash was made at a different cost: swap in the re-hashed value
+    if new_hash is not None:
+        user.hashed_password = new_hash
+        await run_in_threadpool(db.commit)
     token = create_access_token({"sub": user.username})
     return {"access_token": token, "token_type": "bearer"}
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
 from database import get_db
 import models, schemas
 from auth import get_current_user
+from pagination import PageParams, page_params, keyset, to_page, SNAPSHOT_MAX_ITEMS
+import versioning
+import ownership
 
 router = APIRouter(prefix="/worlds", tags=["Worlds"])
 
@@ -15,9 +17,46 @@ def create_world(world: schemas.WorldCreate, db: Session = Depends(get_db), curr
     db.refresh(db_world)
     return db_world
 
-@router.get("/", response_model=List[schemas.World])
-def get_worlds(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    return db.query(models.World).filter(models.World.user_id == current_user.id).all()
+@router.get("/", response_model=schemas.Page[schemas.World])
+def get_worlds(page: PageParams = Depends(page_params), db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    query = db.query(models.World).filter(models.World.user_id == current_user.id)
+    return to_page(keyset(query, models.World.id, page).all(), page)
+
+SNAPSHOT_COLLECTIONS = (
+    ("characters", models.Character),
+    ("events", models.Event),
+    ("locations", models.Location),
+)
+
+# One ownership check, then one keyset window per collection: a fixed four
+# queries, each capped at SNAPSHOT_MAX_ITEMS rows however large the world is
+@router.get("/{world_id}/snapshot", response_model=schemas.WorldSnapshot)
+def get_world_snapshot(world_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    world = db.query(models.World).filter(models.World.id == world_id, models.World.user_id == current_user.id).first()
+    if not world:
+        raise HTTPException(status_code=404, detail="World not found")
+
+    params = PageParams(SNAPSHOT_MAX_ITEMS, None, False)
+    snapshot = {**schemas.World.model_validate(world).model_dump(), "truncated": False}
+    for name, model in SNAPSHOT_COLLECTIONS:
+        page = to_page(keyset(db.query(model).filter(model.world_id == world_id), model.id, params).all(), params)
+        snapshot[name] = page["items"]
+        snapshot["truncated"] = snapshot["truncated"] or page["next_cursor"] is not None
+    return snapshot
+
+@router.post("/{world_id}/transfer", response_model=schemas.World)
+def transfer_world(world_id: int, transfer: schemas.WorldTransfer, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    world = db.query(models.World).filter(models.World.id == world_id, models.World.user_id == current_user.id).first()
+    if not world:
+        raise HTTPException(status_code=404, detail="World not found")
+    recipient_id = ownership.find_recipient(db, transfer.username_or_email)
+    if recipient_id is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    if recipient_id != current_user.id:
+        ownership.transfer_world(db, world_id, recipient_id)
+        db.commit()
+        db.refresh(world)
+    return world
 
 @router.delete("/{world_id}", status_code=204)
 def delete_world(world_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
@@ -25,5 +64,6 @@ def delete_world(world_id: int, db: Session = Depends(get_db), current_user: mod
     if not world:
         raise HTTPException(status_code=404, detail="World not found")
     db.delete(world)
+    versioning.note_world_change(db, world_id, "world")
     db.commit()
     return
@@ -1,6 +1,16 @@
 # schemas.py
-from pydantic import BaseModel
-from typing import Optional
+from datetime import date as date_type
+from pydantic import AliasChoices, BaseModel, Field, field_validator, model_validator
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# -------------------
+# Pagination schema
+# -------------------
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[int] = None  # pass as ?after= to fetch the next page
 
 # -------------------
 # User schemas
@@ -42,6 +52,9 @@ class World(WorldBase):
     class Config:
         from_attributes = True
 
+class WorldTransfer(BaseModel):
+    username_or_email: str  # the new owner
+
 # -------------------
 # World Elements schema
 # -------------------
@@ -64,9 +77,27 @@ class Character(CharacterBase):
         from_attributes = True
 
 
+# Position on the world map, in whatever units the world's map uses
+class Coordinates(BaseModel):
+    x: float = Field(..., allow_inf_nan=False)
+    y: float = Field(..., allow_inf_nan=False)
+
+    # Also accepts the "x, y" text the location form sends
+    @model_validator(mode="before")
+    @classmethod
+    def from_text(cls, value):
+        if isinstance(value, str):
+            parts = value.replace(";", ",").split(",")
+            if len(parts) != 2:
+                raise ValueError("Coordinates must be written as 'x, y'")
+            return {"x": parts[0].strip(), "y": parts[1].strip()}
+        return value
+
 class LocationBase(BaseModel):
     name: str
     description: Optional[str] = None
+    parent_id: Optional[int] = None  # containing location, in the same world
+    coordinates: Optional[Coordinates] = None
 
 class LocationCreate(LocationBase):
     world_id: int
@@ -77,6 +108,24 @@ class Location(LocationBase):
     class Config:
         from_attributes = True
 
+# Subtree and breadcrumb entries; depth is the number of levels from the
+# location the request was made for
+class LocationNode(Location):
+    depth: int
+
+class LocationsInView(BaseModel):
+    items: List[Location]  # in id order
+    truncated: bool = False  # more locations fall inside the box than limit
+
+class NearbyLocation(Location):
+    distance: float
+
+class LocationCounts(BaseModel):
+    location_id: int
+    locations: int  # below it, at any depth
+    events: int  # at it or anywhere below it
+    depth: int  # levels below it (0 for a leaf)
+
 
 class EventBase(BaseModel):
     title: str  # Change from 'name' to 'title'
@@ -97,11 +146,196 @@ class Event(EventBase):
     id: int
     world_id: int
     user_id: Optional[int] = None
+    # Read from events.date_display, the date as formatted by the world's calendar
+    date: Optional[str] = Field(None, validation_alias=AliasChoices("date_display", "date"))
+    date_ordinal: Optional[int] = None  # day number in the world's calendar, for sorting
+
+    # events.date is a SQL DATE; render it back as the ISO string clients send
+    @field_validator("date", mode="before")
+    @classmethod
+    def date_to_str(cls, value):
+        return value.isoformat() if isinstance(value, date_type) else value
     
     class Config:
         from_attributes = True
 
 
+# GET /events/{event_id}?embed=location; location stays null without the embed
+class EventDetail(Event):
+    location: Optional[Location] = None
+
+
+# -------------------
+# Calendar schemas
+# -------------------
+class CalendarMonth(BaseModel):
+    name: str = Field(..., min_length=1)
+    days: int = Field(..., ge=1, le=1000)
+
+class CalendarEra(BaseModel):
+    name: str = Field(..., min_length=1)
+    abbreviation: str = Field(..., min_length=1)
+    years: Optional[int] = Field(None, ge=1)  # None: open-ended (last era only)
+
+class CalendarDefinition(BaseModel):
+    months: List[CalendarMonth] = Field(..., min_length=1)
+    eras: List[CalendarEra] = Field(..., min_length=1)
+
+class Calendar(BaseModel):
+    world_id: int
+    kind: str  # "gregorian" or "custom"
+    definition: Optional[CalendarDefinition] = None
+    days_per_year: Optional[int] = None
+
+
+# -------------------
+# Timeline schemas
+# -------------------
+class TimelinePage(BaseModel):
+    items: List[Event]
+    next_cursor: Optional[str] = None  # pass as ?after= to fetch the next page
+
+class HistogramBucket(BaseModel):
+    start: int  # first year in the bucket (counted from the calendar's first era)
+    label: str  # that year as the calendar writes it
+    count: int
+
+class TimelineHistogram(BaseModel):
+    zoom: str
+    bucket_years: int
+    total: int
+    buckets: List[HistogramBucket]
+
+
+# -------------------
+# Bulk create / update schemas
+# -------------------
+class BulkCreated(BaseModel, Generic[T]):
+    created: List[T]
+    count: int
+
+class BulkUpdated(BaseModel, Generic[T]):
+    updated: List[T]  # in request order
+    count: int
+
+
+# -------------------
+# Search schemas
+# -------------------
+# title is plain text. highlighted_title and snippet are HTML fragments: the
+# stored text is HTML-escaped and the only tags are the <mark></mark> pairs
+# around matched words, so clients may insert them as markup as-is.
+class SearchHit(BaseModel):
+    kind: str  # "character", "event" or "location"
+    id: int
+    world_id: int
+    title: Optional[str] = None
+    highlighted_title: Optional[str] = None
+    snippet: Optional[str] = None
+    rank: float
+
+class SearchResults(BaseModel):
+    query: str
+    hits: List[SearchHit]
+
+
+# -------------------
+# Typeahead schemas
+# -------------------
+class TypeaheadHit(BaseModel):
+    kind: str
+    id: int
+    name: Optional[str] = None
+    match: str  # "prefix", "word" or "fuzzy"
+    score: float
+
+class TypeaheadResults(BaseModel):
+    query: str
+    hits: List[TypeaheadHit]
+    truncated: bool = False  # the lookup hit its time budget; hits may be incomplete
+
+
+# -------------------
+# Character relationship graph schemas
+# -------------------
+class RelationshipCreate(BaseModel):
+    source_id: int
+    target_id: int
+    type: str = Field(..., min_length=1, max_length=64)
+
+class Relationship(RelationshipCreate):
+    id: int
+    world_id: int
+    class Config:
+        from_attributes = True
+
+class GraphNode(BaseModel):
+    id: int
+    name: Optional[str] = None
+    distance: int  # hops from the starting character
+
+class Neighborhood(BaseModel):
+    character_id: int
+    depth: int
+    nodes: List[GraphNode]
+    edges: List[Relationship]
+    truncated: bool = False  # stopped at the node limit before reaching full depth
+
+class GraphPath(BaseModel):
+    source_id: int
+    target_id: int
+    found: bool
+    length: Optional[int] = None  # number of edges
+    character_ids: List[int] = []
+    edges: List[Relationship] = []
+
+class GraphComponent(BaseModel):
+    size: int
+    character_ids: List[int]
+
+class GraphComponents(BaseModel):
+    count: int  # components with at least min_size characters
+    components: List[GraphComponent]  # largest first, up to limit
+
+
+# -------------------
+# Route schemas
+# -------------------
+class RouteCreate(BaseModel):
+    source_id: int
+    target_id: int
+    travel_time: float = Field(..., gt=0, allow_inf_nan=False)
+    bidirectional: bool = True
+    mode: Optional[str] = Field(None, min_length=1, max_length=32)
+
+class Route(RouteCreate):
+    id: int
+    world_id: int
+    class Config:
+        from_attributes = True
+
+class TravelPlan(BaseModel):
+    source_id: int
+    target_id: int
+    found: bool
+    travel_time: Optional[float] = None
+    location_ids: List[int] = []
+    routes: List[Route] = []  # in travel order; a bidirectional route may be taken target -> source
+
+
+# -------------------
+# World snapshot schema
+# -------------------
+# Each collection holds at most SNAPSHOT_MAX_ITEMS rows (lowest ids first);
+# truncated is set when any of them was cut short, and the rest can be read
+# from the paginated list endpoints
+class WorldSnapshot(World):
+    characters: List[Character] = []
+    events: List[Event] = []
+    locations: List[Location] = []
+    truncated: bool = False
+
+
 # ---------------- Character ----------------
 class CharacterUpdate(BaseModel):
     name: Optional[str] = None
@@ -113,10 +347,15 @@ class CharacterUpdate(BaseModel):
 class LocationUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
-    coordinates: Optional[str] = None
+    coordinates: Optional[Coordinates] = None  # null takes it off the map
+    parent_id: Optional[int] = None  # null moves it to the top level
 
-# ---------------- Event ----------------
-class EventUpdate(BaseModel):
-    name: Optional[str] = None
-    date: Optional[str] = None
-    description: Optional[str] = None
+# ---------------- Bulk PATCH items: which entity, then the fields to change ----------------
+class CharacterPatch(CharacterUpdate):
+    id: int
+
+class LocationPatch(LocationUpdate):
+    id: int
+
+class EventPatch(EventUpdate):
+    id: int
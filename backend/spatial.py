@@ -0,0 +1,153 @@
+# spatial.py
+#
+# Map queries over location coordinates: everything inside a bounding box
+# (the visible part of the map) and the k nearest locations to a point.
+# Postgres answers both from the GiST index on point(x, y) created by
+# migrations/0009_location_coordinates.py (<@ for boxes, <-> ordering for
+# nearest). Other databases get a per-world quadtree built in memory and
+# kept until the world's locations change (world_indexes.py).
+import heapq
+import math
+import os
+from sqlalchemy import func, select
+import models
+from world_indexes import VersionedWorldCache
+
+MAP_DEFAULT_LIMIT = int(os.getenv("MAP_DEFAULT_LIMIT", "500"))
+MAP_MAX_LIMIT = int(os.getenv("MAP_MAX_LIMIT", "5000"))
+NEAREST_MAX_K = int(os.getenv("NEAREST_MAX_K", "100"))
+QUADTREE_MAX_WORLDS = int(os.getenv("QUADTREE_MAX_WORLDS", "128"))
+# Points per quadtree leaf before it splits, and a depth cap for stacks of
+# identical points that no split can separate
+QUADTREE_LEAF_SIZE = 16
+QUADTREE_MAX_DEPTH = 24
+
+Location = models.Location
+
+
+def point_columns(coordinates) -> dict:
+    if coordinates is None:
+        return {"x": None, "y": None}
+    return {"x": coordinates.x, "y": coordinates.y}
+
+
+# -------------------
+# Quadtree
+# -------------------
+class QuadTree:
+    # points: [(x, y, location id)], bulk-loaded by recursive splitting
+    def __init__(self, points):
+        self.size = len(points)
+        if points:
+            xs = [p[0] for p in points]
+            ys = [p[1] for p in points]
+            self.root = self._build(points, min(xs), min(ys), max(xs), max(ys), 0)
+        else:
+            self.root = None
+
+    # A node is [x0, y0, x1, y1, children, points]; leaves have points only
+    def _build(self, points, x0, y0, x1, y1, depth):
+        if len(points) <= QUADTREE_LEAF_SIZE or depth >= QUADTREE_MAX_DEPTH:
+            return [x0, y0, x1, y1, None, points]
+        mx, my = (x0 + x1) / 2, (y0 + y1) / 2
+        quadrants = ([], [], [], [])
+        for point in points:
+            quadrants[(point[0] > mx) + 2 * (point[1] > my)].append(point)
+        bounds = ((x0, y0, mx, my), (mx, y0, x1, my), (x0, my, mx, y1), (mx, my, x1, y1))
+        children = [
+            self._build(quadrant, *box, depth + 1)
+            for quadrant, box in zip(quadrants, bounds)
+            if quadrant
+        ]
+        return [x0, y0, x1, y1, children, None]
+
+    def within(self, x0, y0, x1, y1) -> list:
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            nx0, ny0, nx1, ny1, children, points = stack.pop()
+            if nx0 > x1 or nx1 < x0 or ny0 > y1 or ny1 < y0:
+                continue
+            if points is not None:
+                found.extend(pid for px, py, pid in points if x0 <= px <= x1 and y0 <= py <= y1)
+            else:
+                stack.extend(children)
+        return found
+
+    # Best-first search: nodes come off the heap in order of their distance
+    # to the query point, so the first k points popped are the k nearest
+    def nearest(self, x, y, k: int) -> list:
+        if self.root is None:
+            return []
+        heap = [(0.0, 0, self.root)]
+        tie = 1
+        found = []
+        while heap and len(found) < k:
+            distance, _, item = heapq.heappop(heap)
+            if isinstance(item, tuple):
+                found.append((item[2], distance))
+                continue
+            nx0, ny0, nx1, ny1, children, points = item
+            for entry in (points if points is not None else children):
+                if points is not None:
+                    entry_distance = math.hypot(entry[0] - x, entry[1] - y)
+                else:
+                    dx = max(entry[0] - x, 0.0, x - entry[2])
+                    dy = max(entry[1] - y, 0.0, y - entry[3])
+                    entry_distance = math.hypot(dx, dy)
+                heapq.heappush(heap, (entry_distance, tie, entry))
+                tie += 1
+        return found
+
+
+def build_quadtree(db, world_id: int) -> QuadTree:
+    rows = db.execute(
+        select(Location.x, Location.y, Location.id)
+        .where(Location.world_id == world_id, Location.x.isnot(None), Location.y.isnot(None))
+    ).all()
+    return QuadTree([tuple(row) for row in rows])
+
+
+quadtrees = VersionedWorldCache("location-quadtree", build_quadtree, ("location",), QUADTREE_MAX_WORLDS)
+
+
+def _on_map(world_id: int):
+    return select(Location).where(Location.world_id == world_id, Location.x.isnot(None), Location.y.isnot(None))
+
+
+def _by_ids(db, ids) -> dict:
+    if not ids:
+        return {}
+    return {location.id: location for location in db.scalars(select(Location).where(Location.id.in_(ids)))}
+
+
+# -------------------
+# Queries
+# -------------------
+# Returns (locations in id order, truncated)
+def in_box(db, world_id: int, version: int, box, limit: int):
+    x0, y0, x1, y1 = box
+    if db.get_bind().dialect.name == "postgresql":
+        statement = (
+            _on_map(world_id)
+            .where(func.point(Location.x, Location.y).op("<@")(func.box(func.point(x0, y0), func.point(x1, y1))))
+            .order_by(Location.id)
+            .limit(limit + 1)
+        )
+        locations = db.scalars(statement).all()
+    else:
+        ids = sorted(quadtrees.get(db, world_id, version).within(x0, y0, x1, y1))[:limit + 1]
+        found = _by_ids(db, ids)
+        locations = [found[i] for i in ids if i in found]
+    return locations[:limit], len(locations) > limit
+
+
+# Returns [(location, distance)], nearest first
+def nearest(db, world_id: int, version: int, x: float, y: float, k: int):
+    if db.get_bind().dialect.name == "postgresql":
+        distance = func.point(Location.x, Location.y).op("<->")(func.point(x, y))
+        statement = _on_map(world_id).add_columns(distance).order_by(distance, Location.id).limit(k)
+        return [(location, d) for location, d in db.execute(statement)]
+    hits = quadtrees.get(db, world_id, version).nearest(x, y, k)
+    found = _by_ids(db, [location_id for location_id, _ in hits])
+    return [(found[location_id], d) for location_id, d in hits if location_id in found]
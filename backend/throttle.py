@@ -0,0 +1,172 @@
+# throttle.py
+#
+# Sliding-window failed-login tracker. Login checks it before touching the
+# database or bcrypt, so guessing passwords against a hot account (or from a
+# hot address) costs us a dictionary lookup instead of a bcrypt round.
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+LOGIN_WINDOW_SECONDS = int(os.getenv("LOGIN_WINDOW_SECONDS", "300"))
+LOGIN_MAX_FAILURES_PER_ACCOUNT = int(os.getenv("LOGIN_MAX_FAILURES_PER_ACCOUNT", "5"))
+LOGIN_MAX_FAILURES_PER_IP = int(os.getenv("LOGIN_MAX_FAILURES_PER_IP", "30"))
+# "memory" (per process) or "redis" (shared by every worker; needs the redis package)
+LOGIN_THROTTLE_BACKEND = os.getenv("LOGIN_THROTTLE_BACKEND", "memory").lower()
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# Bound on tracked keys for the in-memory backend
+LOGIN_THROTTLE_MAX_KEYS = int(os.getenv("LOGIN_THROTTLE_MAX_KEYS", "100000"))
+
+
+# -------------------
+# Backends
+# -------------------
+# Both backends keep one timestamp per failure under each key and answer
+# "how many failures in the last window seconds, and when does the oldest
+# one expire".
+class MemoryBackend:
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._failures = OrderedDict()  # key -> deque of timestamps
+        self._lock = threading.Lock()
+
+    async def record(self, key: str, now: float, window: int):
+        with self._lock:
+            failures = self._failures.pop(key, None) or deque()
+            self._trim(failures, now, window)
+            failures.append(now)
+            self._failures[key] = failures
+            while len(self._failures) > self.max_keys:
+                self._failures.popitem(last=False)
+
+    async def window(self, key: str, now: float, window: int):
+        with self._lock:
+            failures = self._failures.get(key)
+            if not failures:
+                return 0, None
+            self._trim(failures, now, window)
+            if not failures:
+                del self._failures[key]
+                return 0, None
+            return len(failures), failures[0]
+
+    async def clear(self, key: str):
+        with self._lock:
+            self._failures.pop(key, None)
+
+    def size(self) -> int:
+        return len(self._failures)
+
+    @staticmethod
+    def _trim(failures: deque, now: float, window: int):
+        while failures and failures[0] <= now - window:
+            failures.popleft()
+
+
+class RedisBackend:
+    def __init__(self, url: str):
+        import redis.asyncio as redis  # optional dependency, only for this backend
+
+        self._redis = redis.from_url(url)
+        self._prefix = "login-failures:"
+
+    async def record(self, key: str, now: float, window: int):
+        key = self._prefix + key
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.zremrangebyscore(key, 0, now - window)
+            pipe.zadd(key, {f"{now:.6f}": now})
+            pipe.expire(key, window)
+            await pipe.execute()
+
+    async def window(self, key: str, now: float, window: int):
+        key = self._prefix + key
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.zremrangebyscore(key, 0, now - window)
+            pipe.zcard(key)
+            pipe.zrange(key, 0, 0, withscores=True)
+            _, count, oldest = await pipe.execute()
+        return count, (oldest[0][1] if oldest else None)
+
+    async def clear(self, key: str):
+        await self._redis.delete(self._prefix + key)
+
+    def size(self):
+        return None
+
+
+def _make_backend():
+    if LOGIN_THROTTLE_BACKEND == "redis":
+        return RedisBackend(REDIS_URL)
+    return MemoryBackend(LOGIN_THROTTLE_MAX_KEYS)
+
+
+# -------------------
+# Throttle
+# -------------------
+class LoginThrottle:
+    def __init__(self, backend, window: int, max_per_account: int, max_per_ip: int):
+        self.backend = backend
+        self.window_seconds = window
+        self.max_per_account = max_per_account
+        self.max_per_ip = max_per_ip
+        self._lock = threading.Lock()
+        self.blocked_account = 0
+        self.blocked_ip = 0
+        self.failures = 0
+
+    # Returns seconds until the caller may retry, or None if the attempt may proceed
+    async def check(self, account: str, client_ip: str):
+        now = time.time()
+        for key, limit, counter in (
+            (_account_key(account), self.max_per_account, "blocked_account"),
+            (_ip_key(client_ip), self.max_per_ip, "blocked_ip"),
+        ):
+            count, oldest = await self.backend.window(key, now, self.window_seconds)
+            if count >= limit:
+                self._count(counter)
+                return max(int(oldest + self.window_seconds - now) + 1, 1)
+        return None
+
+    async def record_failure(self, account: str, client_ip: str):
+        now = time.time()
+        self._count("failures")
+        await self.backend.record(_account_key(account), now, self.window_seconds)
+        await self.backend.record(_ip_key(client_ip), now, self.window_seconds)
+
+    # A correct password resets the account's budget (not the address's)
+    async def record_success(self, account: str):
+        await self.backend.clear(_account_key(account))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": type(self.backend).__name__,
+                "window_seconds": self.window_seconds,
+                "max_failures_per_account": self.max_per_account,
+                "max_failures_per_ip": self.max_per_ip,
+                "tracked_keys": self.backend.size(),
+                "failures_recorded": self.failures,
+                "blocked_by_account": self.blocked_account,
+                "blocked_by_ip": self.blocked_ip,
+                "blocked_total": self.blocked_account + self.blocked_ip,
+            }
+
+    def _count(self, attr: str):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+
+def _account_key(account: str) -> str:
+    return "account:" + account.strip().lower()
+
+
+def _ip_key(client_ip: str) -> str:
+    return "ip:" + (client_ip or "unknown")
+
+
+login_throttle = LoginThrottle(
+    _make_backend(),
+    LOGIN_WINDOW_SECONDS,
+    LOGIN_MAX_FAILURES_PER_ACCOUNT,
+    LOGIN_MAX_FAILURES_PER_IP,
+)
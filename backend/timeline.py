@@ -0,0 +1,78 @@
+# timeline.py
+#
+# Date-ordered event queries for one world. Dates are compared as the
+# integer day ordinals written by calendars.py, and pages are keyset windows
+# over (date_ordinal, id) within the world, so they read straight off the
+# ix_events_world_id_date_ordinal_id index however far into history the
+# client scrolls. Undated events have no place on a timeline and are left out.
+from collections import OrderedDict
+from typing import Optional
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Session
+from models import Event
+
+# Histogram zoom level -> years per bucket
+ZOOM_YEARS = OrderedDict([("year", 1), ("decade", 10), ("century", 100)])
+
+
+class CursorError(ValueError):
+    pass
+
+
+# Cursors are "<date ordinal>_<id>" of the last event on the previous page
+def encode_cursor(event: Event) -> str:
+    return f"{event.date_ordinal}_{event.id}"
+
+
+def decode_cursor(cursor: str):
+    try:
+        ordinal, event_id = cursor.rsplit("_", 1)
+        return int(ordinal), int(event_id)
+    except ValueError:
+        raise CursorError(f"Invalid timeline cursor '{cursor}'")
+
+
+# start and end are inclusive day ordinals
+def _in_range(statement, world_id: int, start: Optional[int], end: Optional[int]):
+    statement = statement.where(Event.world_id == world_id, Event.date_ordinal.isnot(None))
+    if start is not None:
+        statement = statement.where(Event.date_ordinal >= start)
+    if end is not None:
+        statement = statement.where(Event.date_ordinal <= end)
+    return statement
+
+
+def events_page(db: Session, world_id: int, start: Optional[int], end: Optional[int], limit: int, after: Optional[str]) -> dict:
+    statement = _in_range(select(Event), world_id, start, end)
+    if after:
+        statement = statement.where(tuple_(Event.date_ordinal, Event.id) > tuple_(*decode_cursor(after)))
+    rows = db.scalars(statement.order_by(Event.date_ordinal, Event.id).limit(limit + 1)).all()
+    if len(rows) <= limit:
+        return {"items": rows, "next_cursor": None}
+    items = rows[:limit]
+    return {"items": items, "next_cursor": encode_cursor(items[-1])}
+
+
+# Counts per year come from one GROUP BY over the index (the calendar says
+# how to get a year out of a row); coarser zoom levels are rolled up from
+# those, at most one row per distinct year, in Python, which keeps the SQL
+# portable across Postgres and SQLite
+def histogram(db: Session, world_id: int, calendar, zoom: str, start: Optional[int], end: Optional[int]) -> dict:
+    size = ZOOM_YEARS[zoom]
+    year = calendar.year_expression()
+    statement = _in_range(select(year, func.count()), world_id, start, end).group_by(year)
+    buckets = OrderedDict()
+    total = 0
+    for event_year, count in sorted(db.execute(statement).all()):
+        bucket = (int(event_year) // size) * size
+        buckets[bucket] = buckets.get(bucket, 0) + count
+        total += count
+    return {
+        "zoom": zoom,
+        "bucket_years": size,
+        "total": total,
+        "buckets": [
+            {"start": bucket, "label": calendar.year_label(bucket), "count": count}
+            for bucket, count in buckets.items()
+        ],
+    }
@@ -0,0 +1,152 @@
+# travel.py
+#
+# Fastest journeys over the weighted routes between a world's locations.
+# Each world's adjacency lists are built once from the routes table and kept
+# in a VersionedWorldCache (world_indexes.py), so a route write or a location
+# change throws the graph away and the next query rebuilds it. Searches are
+# A* with a straight-line heuristic when every route end has coordinates
+# (plain Dijkstra otherwise), and their results are memoized on the graph,
+# so they live exactly as long as the routes they were computed from.
+import heapq
+import math
+import os
+import threading
+from collections import OrderedDict
+from sqlalchemy import select
+import models
+from world_indexes import VersionedWorldCache
+
+ROUTE_GRAPH_MAX_WORLDS = int(os.getenv("ROUTE_GRAPH_MAX_WORLDS", "128"))
+# Journeys remembered per world graph
+TRAVEL_MEMO_SIZE = int(os.getenv("TRAVEL_MEMO_SIZE", "1024"))
+
+
+class RouteGraph:
+    # locations: [(id, x, y)]; routes: [(id, source_id, target_id, travel_time, bidirectional, mode)]
+    def __init__(self, world_id: int, locations, routes):
+        self.world_id = world_id
+        self.location_ids = set()
+        self.positions = {}  # location id -> (x, y)
+        for location_id, x, y in locations:
+            self.location_ids.add(location_id)
+            if x is not None and y is not None:
+                self.positions[location_id] = (x, y)
+        self.routes = {}  # route id -> (source_id, target_id, travel_time, bidirectional, mode)
+        self.adjacency = {}  # location id -> [(neighbor id, travel time, route id, mode)]
+        for route_id, source_id, target_id, travel_time, bidirectional, mode in routes:
+            self.routes[route_id] = (source_id, target_id, travel_time, bidirectional, mode)
+            self.adjacency.setdefault(source_id, []).append((target_id, travel_time, route_id, mode))
+            if bidirectional:
+                self.adjacency.setdefault(target_id, []).append((source_id, travel_time, route_id, mode))
+        self.speed = self._fastest_speed()
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        self.memo_hits = 0
+
+    def __contains__(self, location_id: int):
+        return location_id in self.location_ids
+
+    def route(self, route_id: int) -> dict:
+        source_id, target_id, travel_time, bidirectional, mode = self.routes[route_id]
+        return {
+            "id": route_id,
+            "world_id": self.world_id,
+            "source_id": source_id,
+            "target_id": target_id,
+            "travel_time": travel_time,
+            "bidirectional": bidirectional,
+            "mode": mode,
+        }
+
+    # Straight-line distance covered per unit of travel time on the fastest
+    # route. No journey can beat distance / speed, which keeps the heuristic
+    # admissible; that only holds if every route end is on the map, so
+    # without coordinates for all of them the search falls back to Dijkstra.
+    def _fastest_speed(self):
+        speed = 0.0
+        for source_id, target_id, travel_time, _, _ in self.routes.values():
+            if source_id not in self.positions or target_id not in self.positions:
+                return None
+            (x0, y0), (x1, y1) = self.positions[source_id], self.positions[target_id]
+            speed = max(speed, math.hypot(x1 - x0, y1 - y0) / travel_time)
+        return speed or None
+
+    # -------------------
+    # Fastest journey
+    # -------------------
+    # Returns (travel time, location ids, route ids) or None; modes limits the
+    # routes taken (empty means any)
+    def shortest(self, source: int, target: int, modes=()):
+        key = (source, target, frozenset(modes))
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                self.memo_hits += 1
+                return self._memo[key]
+
+        result = self._search(source, target, key[2])
+
+        with self._lock:
+            self._memo[key] = result
+            if len(self._memo) > TRAVEL_MEMO_SIZE:
+                self._memo.popitem(last=False)
+        return result
+
+    def _search(self, source: int, target: int, modes):
+        if source == target:
+            return 0.0, [source], []
+        goal = self.positions.get(target) if self.speed else None
+
+        def estimate(node):
+            position = self.positions.get(node) if goal else None
+            if position is None:
+                return 0.0
+            return math.hypot(goal[0] - position[0], goal[1] - position[1]) / self.speed
+
+        best = {source: 0.0}
+        parents = {source: None}  # node -> (previous node, route id)
+        heap = [(estimate(source), 0.0, source)]
+        while heap:
+            _, elapsed, node = heapq.heappop(heap)
+            if elapsed > best[node]:
+                continue  # stale entry, a faster way here was found since
+            if node == target:
+                return elapsed, *self._unwind(target, parents)
+            for neighbor, travel_time, route_id, mode in self.adjacency.get(node, ()):
+                if modes and mode not in modes:
+                    continue
+                arrival = elapsed + travel_time
+                # The estimate is admissible but not always consistent (float
+                # rounding), so a settled node can still be improved and re-queued
+                if arrival < best.get(neighbor, math.inf):
+                    best[neighbor] = arrival
+                    parents[neighbor] = (node, route_id)
+                    heapq.heappush(heap, (arrival + estimate(neighbor), arrival, neighbor))
+        return None
+
+    def _unwind(self, node: int, parents):
+        location_ids, route_ids = [node], []
+        while parents[node] is not None:
+            node, route_id = parents[node]
+            location_ids.append(node)
+            route_ids.append(route_id)
+        location_ids.reverse()
+        route_ids.reverse()
+        return location_ids, route_ids
+
+
+def build_route_graph(db, world_id: int) -> RouteGraph:
+    location = models.Location
+    locations = db.execute(
+        select(location.id, location.x, location.y).where(location.world_id == world_id)
+    ).all()
+    route = models.Route
+    routes = db.execute(
+        select(route.id, route.source_id, route.target_id, route.travel_time, route.bidirectional, route.mode)
+        .where(route.world_id == world_id)
+    ).all()
+    return RouteGraph(world_id, locations, routes)
+
+
+# Locations are a source too: their coordinates feed the heuristic
+route_graphs = VersionedWorldCache("route-graph", build_route_graph, ("location", "route"), ROUTE_GRAPH_MAX_WORLDS)
@@ -0,0 +1,142 @@
+# typeahead.py
+#
+# Name completion for characters, events and locations in one world, served
+# from a per-world in-memory index (see world_indexes.py) instead of
+# ILIKE '%...%' scans. Prefix matches come from two sorted key lists, whole
+# names and then later word starts (so "pe" also finds "Dragon Peak"), via
+# bisect; fuzzy matches come from trigram posting lists, pg_trgm style, built
+# in the same pass. Lookups stop at a hard time budget and say so instead of
+# running long. After a write the previous index keeps answering while a
+# background rebuild catches up (refresh_in_background in world_indexes.py),
+# so a keystroke never waits on a rebuild; only a world's first lookup does.
+import os
+import re
+import time
+import unicodedata
+from bisect import bisect_left
+from sqlalchemy import select
+import models
+from world_indexes import VersionedWorldCache
+
+TYPEAHEAD_DEFAULT_LIMIT = int(os.getenv("TYPEAHEAD_DEFAULT_LIMIT", "10"))
+TYPEAHEAD_MAX_LIMIT = int(os.getenv("TYPEAHEAD_MAX_LIMIT", "25"))
+TYPEAHEAD_BUDGET_MS = float(os.getenv("TYPEAHEAD_BUDGET_MS", "10"))
+TYPEAHEAD_MAX_WORLDS = int(os.getenv("TYPEAHEAD_MAX_WORLDS", "256"))
+# Jaccard similarity of trigram sets below which fuzzy hits are dropped
+FUZZY_MIN_SIMILARITY = 0.3
+# Prefix candidates examined per requested result before ranking
+PREFIX_SCAN_FACTOR = 20
+
+# kind -> (model, name column)
+SOURCES = {
+    "character": (models.Character, models.Character.name),
+    "event": (models.Event, models.Event.title),
+    "location": (models.Location, models.Location.name),
+}
+
+WHOLE_NAME, WORD, FUZZY = "prefix", "word", "fuzzy"
+_MATCH_SCORES = {WHOLE_NAME: 3.0, WORD: 2.0}
+
+
+def fold(value: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+
+def trigrams(folded: str) -> set:
+    grams = set()
+    for word in re.findall(r"\w+", folded):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class NameIndex:
+    def __init__(self, entries):
+        self.entries = entries  # list of (kind, id, name)
+        self._folded = [fold(name) for _, _, name in entries]
+        whole = sorted((folded, position) for position, folded in enumerate(self._folded))
+        words = sorted(
+            (folded[match.start():], position)
+            for position, folded in enumerate(self._folded)
+            for match in re.finditer(r"\w+", folded)
+            if match.start() > 0
+        )
+        self._prefix_lists = [
+            (WHOLE_NAME, [key for key, _ in whole], [position for _, position in whole]),
+            (WORD, [key for key, _ in words], [position for _, position in words]),
+        ]
+        self._postings = {}  # trigram -> list of entry positions
+        self._gram_counts = []
+        for position, folded in enumerate(self._folded):
+            grams = trigrams(folded)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(position)
+
+    def __len__(self):
+        return len(self.entries)
+
+    # Returns (hits, truncated); truncated means the budget ran out first
+    def complete(self, q: str, kinds, limit: int, budget_ms: float = TYPEAHEAD_BUDGET_MS):
+        deadline = time.perf_counter() + budget_ms / 1000
+        query = fold(q).strip()
+        if not query:
+            return [], False
+        matches = {}  # entry position -> match type
+        truncated = False
+
+        for match, keys, positions in self._prefix_lists:
+            if len(matches) >= limit * PREFIX_SCAN_FACTOR or truncated:
+                break
+            for key_position in range(bisect_left(keys, query), len(keys)):
+                if not keys[key_position].startswith(query) or len(matches) >= limit * PREFIX_SCAN_FACTOR:
+                    break
+                if time.perf_counter() > deadline:
+                    truncated = True
+                    break
+                position = positions[key_position]
+                if kinds and self.entries[position][0] not in kinds:
+                    continue
+                matches.setdefault(position, match)
+
+        scores = {position: _MATCH_SCORES[match] for position, match in matches.items()}
+        if len(matches) < limit and len(query) >= 3 and not truncated:
+            truncated = self._fuzzy(query, kinds, matches, scores, deadline)
+
+        ranked = sorted(scores, key=lambda p: (-scores[p], len(self.entries[p][2] or ""), self.entries[p][2] or "", p))
+        hits = []
+        for position in ranked[:limit]:
+            kind, entity_id, name = self.entries[position]
+            hits.append({"kind": kind, "id": entity_id, "name": name, "match": matches[position], "score": round(scores[position], 4)})
+        return hits, truncated
+
+    def _fuzzy(self, query: str, kinds, matches: dict, scores: dict, deadline: float) -> bool:
+        query_grams = trigrams(query)
+        shared = {}
+        for gram in query_grams:
+            if time.perf_counter() > deadline:
+                return True
+            for position in self._postings.get(gram, ()):
+                shared[position] = shared.get(position, 0) + 1
+        for position, count in shared.items():
+            if position in matches or (kinds and self.entries[position][0] not in kinds):
+                continue
+            similarity = count / (len(query_grams) + self._gram_counts[position] - count)
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                matches[position] = FUZZY
+                scores[position] = similarity
+        return False
+
+
+def build_name_index(db, world_id: int) -> NameIndex:
+    entries = []
+    for kind, (model, column) in SOURCES.items():
+        rows = db.execute(select(model.id, column).where(model.world_id == world_id))
+        entries.extend((kind, entity_id, name) for entity_id, name in rows)
+    return NameIndex(entries)
+
+
+name_indexes = VersionedWorldCache(
+    "typeahead", build_name_index, SOURCES.keys(), TYPEAHEAD_MAX_WORLDS, refresh_in_background=True
+)
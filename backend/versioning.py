@@ -0,0 +1,150 @@
+# versioning.py
+#
+# Every world carries a version counter that each write to its characters,
+# events or locations bumps in the same transaction. Read endpoints derive
+# ETags from it, and in-process caches use it (plus the change listeners
+# below) to know when a world's data has moved.
+import hashlib
+from fastapi import Request, Response
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+import models
+
+# -------------------
+# Change listeners
+# -------------------
+# Listeners are called with (world_id, kind) after the writing transaction
+# commits; kind is the entity type that changed ("character", "world", ...).
+_listeners = []
+
+
+def on_world_change(listener):
+    _listeners.append(listener)
+    return listener
+
+
+def _bump_statement(world_id: int):
+    return (
+        update(models.World)
+        .where(models.World.id == world_id)
+        .values(version=models.World.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def note_world_change(db, world_id: int, kind: str):
+    db.info.setdefault("changed_worlds", set()).add((world_id, kind))
+
+
+def bump_world_version(db: Session, world_id: int, kind: str):
+    db.execute(_bump_statement(world_id))
+    note_world_change(db, world_id, kind)
+
+
+async def bump_world_version_async(db, world_id: int, kind: str):
+    await db.execute(_bump_statement(world_id))
+    note_world_change(db, world_id, kind)
+
+
+# AsyncSession commits through a plain Session underneath, so this also
+# covers the async routers
+@event.listens_for(Session, "after_commit")
+def _notify_listeners(session):
+    changed = session.info.pop("changed_worlds", None)
+    for world_id, kind in changed or ():
+        for listener in _listeners:
+            listener(world_id, kind)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("changed_worlds", None)
+
+
+# -------------------
+# Version lookups
+# -------------------
+# Returns None when the world does not exist or is not the user's, so the
+# lookup doubles as the ownership check
+def _version_statement(world_id: int, user_id: int):
+    return select(models.World.version).where(
+        models.World.id == world_id,
+        models.World.user_id == user_id,
+    )
+
+
+def get_world_version(db: Session, world_id: int, user_id: int):
+    return db.scalar(_version_statement(world_id, user_id))
+
+
+async def get_world_version_async(db, world_id: int, user_id: int):
+    return await db.scalar(_version_statement(world_id, user_id))
+
+
+# -------------------
+# ETags
+# -------------------
+# Strong ETags. List tags also fold in the query string, since every page
+# (limit/after/unpaginated) is a different representation.
+def list_etag(kind: str, world_id: int, version: int, request: Request) -> str:
+    query = "&".join(sorted(request.url.query.split("&"))) if request.url.query else ""
+    digest = hashlib.blake2s(query.encode(), digest_size=6).hexdigest()
+    return f'"{kind}s-w{world_id}-v{version}-{digest}"'
+
+
+def detail_etag(kind: str, entity_id: int, world_id: int, version: int) -> str:
+    return f'"{kind}-{entity_id}-w{world_id}-v{version}"'
+
+
+def _if_none_match(request: Request):
+    header = request.headers.get("if-none-match")
+    if not header:
+        return []
+    return [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    tags = _if_none_match(request)
+    return etag in tags or "*" in tags
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
+
+# Conditional detail reads. Nothing in the client's tag is trusted: the
+# entity's own world id and that world's version are read under the same
+# ownership filter as the full read, and the tag is rebuilt from them. Only
+# those two columns are fetched, never the entity row itself.
+def _detail_state_statement(model, entity_id: int, user_id: int):
+    return (
+        select(model.world_id, models.World.version)
+        .join(models.World, models.World.id == model.world_id)
+        .where(model.id == entity_id, model.user_id == user_id)
+    )
+
+
+def _detail_match(request: Request, kind: str, entity_id: int, row):
+    if row is None:
+        return None
+    etag = detail_etag(kind, entity_id, row.world_id, row.version)
+    return etag if etag_matches(request, etag) else None
+
+
+def detail_not_modified(db: Session, request: Request, kind: str, model, entity_id: int, user_id: int):
+    if not _if_none_match(request):
+        return None
+    row = db.execute(_detail_state_statement(model, entity_id, user_id)).first()
+    return _detail_match(request, kind, entity_id, row)
+
+
+async def detail_not_modified_async(db, request: Request, kind: str, model, entity_id: int, user_id: int):
+    if not _if_none_match(request):
+        return None
+    row = (await db.execute(_detail_state_statement(model, entity_id, user_id))).first()
+    return _detail_match(request, kind, entity_id, row)
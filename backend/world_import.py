@@ -0,0 +1,322 @@
+# world_import.py
+#
+# Incremental importer for the NDJSON archives produced by
+# GET /worlds/{world_id}/export. Records are validated with the API schemas,
+# buffered, and written with multi-row INSERTs; location and character ids
+# from the archive are remapped to the new rows on the fly so events and
+# routes keep their locations and relationships their characters.
+import json
+import os
+from pydantic import ValidationError
+from sqlalchemy import bindparam, insert, update
+import models, schemas
+import versioning
+import calendars
+import location_tree
+import spatial
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "2000"))
+# Only the first few bad records are reported back in full
+MAX_REPORTED_ERRORS = 100
+
+ARCHIVE_FORMAT = "quillvania-ndjson"
+
+
+# Raised for archives that cannot be imported at all (as opposed to single
+# bad records, which are skipped and reported)
+class ArchiveError(Exception):
+    pass
+
+
+class WorldImporter:
+    def __init__(self, db, owner_id: int, world_id: int = None, batch_size: int = IMPORT_BATCH_SIZE):
+        self.db = db
+        self.owner_id = owner_id
+        self.world_id = world_id
+        self.batch_size = batch_size
+        self.location_ids = {}  # archive location id -> new location id
+        self.character_ids = {}  # archive character id -> new character id
+        self.location_parents = {}  # new location id -> archive id of its parent
+        self.relationship_keys = set()  # (source, target, type) already queued
+        self.calendar = None  # the target world's, loaded with the first event
+        self.pending = {"location": [], "route": [], "character": [], "relationship": [], "event": []}
+        self.imported = {"location": 0, "route": 0, "character": 0, "relationship": 0, "event": 0}
+        self.skipped = 0
+        self.unresolved_locations = 0
+        self.errors = []
+        self.line_number = 0
+
+    # -------------------
+    # Feeding records
+    # -------------------
+    def feed_lines(self, lines):
+        for line in lines:
+            self.feed(line)
+
+    def feed(self, line):
+        self.line_number += 1
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if not line.strip():
+            return
+        try:
+            record = json.loads(line)
+            record_type, data = record["type"], record["data"]
+        except (ValueError, KeyError, TypeError):
+            self._reject("Not a {type, data} JSON record")
+            return
+
+        if record_type == "world":
+            self._handle_header(data)
+            return
+        if self.world_id is None:
+            raise ArchiveError("Archive must start with a world header")
+
+        if record_type == "location":
+            self._add_location(data)
+        elif record_type == "route":
+            self._add_route(data)
+        elif record_type == "character":
+            self._add_character(data)
+        elif record_type == "relationship":
+            self._add_relationship(data)
+        elif record_type == "event":
+            self._add_event(data)
+        else:
+            self._reject(f"Unknown record type '{record_type}'")
+
+    def finish(self) -> dict:
+        if self.world_id is None:
+            raise ArchiveError("Archive contained no world header")
+        for record_type in ("location", "route", "character", "relationship", "event"):
+            self._flush(record_type)
+        self._link_locations()
+        versioning.bump_world_version(self.db, self.world_id, "world")
+        self.db.commit()
+        return self.report()
+
+    def abort(self):
+        self.db.rollback()
+
+    def report(self) -> dict:
+        return {
+            "world_id": self.world_id,
+            "imported": dict(self.imported),
+            "skipped": self.skipped,
+            "unresolved_locations": self.unresolved_locations,
+            "errors": self.errors,
+        }
+
+    # -------------------
+    # Record handlers
+    # -------------------
+    def _handle_header(self, data: dict):
+        if data.get("format", ARCHIVE_FORMAT) != ARCHIVE_FORMAT:
+            raise ArchiveError(f"Unsupported archive format '{data.get('format')}'")
+        if self.world_id is not None:
+            self._check_calendar(data.get("calendar"))
+            return  # importing into an existing world; the rest of the header is informational
+        world = self._validate(schemas.WorldCreate, data)
+        if world is None:
+            raise ArchiveError("Invalid world header")
+        db_world = models.World(name=world.name, description=world.description, user_id=self.owner_id)
+        if data.get("calendar"):
+            db_world.calendar = models.Calendar(definition=self._calendar_definition(data["calendar"]))
+        self.db.add(db_world)
+        self.db.flush()
+        self.world_id = db_world.id
+
+    def _add_location(self, data: dict):
+        location = self._validate(schemas.LocationCreate, dict(data, world_id=self.world_id))
+        if location is None:
+            return
+        self.pending["location"].append((data.get("id"), {
+            "name": location.name,
+            "description": location.description,
+            "parent_id": location.parent_id,  # archive id until _link_locations
+            **spatial.point_columns(location.coordinates),
+            "world_id": self.world_id,
+            "user_id": self.owner_id,
+        }))
+        self._maybe_flush("location")
+
+    def _add_character(self, data: dict):
+        character = self._validate(schemas.CharacterCreate, dict(data, world_id=self.world_id))
+        if character is None:
+            return
+        self.pending["character"].append((data.get("id"), {
+            "name": character.name,
+            "description": character.description,
+            "role": character.role,
+            "world_id": self.world_id,
+            "user_id": self.owner_id,
+        }))
+        self._maybe_flush("character")
+
+    def _add_relationship(self, data: dict):
+        relationship = self._validate(schemas.RelationshipCreate, data)
+        if relationship is None:
+            return
+        # Both characters may still be sitting in the buffer
+        if self.pending["character"]:
+            self._flush("character")
+        source_id = self.character_ids.get(relationship.source_id)
+        target_id = self.character_ids.get(relationship.target_id)
+        if source_id is None or target_id is None:
+            self._reject("Relationship refers to a character that is not in the archive")
+            return
+        key = (source_id, target_id, relationship.type)
+        if source_id == target_id or key in self.relationship_keys:
+            self._reject("Self or duplicate relationship")
+            return
+        self.relationship_keys.add(key)
+        self.pending["relationship"].append({
+            "source_id": source_id,
+            "target_id": target_id,
+            "type": relationship.type,
+            "world_id": self.world_id,
+        })
+        self._maybe_flush("relationship")
+
+    def _add_route(self, data: dict):
+        route = self._validate(schemas.RouteCreate, data)
+        if route is None:
+            return
+        if self.pending["location"]:
+            self._flush("location")
+        source_id = self.location_ids.get(route.source_id)
+        target_id = self.location_ids.get(route.target_id)
+        if source_id is None or target_id is None:
+            self._reject("Route refers to a location that is not in the archive")
+            return
+        if source_id == target_id:
+            self._reject("A route must join two different locations")
+            return
+        self.pending["route"].append({
+            "source_id": source_id,
+            "target_id": target_id,
+            "travel_time": route.travel_time,
+            "bidirectional": route.bidirectional,
+            "mode": route.mode,
+            "world_id": self.world_id,
+        })
+        self._maybe_flush("route")
+
+    def _add_event(self, data: dict):
+        event = self._validate(schemas.EventCreate, dict(data, world_id=self.world_id))
+        if event is None:
+            return
+        if self.calendar is None:
+            self.calendar = calendars.for_world(self.db, self.world_id)
+        try:
+            date_columns = calendars.event_date_columns(self.calendar, event.date)
+        except calendars.CalendarError as e:
+            self._reject(str(e))
+            return
+
+        location_id = None
+        if event.location_id is not None:
+            # The referenced location may still be sitting in the buffer
+            if self.pending["location"]:
+                self._flush("location")
+            location_id = self.location_ids.get(event.location_id)
+            if location_id is None:
+                self.unresolved_locations += 1
+
+        self.pending["event"].append({
+            "title": event.title,
+            "description": event.description,
+            "location_id": location_id,
+            **date_columns,
+            "world_id": self.world_id,
+            "user_id": self.owner_id,
+        })
+        self._maybe_flush("event")
+
+    # Parents can come after their children in an archive, so locations are
+    # linked (and their closure rows written) once all of them are in
+    def _link_locations(self):
+        if not self.location_parents:
+            return
+        parents = location_tree.clean_parents({
+            new_id: self.location_ids.get(parent_id) for new_id, parent_id in self.location_parents.items()
+        })
+        linked = [{"location_id": new_id, "new_parent_id": parent_id} for new_id, parent_id in parents.items() if parent_id is not None]
+        if linked:
+            self.db.execute(
+                update(models.Location.__table__)
+                .where(models.Location.__table__.c.id == bindparam("location_id"))
+                .values(parent_id=bindparam("new_parent_id")),
+                linked,
+            )
+        self.db.execute(insert(models.LocationClosure), location_tree.closure_rows(parents))
+
+    # -------------------
+    # Helpers
+    # -------------------
+    # A bad calendar would make every dated event unreadable, so it fails the
+    # whole import rather than being skipped
+    def _calendar_definition(self, data: dict) -> dict:
+        try:
+            definition = schemas.CalendarDefinition.model_validate(data).model_dump()
+            return calendars.validate_definition(definition)
+        except (ValidationError, calendars.CalendarError) as e:
+            raise ArchiveError(f"Invalid calendar in world header: {e}")
+
+    # Event dates are written in the archive's calendar, so an existing world
+    # can only take the archive if it reads dates the same way. Its calendar
+    # is not replaced: that would re-read the dates of the events it has.
+    def _check_calendar(self, data):
+        archive = self._calendar_definition(data) if data else None
+        current = calendars.definition_for_world(self.db, self.world_id)
+        if current is not None:
+            current = schemas.CalendarDefinition.model_validate(current).model_dump()
+        if archive != current:
+            raise ArchiveError(
+                "The archive's calendar does not match this world's; set the world's calendar to the "
+                "archive's (PUT /worlds/{id}/calendar) or import it as a new world"
+            )
+
+    def _validate(self, schema, data: dict):
+        try:
+            return schema.model_validate(data)
+        except ValidationError as e:
+            self._reject(e.errors(include_url=False, include_context=False, include_input=False))
+            return None
+
+    def _reject(self, errors):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": self.line_number, "errors": errors})
+
+    def _maybe_flush(self, record_type: str):
+        if len(self.pending[record_type]) >= self.batch_size:
+            self._flush(record_type)
+
+    def _flush(self, record_type: str):
+        rows = self.pending[record_type]
+        if not rows:
+            return
+        if record_type in ("location", "character"):
+            model, id_map = (
+                (models.Location, self.location_ids) if record_type == "location"
+                else (models.Character, self.character_ids)
+            )
+            # RETURNING in parameter order lines new ids up with archive ids
+            new_ids = self.db.scalars(
+                insert(model).returning(model.id, sort_by_parameter_order=True),
+                [dict(row, parent_id=None) if record_type == "location" else row for _, row in rows],
+            ).all()
+            for (old_id, row), new_id in zip(rows, new_ids):
+                if old_id is not None:
+                    id_map[old_id] = new_id
+                if record_type == "location":
+                    self.location_parents[new_id] = row["parent_id"]
+        elif record_type == "relationship":
+            self.db.execute(insert(models.CharacterRelationship), rows)
+        elif record_type == "route":
+            self.db.execute(insert(models.Route), rows)
+        else:
+            self.db.execute(insert(models.Event), rows)
+        self.imported[record_type] += len(rows)
+        self.pending[record_type] = []
@@ -0,0 +1,155 @@
+# world_indexes.py
+#
+# In-process, per-world derived structures (typeahead tries, graphs, ...)
+# built lazily from the database and kept for as long as the world's version
+# counter (versioning.py) stays where it was when they were built. Any write
+# to the world bumps the counter, so the next read rebuilds; the change
+# listener also drops the stale copy right away to free its memory.
+#
+# Caches created with refresh_in_background=True (typeahead) trade that
+# exactness for latency: after a write they keep serving the previous copy
+# while one shared worker thread rebuilds it, so no request pays for the
+# rebuild. Only a world's first build happens inside a request.
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import select
+import models
+import versioning
+
+logger = logging.getLogger(__name__)
+
+_caches = []
+_rebuilds = ThreadPoolExecutor(max_workers=1, thread_name_prefix="world-index-rebuild")
+
+
+class VersionedWorldCache:
+    # build(db, world_id) -> index; kinds are the entity kinds the index is
+    # derived from (writes to other kinds still bump the version, though)
+    def __init__(self, name: str, build, kinds, max_worlds: int, refresh_in_background: bool = False):
+        self.name = name
+        self.build = build
+        self.kinds = set(kinds)
+        self.max_worlds = max_worlds
+        self.refresh_in_background = refresh_in_background
+        self._entries = OrderedDict()  # world_id -> (version, index)
+        self._queued = set()  # worlds with a background rebuild waiting to start
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.background_builds = 0
+        self.builds = 0
+        self.build_seconds = 0.0
+        self.evictions = 0
+        self.invalidations = 0
+        _caches.append(self)
+        versioning.on_world_change(self._on_change)
+
+    def get(self, db, world_id: int, version: int):
+        with self._lock:
+            entry = self._entries.get(world_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(world_id)
+                self.hits += 1
+                return entry[1]
+            if entry is not None and entry[0] < version and self.refresh_in_background:
+                self._entries.move_to_end(world_id)
+                self.stale_hits += 1
+                self._queue_rebuild(world_id)
+                return entry[1]
+
+        # Built outside the lock so a cold world never stalls reads of others;
+        # two concurrent misses on one world may both build, and the result
+        # for the newer version wins
+        started = time.perf_counter()
+        index = self.build(db, world_id)
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self.builds += 1
+            self.build_seconds += elapsed
+            self._store(world_id, version, index)
+        return index
+
+    # Call with the lock held
+    def _store(self, world_id: int, version: int, index):
+        current = self._entries.get(world_id)
+        if current is None or current[0] <= version:
+            self._entries[world_id] = (version, index)
+            self._entries.move_to_end(world_id)
+            while len(self._entries) > self.max_worlds:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    # Call with the lock held. A world already waiting is not queued twice;
+    # one whose rebuild has started is, since that build may predate the write
+    def _queue_rebuild(self, world_id: int):
+        if world_id not in self._queued:
+            self._queued.add(world_id)
+            _rebuilds.submit(self._rebuild, world_id)
+
+    def _rebuild(self, world_id: int):
+        from database import SessionLocal
+        with self._lock:
+            self._queued.discard(world_id)
+        db = SessionLocal()
+        try:
+            # Read before building: the index holds at least this version's data
+            version = db.scalar(select(models.World.version).where(models.World.id == world_id))
+            if version is None:
+                self.discard(world_id)
+                return
+            started = time.perf_counter()
+            index = self.build(db, world_id)
+            elapsed = time.perf_counter() - started
+        except Exception as e:
+            # The stale copy keeps being served; the next request queues a retry
+            logger.warning(f"Background rebuild of {self.name} index for world ID {world_id} failed: {e}")
+            return
+        finally:
+            db.close()
+        with self._lock:
+            self.background_builds += 1
+            self.build_seconds += elapsed
+            if world_id in self._entries:
+                self._store(world_id, version, index)
+
+    def discard(self, world_id: int):
+        with self._lock:
+            if self._entries.pop(world_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "worlds": len(self._entries),
+                "max_worlds": self.max_worlds,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "builds": self.builds,
+                "background_builds": self.background_builds,
+                "avg_build_ms": round(self.build_seconds * 1000 / (self.builds + self.background_builds), 3)
+                if self.builds + self.background_builds else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _on_change(self, world_id: int, kind: str):
+        if kind != "world" and kind not in self.kinds:
+            return
+        if not self.refresh_in_background:
+            self.discard(world_id)
+            return
+        with self._lock:
+            if world_id in self._entries:
+                self._queue_rebuild(world_id)
+
+
+def stats() -> dict:
+    return {cache.name: cache.stats() for cache in _caches}
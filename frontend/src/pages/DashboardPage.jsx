@@ -33,8 +33,18 @@ function DashboardPage() {
   useEffect(() => {
     const fetchWorlds = async () => {
       try {
-        const res = await axios.get(`${API_BASE_URL}/worlds/`, axiosConfig);
-        setWorlds(res.data);
+        // The list is paginated; follow next_cursor until the last page
+        let allWorlds = [];
+        let after = null;
+        do {
+          const res = await axios.get(`${API_BASE_URL}/worlds/`, {
+            ...axiosConfig,
+            params: after === null ? {} : { after },
+          });
+          allWorlds = allWorlds.concat(res.data.items);
+          after = res.data.next_cursor;
+        } while (after !== null);
+        setWorlds(allWorlds);
       } catch (err) {
         console.error("Error fetching worlds:", err);
       }
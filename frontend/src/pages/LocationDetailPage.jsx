@@ -25,7 +25,9 @@ export default function LocationDetailPage() {
         try {
           setLoading(true);
           const res = await axios.get(`${API_BASE_URL}/locations/${locId}`, axiosConfig);
-          setLocationData(res.data);
+          // The API returns {x, y}; the form edits it as "x, y"
+          const coords = res.data.coordinates;
+          setLocationData({ ...res.data, coordinates: coords ? `${coords.x}, ${coords.y}` : "" });
         } catch (err) {
           console.error("Error fetching location:", err);
           alert("Failed to load location");
@@ -102,7 +104,7 @@ export default function LocationDetailPage() {
           <input
             value={locationData.coordinates}
             onChange={e => setLocationData({ ...locationData, coordinates: e.target.value })}
-            placeholder="Coordinates"
+            placeholder="x, y"
             disabled={loading}
           />
         </div>
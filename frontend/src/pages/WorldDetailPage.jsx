@@ -19,17 +19,38 @@ export default function WorldDetailPage() {
     headers: { Authorization: `Bearer ${user?.access_token}` },
   };
 
+  // The snapshot holds the lowest ids of each collection; page through the
+  // rest with the list endpoint, following next_cursor until the last page
+  const fetchRest = async (path, items) => {
+    let all = items;
+    let after = items.length > 0 ? items[items.length - 1].id : null;
+    do {
+      const res = await axios.get(`${API_BASE_URL}${path}`, {
+        ...axiosConfig,
+        params: after === null ? {} : { after },
+      });
+      all = all.concat(res.data.items);
+      after = res.data.next_cursor;
+    } while (after !== null);
+    return all;
+  };
+
   useEffect(() => {
     const fetchWorldData = async () => {
       try {
-        const [charRes, eventRes, locRes] = await Promise.all([
-          axios.get(`${API_BASE_URL}/characters/world/${worldId}`, axiosConfig),
-          axios.get(`${API_BASE_URL}/events/world/${worldId}`, axiosConfig),
-          axios.get(`${API_BASE_URL}/locations/world/${worldId}`, axiosConfig),
-        ]);
-        setCharacters(charRes.data || []);
-        setEvents(eventRes.data || []);
-        setLocations(locRes.data || []);
+        const res = await axios.get(`${API_BASE_URL}/worlds/${worldId}/snapshot`, axiosConfig);
+        const { characters = [], events = [], locations = [], truncated, ...worldInfo } = res.data;
+        setWorld(worldInfo);
+        if (truncated) {
+          // At least one collection was cut at the snapshot limit
+          setCharacters(await fetchRest(`/characters/world/${worldId}`, characters));
+          setEvents(await fetchRest(`/events/world/${worldId}`, events));
+          setLocations(await fetchRest(`/locations/world/${worldId}`, locations));
+        } else {
+          setCharacters(characters);
+          setEvents(events);
+          setLocations(locations);
+        }
       } catch (err) {
         console.error("Error fetching world data:", err);
       } finally {